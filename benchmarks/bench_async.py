@@ -0,0 +1,115 @@
+# Benchmark for the async engine's sender against the thread-pool Sender.
+#
+# Throughput is measured against the local fake Bot API server with a fixed
+# reply latency, which is what bounds a thread pool. Memory is measured with
+# an in-process client whose replies never come back during the measurement,
+# so every message is an in-flight task at once.
+# Rate limits are lifted so the numbers reflect the engines only.
+#     python -m benchmarks.bench_async --messages 5000 --latency 0.05 --in-flight 20000
+
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from reminder.aio import AsyncSender, AsyncTelegramClient
+from reminder.delivery import Sender, TelegramClient
+
+
+def bench_threads(api_base, messages, workers):
+    client = TelegramClient("TEST", api_base=api_base, pool_size=workers)
+    sender = Sender(client, workers=workers, global_rate=1e9, private_chat_rate=1e9).start()
+    started = time.perf_counter()
+    for i in range(messages):
+        sender.submit(i, "hello")
+    sender.join()
+    elapsed = time.perf_counter() - started
+    sender.stop()
+    client.close()
+    return messages / elapsed
+
+
+# Function to run an AsyncSender on this thread's loop while another thread
+# submits `messages` messages; returns (elapsed seconds, sender)
+async def _run_async(client, messages, max_in_flight, queue_size, measure=None):
+    loop = asyncio.get_running_loop()
+    sender = AsyncSender(client, loop, asyncio.Semaphore(max_in_flight), queue_size=queue_size,
+                         global_rate=1e9, private_chat_rate=1e9).start()
+
+    def produce():
+        for i in range(messages):
+            sender.submit(i, "hello")
+
+    started = time.perf_counter()
+    await loop.run_in_executor(None, produce)
+    if measure is not None:
+        while sender.queue_depth > len(sender._tasks) or len(sender._tasks) < min(messages, max_in_flight):
+            await asyncio.sleep(0.01)
+        measure(sender)
+    await sender.aclose()
+    return time.perf_counter() - started
+
+
+def bench_async(api_base, messages, max_in_flight):
+    client = AsyncTelegramClient("TEST", api_base=api_base)
+    elapsed = asyncio.run(_run_async(client, messages, max_in_flight, queue_size=1000))
+    return messages / elapsed
+
+
+class SlowClient:
+    """In-process client that answers every message after `latency` seconds."""
+
+    token = "TEST"
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def send_message(self, chat_id, message):
+        await asyncio.sleep(self.latency)
+        return True, "Message sent successfully!", None, False
+
+    async def close(self):
+        pass
+
+
+# Function to measure the memory held per in-flight send with `messages` in flight at once
+def bench_async_memory(messages, latency):
+    result = {}
+
+    def measure(sender):
+        result['in_flight'] = len(sender._tasks)
+        result['bytes'] = tracemalloc.get_traced_memory()[0] - result['baseline']
+
+    tracemalloc.start()
+    result['baseline'] = tracemalloc.get_traced_memory()[0]
+    asyncio.run(_run_async(SlowClient(latency), messages, messages, queue_size=messages, measure=measure))
+    tracemalloc.stop()
+    return result['in_flight'], result['bytes'] / result['in_flight']
+
+
+def thread_stack_size():
+    return threading.stack_size() or 8 * 1024 * 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async engine benchmark")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake server reply latency in seconds")
+    parser.add_argument("--workers", type=int, default=16, help="threads of the thread-pool Sender")
+    parser.add_argument("--max-in-flight", type=int, default=100, help="concurrent sends of the AsyncSender")
+    parser.add_argument("--in-flight", type=int, default=20000, help="sends held in flight for the memory test")
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(latency=args.latency).start()
+    threads = bench_threads(server.api_base, args.messages, args.workers)
+    tasks = bench_async(server.api_base, args.messages, args.max_in_flight)
+    server.shutdown()
+    in_flight, per_send = bench_async_memory(args.in_flight, latency=2.0)
+
+    print(f"reply latency {args.latency * 1000:.0f} ms, {args.messages} messages")
+    print(f"thread-pool Sender: {threads:8.0f} sends/s ({args.workers} threads)")
+    print(f"AsyncSender:        {tasks:8.0f} sends/s ({args.max_in_flight} in flight)")
+    print(f"{in_flight} sends in flight: {per_send / 1024:.1f} KiB each (Python heap); "
+          f"a thread per send would reserve {thread_stack_size() // 1024} KiB of stack each")
@@ -0,0 +1,58 @@
+# Benchmark for the delivery stage against a local fake Bot API server.
+#
+# Compares one bare requests.post per message (the old path) with the pooled
+# Sender. Rate limits are lifted so the numbers reflect client overhead only.
+#     python -m benchmarks.bench_delivery --messages 5000 --chats 1000
+
+import argparse
+import threading
+import time
+
+import requests
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from reminder.delivery import Sender, TelegramClient
+
+
+def bench_bare_post(api_base, messages, chats):
+    started = time.perf_counter()
+    for i in range(messages):
+        requests.post(f"{api_base}/botTEST/sendMessage", params={'chat_id': i % chats, 'text': "hello"})
+    return messages / (time.perf_counter() - started)
+
+
+def bench_sender(api_base, messages, chats, workers):
+    delivered = []
+    lock = threading.Lock()
+
+    def on_result(chat_id, success, description, context):
+        with lock:
+            delivered.append(success)
+
+    client = TelegramClient("TEST", api_base=api_base, pool_size=workers)
+    sender = Sender(client, workers=workers, global_rate=1e9, private_chat_rate=1e9,
+                    on_result=on_result).start()
+    started = time.perf_counter()
+    for i in range(messages):
+        sender.submit(i % chats, "hello")
+    sender.join()
+    elapsed = time.perf_counter() - started
+    sender.stop()
+    client.close()
+    return messages / elapsed, sum(delivered)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delivery throughput benchmark")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server = FakeTelegramServer().start()
+    bare = bench_bare_post(server.api_base, min(args.messages, 1000), args.chats)
+    pooled, ok = bench_sender(server.api_base, args.messages, args.chats, args.workers)
+    server.shutdown()
+
+    print(f"bare requests.post:  {bare:8.0f} sends/s")
+    print(f"pooled Sender:       {pooled:8.0f} sends/s ({ok}/{args.messages} ok, {args.workers} workers)")
@@ -0,0 +1,76 @@
+# Benchmark for the heap dispatcher: fire-time jitter and CPU per tick.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_dispatcher --reminders 100000 --spread 10
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from reminder.dispatcher import Dispatcher
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(reminders, spread, seed=0):
+    rng = random.Random(seed)
+    lags = []
+    tick_cpu = []
+    done = threading.Event()
+
+    def callback(due):
+        now = time.time()
+        for _, fire_at in due:
+            lags.append(now - fire_at)
+        if len(lags) >= reminders:
+            done.set()
+        return ()
+
+    dispatcher = Dispatcher(callback)
+
+    # Wrap one tick (pop + callback) to measure its CPU cost
+    original_fire = dispatcher.fire
+
+    def timed_fire(due):
+        started = time.process_time()
+        original_fire(due)
+        tick_cpu.append(time.process_time() - started)
+
+    dispatcher.fire = timed_fire
+
+    start = time.time() + 1.0
+    load_started = time.perf_counter()
+    dispatcher.add_many((i, start + rng.random() * spread) for i in range(reminders))
+    load_seconds = time.perf_counter() - load_started
+
+    cpu_started = time.process_time()
+    dispatcher.start()
+    done.wait(spread + 60)
+    dispatcher.stop(timeout=5)
+    cpu_total = time.process_time() - cpu_started
+
+    lags_ms = [lag * 1000 for lag in lags]
+    print(f"reminders:          {reminders}")
+    print(f"load (add_many):    {load_seconds * 1000:.1f} ms")
+    print(f"fired:              {len(lags)}")
+    print(f"ticks:              {len(tick_cpu)}")
+    print(f"lag p50/p99/max:    {percentile(lags_ms, 50):.2f} / {percentile(lags_ms, 99):.2f} / {max(lags_ms, default=0):.2f} ms")
+    print(f"lag mean:           {statistics.fmean(lags_ms) if lags_ms else 0:.2f} ms")
+    print(f"CPU per tick mean:  {statistics.fmean(tick_cpu) * 1e6 if tick_cpu else 0:.1f} us")
+    print(f"CPU total:          {cpu_total:.3f} s over {spread:.0f} s window")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Heap dispatcher jitter benchmark")
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--spread", type=float, default=10.0, help="seconds over which fire times are spread")
+    args = parser.parse_args()
+    run(args.reminders, args.spread)
@@ -0,0 +1,97 @@
+# Benchmark for the memory a worker holds per reminder read from the store.
+#
+# Fills a scratch database with reminders shaped like a real deployment (a few
+# reminders per recipient, a small set of names, times and zones), then reads
+# them all back twice: as one dict per row, the way reads used to come back,
+# and as compact Reminder objects from get_many(). Memory is the Python heap
+# held by the result (tracemalloc), so the database's own cache is left out.
+#     python -m benchmarks.bench_memory --reminders 1000000
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+from reminder.store import ReminderStore
+
+FIRST_NAMES = ["Asha", "Priya", "Meena", "Lakshmi", "Divya", "Kavya", "Anjali", "Sneha", "Pooja", "Nisha"]
+LAST_NAMES = ["Rao", "Sharma", "Iyer", "Patel", "Reddy", "Nair", "Das", "Singh"]
+TEXTS = ["Take your iron tablet", "Take your folic acid", "Drink a glass of milk", "Time for your walk"]
+TIMES = ["08:00", "09:30", "13:00", "20:00", "21:30"]
+ZONES = ["Asia/Kolkata", "Asia/Kolkata", "Asia/Kolkata", "Asia/Dubai", "Europe/London"]
+WEEKDAYS = ["Monday", "Wednesday", "Friday"]
+
+
+# Function to generate `count` reminders firing over the day after `first_fire`
+def make_reminders(count, first_fire=None):
+    first_fire = time.time() + 86400 if first_fire is None else first_fire
+    for i in range(count):
+        chat = i // 3
+        rng = random.Random(chat)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        zone = rng.choice(ZONES)
+        frequency = rng.choice(["Daily", "Daily", "Weekly", "Monthly"])
+        yield {
+            "text": rng.choice(TEXTS),
+            "frequency": frequency,
+            "sender_name": "Clinic",
+            "receiver_name": name,
+            "receiver_chat_id": str(100_000_000 + chat),
+            "timezone": zone,
+            "selected_time_ist": TIMES[i % len(TIMES)],
+            "day_of_week": WEEKDAYS[chat % len(WEEKDAYS)] if frequency == "Weekly" else None,
+            "day_of_month": chat % 28 + 1 if frequency == "Monthly" else None,
+            "next_fire_at": first_fire + i % 86400,
+        }
+
+
+def fill(store, count, first_fire=None, batch=50_000):
+    reminders = make_reminders(count, first_fire)
+    while chunk := list(islice(reminders, batch)):
+        store.add_many(chunk)
+
+
+# Function to measure (bytes held, seconds taken) for building the result of
+# `read`; timed on a separate untraced run, as tracing slows allocation down
+def measure(read):
+    started = time.perf_counter()
+    read()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = read()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return held, elapsed
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as directory:
+        store = ReminderStore(os.path.join(directory, "bench.db"))
+        started = time.perf_counter()
+        fill(store, count)
+        print(f"reminders:        {count} (filled in {time.perf_counter() - started:.1f} s)")
+
+        ids = list(range(1, count + 1))
+
+        def as_dicts():
+            rows = store._connect().execute("SELECT * FROM reminders")
+            return {row['id']: store._to_dict(row) for row in rows}
+
+        dict_bytes, dict_seconds = measure(as_dicts)
+        slot_bytes, slot_seconds = measure(lambda: store.get_many(ids))
+
+    print(f"dict per row:     {dict_bytes / count:7.0f} B/reminder, {dict_bytes / 2**20:7.1f} MiB, {dict_seconds:.1f} s")
+    print(f"Reminder slots:   {slot_bytes / count:7.0f} B/reminder, {slot_bytes / 2**20:7.1f} MiB, {slot_seconds:.1f} s")
+    print(f"saved:            {1 - slot_bytes / dict_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-reminder memory benchmark")
+    parser.add_argument("--reminders", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.reminders)
@@ -0,0 +1,70 @@
+# Microbenchmark for message rendering: renders per second for the original
+# string-building function versus the cached render layer (which also picks
+# the message set for each recipient's week of pregnancy), per message and
+# batched per dispatch tick. The per-message path is timed with empty caches
+# and again once every reminder's layout is cached.
+#     python -m benchmarks.bench_render --renders 200000 --reminders 5000
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from reminder.messages import medication_message_templates
+from reminder.render import generate_cordial_message, render_batch
+
+
+# The message builder as it was before the render layer, kept for comparison
+def legacy_generate_cordial_message(reminder_text, sender_name="", receiver_name=""):
+    base_message = random.choice(medication_message_templates)
+    message_parts = []
+    if receiver_name:
+        message_parts.append(f"Dear {receiver_name},\n\n")
+    message_parts.append(base_message)
+    if reminder_text:
+        message_parts.append(f"\n\n📝 {reminder_text}")
+    if sender_name:
+        message_parts.append(f"\n\nWarmly,\n{sender_name}")
+    return "".join(message_parts)
+
+
+def make_reminders(count):
+    return [
+        {
+            'text': f"Iron tablet {i % 7 + 1} x 100mg after breakfast",
+            'sender_name': f"Sender {i % 50}",
+            'receiver_name': f"Mom {i}",
+            'due_date': (date.today() + timedelta(days=i % 280)).isoformat(),
+            'timezone': 'Asia/Kolkata',
+        }
+        for i in range(count)
+    ]
+
+
+def rate(label, renders, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {renders / elapsed:>12,.0f} renders/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Message rendering benchmark")
+    parser.add_argument("--renders", type=int, default=200_000)
+    parser.add_argument("--reminders", type=int, default=5_000, help="distinct reminders cycled through")
+    parser.add_argument("--tick", type=int, default=1_000, help="messages rendered per batch")
+    args = parser.parse_args()
+
+    reminders = make_reminders(args.reminders)
+    stream = [reminders[i % len(reminders)] for i in range(args.renders)]
+
+    rate("legacy per message", args.renders, lambda: [
+        legacy_generate_cordial_message(r['text'], r['sender_name'], r['receiver_name']) for r in stream])
+    per_message = lambda: [
+        generate_cordial_message(r['text'], r['sender_name'], r['receiver_name'], r['due_date'], r['timezone'])
+        for r in stream]
+    # The first pass also renders each reminder's layout once; later sends only look it up
+    rate("cached per message (cold)", args.renders, per_message)
+    rate("cached per message (warm)", args.renders, per_message)
+    rate(f"cached batch of {args.tick}", args.renders, lambda: [
+        render_batch(stream[i:i + args.tick]) for i in range(0, len(stream), args.tick)])
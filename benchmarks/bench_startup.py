@@ -0,0 +1,115 @@
+# Benchmark for start-up time and memory of the worker, to keep it lean.
+#
+# Each case runs in a fresh interpreter: importing the worker modules (and
+# checking that none of the UI's heavy packages came along), importing what
+# the Streamlit UI needs for comparison, and a real `python -m reminder
+# worker` process from launch until it is ready to fire against a store of
+# `--reminders` reminders and the fake Bot API server: its "started" line
+# comes after the outbox replay and the first window load. RSS is the peak
+# resident set size (and /proc's current one for the running worker, so the
+# process numbers are Linux only).
+#     python -m benchmarks.bench_startup --reminders 10000 --runs 5
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_memory import fill
+from benchmarks.fake_telegram import FakeTelegramServer
+from reminder.store import ReminderStore
+
+# Packages the worker must never import; they belong to the UI or to bulk files
+HEAVY_MODULES = ["streamlit", "pandas", "plotly", "pyarrow", "scipy", "statsmodels"]
+
+CASES = {
+    "worker (threads)": "import reminder.worker",
+    "worker (async)": "import reminder.aio",
+    "UI packages": "import streamlit, pandas, plotly.graph_objects, reminder.bulk",
+}
+
+# Code run in the child: time the import, then report peak RSS and heavy modules
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+{code}
+seconds = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "heavy": heavy}}))
+"""
+
+
+def child_env():
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+                PYTHONUNBUFFERED="1")
+
+
+def bench_import(code):
+    output = subprocess.run([sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True, env=child_env()).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+# Function to launch a worker and time it until it is ready to fire; returns (seconds, RSS in KB)
+def bench_worker(db_path, api_base, engine):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "reminder", "worker", "--db", db_path, "--token", "TEST",
+         "--api-base", api_base, "--engine", engine, "--stats-file", db_path + "-stats.json"],
+        stdout=subprocess.PIPE, text=True, env=child_env())
+    try:
+        for line in process.stdout:
+            if line.startswith("Reminder worker"):
+                break
+        return time.perf_counter() - started, rss_kb(process.pid)
+    finally:
+        process.send_signal(signal.SIGINT)
+        process.wait(timeout=30)
+
+
+def summary(values, unit, scale=1.0):
+    values = [value * scale for value in values if value is not None]
+    if not values:
+        return "-"
+    return f"{statistics.median(values):7.0f} {unit} (min {min(values):.0f})"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker start-up time and memory benchmark")
+    parser.add_argument("--reminders", type=int, default=10_000, help="reminders in the worker's store")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, code in CASES.items():
+        results = [bench_import(code) for _ in range(args.runs)]
+        heavy = sorted({module for result in results for module in result["heavy"]})
+        print(f"import {name + ':':18} {summary([r['seconds'] for r in results], 'ms', 1000)}, "
+              f"peak RSS {summary([r['rss_kb'] for r in results], 'MiB', 1 / 1024)}, "
+              f"heavy modules: {', '.join(heavy) or 'none'}")
+
+    server = FakeTelegramServer().start()
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        fill(ReminderStore(db_path), args.reminders)
+        for engine in ("threads", "async"):
+            results = [bench_worker(db_path, server.api_base, engine) for _ in range(args.runs)]
+            print(f"worker process ({engine}, {args.reminders} reminders): "
+                  f"ready in {summary([r[0] for r in results], 'ms', 1000)}, "
+                  f"RSS {summary([r[1] for r in results], 'MiB', 1 / 1024)}")
+    server.shutdown()
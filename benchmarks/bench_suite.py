@@ -0,0 +1,134 @@
+# Load test of the whole worker against the fake Bot API server, at several
+# store sizes.
+#
+# For each size a scratch database is filled with reminders spread over the
+# next day. A sample of them is then set to come due together a few seconds
+# out, and a real Worker (store, dispatcher, sender, outbox) is started
+# against benchmarks.fake_telegram. Rate limits are lifted so the numbers
+# reflect the worker and not Telegram's budget. Reported per size:
+#     cold start     opening the store and loading the first window, as run() does
+#     window         reminders the dispatcher holds in memory after that
+#     tick cost      dispatcher CPU per tick (store lookup, outbox, hand-off to
+#                    the sender), and wall time, which also counts waiting on a
+#                    full send queue
+#     throughput     sample messages delivered per second once due, next to the
+#                    rate they come due at (sample / spread), which bounds it
+#     fire latency   due instant to delivery outcome, p50 / p99 / max
+#     memory         Python heap per reminder read back from the store
+#     python -m benchmarks.bench_suite --sizes 1000,100000,1000000 --sample 2000 --latency 0.02
+#     python -m benchmarks.bench_suite --sizes 1000 --rate-limit 0.01 --error-rate 0.01
+
+import argparse
+import math
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_dispatcher import percentile
+from benchmarks.bench_memory import fill, measure
+from benchmarks.fake_telegram import FakeTelegramServer
+from reminder.delivery import Sender
+from reminder.store import ReminderStore
+from reminder.worker import Worker
+
+
+class BenchWorker(Worker):
+    """Worker with Telegram's rate limits lifted that records when each reminder is delivered."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delivered = {}
+        self.ticks = []
+
+    def _make_sender(self, client, on_result):
+        return Sender(client, workers=self.workers, global_rate=1e9, private_chat_rate=1e9,
+                      on_result=on_result, metrics=self.metrics).start()
+
+    def log_delivery(self, chat_id, success, description, reminder_id):
+        self.delivered[reminder_id] = (time.time(), success)
+
+    def fire_due_reminders(self, due):
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            return super().fire_due_reminders(due)
+        finally:
+            self.ticks.append((time.thread_time() - cpu_started, time.perf_counter() - started))
+
+
+def run(size, server, sample, spread, lead, workers, timeout):
+    sample = min(sample, size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        started = time.perf_counter()
+        fill(ReminderStore(path), size, first_fire=time.time() + 600)
+        filled = time.perf_counter() - started
+
+        # The sample comes due `lead` seconds from now, spread over `spread` seconds
+        due_at = float(math.ceil(time.time() + lead))
+        fire_ats = {reminder_id: due_at + spread * i / sample for i, reminder_id in enumerate(range(1, sample + 1))}
+        ReminderStore(path).set_next_fire_many(fire_ats.items())
+        # The store hands out fire instants in whole seconds, so that is when
+        # each reminder is actually due
+        fire_ats = {reminder_id: math.floor(fire_at) for reminder_id, fire_at in fire_ats.items()}
+
+        started = time.perf_counter()
+        store = ReminderStore(path)
+        worker = BenchWorker(store, token="TEST", workers=workers, api_base=server.api_base)
+        worker.reschedule_changed_zones()
+        worker.replay_outbox()
+        worker.dispatcher.refill()
+        cold_start = time.perf_counter() - started
+        window = len(worker.dispatcher)
+
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        deadline = due_at + spread + timeout
+        while len(worker.delivered) < sample and time.time() < deadline:
+            time.sleep(0.05)
+        worker.dispatcher.stop()
+        thread.join()
+
+        lags = [(done - fire_ats[reminder_id]) * 1000 for reminder_id, (done, _) in worker.delivered.items()
+                if reminder_id in fire_ats]
+        last = max((done for done, _ in worker.delivered.values()), default=due_at)
+        sent = sum(success for _, success in worker.delivered.values())
+        ids = list(range(1, min(size, 100_000) + 1))
+        held, _ = measure(lambda: store.get_many(ids))
+        cpu = sum(tick[0] for tick in worker.ticks)
+        wall = sum(tick[1] for tick in worker.ticks)
+        ticks = max(len(worker.ticks), 1)
+
+    print(f"== {size} reminders (filled in {filled:.1f} s)")
+    print(f"cold start:       {cold_start * 1000:.0f} ms")
+    print(f"window:           {window} reminders in memory")
+    print(f"tick cost:        {cpu / ticks * 1000:.2f} ms CPU ({wall / ticks * 1000:.0f} ms wall) mean over "
+          f"{len(worker.ticks)} ticks, {cpu / max(len(lags), 1) * 1e6:.0f} us CPU per reminder")
+    offered = f"{sample / spread:.0f}/s" if spread else "all at once"
+    print(f"throughput:       {len(lags) / max(last - due_at, 1e-9):.0f} messages/s "
+          f"({sent} sent, {len(lags) - sent} failed, {sample - len(lags)} not delivered; due at {offered})")
+    print(f"fire latency:     p50 {percentile(lags, 50):.1f} / p99 {percentile(lags, 99):.1f} / "
+          f"max {max(lags, default=0):.1f} ms")
+    print(f"memory:           {held / len(ids):.0f} B per reminder read")
+    if cold_start > lead:
+        print(f"note: cold start took longer than the {lead:.0f} s lead; latencies include the wait")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker load test against a fake Bot API server")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma-separated store sizes")
+    parser.add_argument("--sample", type=int, default=2000, help="reminders made due during the run")
+    parser.add_argument("--spread", type=float, default=1.0, help="seconds over which the sample comes due")
+    parser.add_argument("--lead", type=float, default=10.0, help="seconds from startup until the sample is due")
+    parser.add_argument("--workers", type=int, default=16, help="sender threads")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for the sample after it is due")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server reply latency in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(latency=args.latency, rate_limit=args.rate_limit, error_rate=args.error_rate).start()
+    for size in (int(size) for size in args.sizes.split(",")):
+        run(size, server, args.sample, args.spread, args.lead, args.workers, args.timeout)
+    server.shutdown()
+    print(f"fake server replies by status: {server.statuses}")
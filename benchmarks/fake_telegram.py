@@ -0,0 +1,122 @@
+# Local stand-in for the Telegram Bot API, for benchmarks and load tests.
+#
+# Serves sendMessage and getChat over HTTP/1.1 keep-alive so connection
+# pooling in the client is actually exercised. Every reply can be delayed,
+# and a share of them answered with flood control (429 with retry_after) or
+# a server error (500); chats listed as unreachable get Telegram's
+# "chat not found". Run standalone, then point the worker or UI at it with
+# $TELEGRAM_API_BASE:
+#     python -m benchmarks.fake_telegram --port 8081 --latency 0.05 --rate-limit 0.01
+#     TELEGRAM_API_BASE=http://127.0.0.1:8081 python -m reminder worker --token TEST
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer the reply so headers and body leave in one write; unbuffered,
+    # they go out as two segments and a keep-alive client stalls on Nagle's
+    # algorithm meeting delayed ACKs
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        params = parse_qs(self.rfile.read(length).decode())
+        _, _, method = self.path.partition("?")[0].rpartition("/")
+        chat_id = params.get("chat_id", [""])[0]
+        server = self.server
+        with server.lock:
+            server.counts[method] = server.counts.get(method, 0) + 1
+            message_id = server.counts[method]
+            roll = server.random.random()
+
+        if server.latency:
+            time.sleep(server.latency)
+        if method not in ("sendMessage", "getChat"):
+            status, payload = 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        elif roll < server.rate_limit:
+            status, payload = 429, {"ok": False, "error_code": 429,
+                                    "description": f"Too Many Requests: retry after {server.retry_after}",
+                                    "parameters": {"retry_after": server.retry_after}}
+        elif roll < server.rate_limit + server.error_rate:
+            status, payload = 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+        elif chat_id in server.unreachable:
+            status, payload = 400, {"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}
+        elif method == "sendMessage":
+            status, payload = 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": chat_id}}}
+        else:
+            status, payload = 200, {"ok": True, "result": {"id": chat_id, "type": "private",
+                                                           "first_name": f"Chat {chat_id}"}}
+        with server.lock:
+            server.statuses[status] = server.statuses.get(status, 0) + 1
+        self._reply(status, payload)
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default listen backlog of 5 drops the SYNs of a burst of
+    # new connections (100 in flight from the AsyncSender), and each dropped
+    # one waits out a TCP retransmit
+    request_queue_size = 1024
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, rate_limit=0.0, retry_after=1,
+                 error_rate=0.0, unreachable=(), seed=0):
+        super().__init__((host, port), FakeTelegramHandler)
+        # Seconds every request takes, to stand in for the round trip to Telegram
+        self.latency = latency
+        # Shares of requests answered with 429 (asking for `retry_after`
+        # seconds) and with 500
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        # Chat ids (as strings) that do not exist for the bot
+        self.unreachable = {str(chat_id) for chat_id in unreachable}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # Requests per method and replies per HTTP status
+        self.counts = {}
+        self.statuses = {}
+
+    @property
+    def api_base(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="fake-telegram", daemon=True)
+        thread.start()
+        return self
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after sent with every 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--unreachable", nargs="*", default=(), help="chat ids answered with \"chat not found\"")
+    args = parser.parse_args()
+    server = FakeTelegramServer(args.host, args.port, args.latency, args.rate_limit, args.retry_after,
+                                args.error_rate, args.unreachable)
+    print(f"Fake Telegram API listening on {server.api_base}")
+    server.serve_forever()
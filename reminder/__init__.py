@@ -0,0 +1,3 @@
+# Scheduling and delivery core for the Mom-to-Be Reminder App.
+# The Streamlit UI lives in reminder1.py; everything here is importable
+# without Streamlit so it can also run in a headless process.
@@ -0,0 +1,53 @@
+import sys
+
+USAGE = """usage: python -m reminder worker [options]
+       python -m reminder import FILE [--db PATH] [--tenant ID]
+       python -m reminder export FILE [--db PATH] [--tenant ID]"""
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(USAGE)
+        return 0
+    command, rest = argv[0], argv[1:]
+    if command == "worker":
+        from reminder.worker import main as worker_main
+        worker_main(rest)
+        return 0
+    if command in ("import", "export"):
+        return bulk_main(command, rest)
+    print(f"Unknown command: {command}\n{USAGE}", file=sys.stderr)
+    return 2
+
+
+# Function to run a bulk import or export of CSV/Parquet files from the command line
+def bulk_main(command, argv):
+    import argparse
+
+    from reminder.bulk import export_reminders, import_reminders
+    from reminder.store import DEFAULT_DB_PATH, ReminderStore
+
+    parser = argparse.ArgumentParser(prog=f"python -m reminder {command}")
+    parser.add_argument("file", help="CSV or Parquet file (by extension)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="path to the reminder database")
+    parser.add_argument("--tenant", default=None, help="tenant id to import the reminders for or export them from")
+    args = parser.parse_args(argv)
+    store = ReminderStore(args.db)
+    file_format = "parquet" if args.file.lower().endswith(".parquet") else "csv"
+
+    if command == "export":
+        with open(args.file, "wb") as f:
+            f.write(export_reminders(store, file_format, tenant=args.tenant))
+        print(f"Exported the active reminders to {args.file}")
+        return 0
+
+    imported, rejected = import_reminders(store, args.file, file_format, tenant=args.tenant)
+    print(f"Imported {imported} reminder(s) from {args.file}")
+    for row in rejected.itertuples():
+        print(f"  row {row.row}: {row.error}")
+    return 1 if imported == 0 and not rejected.empty else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
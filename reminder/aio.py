@@ -0,0 +1,280 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import aiohttp
+
+from reminder.delivery import TELEGRAM_API_BASE, Sender
+from reminder.dispatcher import Dispatcher
+from reminder.worker import Worker
+
+# Sends in flight at once across every bot of an async worker
+MAX_IN_FLIGHT = 10_000
+
+
+class AsyncTelegramClient:
+    """Bot API client on aiohttp; one keep-alive connection pool per bot.
+
+    The session is created on first use, inside the running event loop.
+    """
+
+    def __init__(self, token, api_base=TELEGRAM_API_BASE, pool_size=100, timeout=10):
+        self.token = token
+        self.api_base = api_base.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                timeout=self.timeout)
+        return self._session
+
+    # Function to call a Bot API method; returns (status_code, response_json)
+    async def call(self, method, params):
+        url = f"{self.api_base}/bot{self.token}/{method}"
+        async with self._get_session().post(url, data=params) as response:
+            try:
+                response_json = await response.json(content_type=None)
+            except ValueError:
+                response_json = {'ok': False, 'description': f"HTTP {response.status}"}
+            return response.status, response_json
+
+    # Function to send a message; returns (success, description, retry_after, retryable)
+    async def send_message(self, chat_id, message):
+        try:
+            status_code, response_json = await self.call("sendMessage", {
+                'chat_id': chat_id,
+                'text': message,
+                'parse_mode': 'HTML'  # Allow some HTML formatting
+            })
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return False, f"Error sending message: {str(e) or type(e).__name__}", None, True
+
+        if status_code == 200 and response_json.get('ok'):
+            return True, "Message sent successfully!", None, False
+
+        error_description = response_json.get('description', 'Unknown error')
+        retry_after = (response_json.get('parameters') or {}).get('retry_after')
+        retryable = status_code == 429 or status_code >= 500
+        return False, f"Failed to send message: {error_description}", retry_after, retryable
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class AsyncSender(Sender):
+    """Sender that runs every message as a task on an event loop.
+
+    Same pacing, flood-control pause and retries as Sender, but a message
+    waiting for its rate-limit slot or for Telegram's reply is a suspended
+    task rather than a blocked thread, and the number in flight is bounded by
+    an asyncio.Semaphore (shared between the senders of one worker). Queued
+    messages are plain tuples in a deque until a slot frees up.
+
+    `submit()` may be called from any thread except the loop's own and blocks
+    once `queue_size` messages are waiting, like Sender.
+    """
+
+    def __init__(self, client, loop, semaphore, queue_size=1000, **kwargs):
+        super().__init__(client, workers=0, queue_size=1, **kwargs)
+        self._loop = loop
+        self._semaphore = semaphore
+        self._waiting = deque()
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._ready = asyncio.Event()
+        self._tasks = set()
+        self._pump_task = None
+
+    def start(self):
+        if self._pump_task is None:
+            self._pump_task = asyncio.run_coroutine_threadsafe(self._pump(), self._loop)
+        return self
+
+    # Function to queue a message; blocks when the queue is full (backpressure)
+    def submit(self, chat_id, message, context=None, block=True, timeout=None):
+        if not self._slots.acquire(blocking=block, timeout=timeout):
+            return False
+        self._waiting.append((chat_id, message, context))
+        self._loop.call_soon_threadsafe(self._ready.set)
+        return True
+
+    @property
+    def queue_depth(self):
+        return len(self._waiting) + len(self._tasks)
+
+    # Function to move queued messages into tasks as in-flight slots free up
+    async def _pump(self):
+        while True:
+            while not self._waiting:
+                self._ready.clear()
+                await self._ready.wait()
+            job = self._waiting.popleft()
+            if job is None:
+                return
+            self._slots.release()
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._send(*job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, chat_id, message, context):
+        try:
+            try:
+                success, description = await self._deliver(chat_id, message)
+            except Exception as e:
+                success, description = False, f"Error sending message: {str(e)}"
+            if self.metrics is not None:
+                self.metrics.record_result(success, description)
+            if self.on_result is not None:
+                self.on_result(chat_id, success, description, context)
+        finally:
+            self._semaphore.release()
+
+    async def _deliver(self, chat_id, message):
+        attempt = 0
+        while True:
+            delay = self._slot_delay(chat_id)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            result = await self.client.send_message(chat_id, message)
+            if self._attempt_done(result, attempt, started):
+                return result[:2]
+            delay = self._retry_delay(result[2], attempt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    # Function (on the loop) to wait until everything queued so far has been
+    # attempted, then stop the pump and close the client
+    async def aclose(self):
+        self._waiting.append(None)
+        self._ready.set()
+        await asyncio.wrap_future(self._pump_task)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        await self.client.close()
+
+
+class AsyncDispatcher(Dispatcher):
+    """Dispatcher driven by an event loop instead of its own thread.
+
+    The heap and window are the Dispatcher's; the loop keeps a single timer
+    for the head of the heap (so a pending reminder costs one heap entry and
+    one dict slot, never a timer or task of its own). Store reads and the
+    callback are blocking, so they run in the loop's default executor and
+    the loop stays free for sends in flight.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop = None
+        self._wakeup = None
+        self._busy = None
+
+    def _notify(self):
+        super()._notify()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run_async(self):
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            self._wakeup = asyncio.Event()
+            self._loop = loop
+            self._running = True
+        while True:
+            if self._changed is not None:
+                await self._blocking(self._poll_changes)
+            if self._source is not None and self._needs_refill(self._clock()):
+                await self._blocking(self.refill)
+            with self._cond:
+                if not self._running:
+                    return
+                now = self._clock()
+                due = self._pop_due(now)
+                timeout = None if due else self._timeout(now)
+                self._wakeup.clear()
+            if due:
+                await self._blocking(self.fire, due)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # Function to run blocking work in the executor. If run_async is cancelled
+    # meanwhile the work still finishes; wait_idle() waits for it.
+    async def _blocking(self, fn, *args):
+        self._busy = self._loop.run_in_executor(None, fn, *args)
+        return await asyncio.shield(self._busy)
+
+    async def wait_idle(self):
+        if self._busy is not None:
+            await asyncio.wait([self._busy])
+
+
+class AsyncWorker(Worker):
+    """Worker whose dispatcher and senders run on one asyncio event loop.
+
+    Scheduling, outbox, misfire and tenant handling are the Worker's; the
+    difference is delivery. Instead of a fixed pool of threads per bot, each
+    message is a task and up to `max_in_flight` of them (across every bot)
+    can be waiting on Telegram or on a rate limit at once, each costing a
+    few kilobytes rather than a thread stack. Blocking store work runs in
+    the loop's executor.
+    """
+
+    def __init__(self, store, max_in_flight=MAX_IN_FLIGHT, horizon=3600.0, poll_interval=1.0, **kwargs):
+        super().__init__(store, horizon=horizon, poll_interval=poll_interval, **kwargs)
+        self.max_in_flight = max_in_flight
+        self._loop = None
+        self._semaphore = None
+        self.dispatcher = AsyncDispatcher(
+            self.fire_due_reminders,
+            source=lambda start, until: store.due_between(start, until, self._tenants),
+            horizon=horizon,
+            changed=self._store_changed,
+            poll_interval=poll_interval,
+        )
+
+    def _make_client(self, token):
+        return AsyncTelegramClient(token, api_base=self.api_base)
+
+    def _make_sender(self, client, on_result):
+        return AsyncSender(client, self._loop, self._semaphore, on_result=on_result, metrics=self.metrics).start()
+
+    def run(self, reporter=None):
+        try:
+            asyncio.run(self.run_async(reporter))
+        except KeyboardInterrupt:
+            pass
+
+    async def run_async(self, reporter=None):
+        loop = self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        await loop.run_in_executor(None, self.reschedule_changed_zones)
+        await loop.run_in_executor(None, self.replay_outbox)
+        self._catch_up()
+        if reporter is not None:
+            reporter.start()
+        await loop.run_in_executor(None, self.dispatcher.refill)
+        shard = f" (shard {self.shard + 1} of {self.ring.shards})" if self.ring.shards > 1 else ""
+        print(f"Reminder worker (async) started on {self.store.path}{shard}")
+        try:
+            await self.dispatcher.run_async()
+        finally:
+            self.dispatcher.stop()
+            await self.dispatcher.wait_idle()
+            await loop.run_in_executor(None, self._stop_threads)
+            for sender in list(self._senders.values()):
+                await sender.aclose()
+            await loop.run_in_executor(None, self.outbox.stop)
+            if reporter is not None:
+                reporter.stop()
+            print("Reminder worker stopped")
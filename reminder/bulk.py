@@ -0,0 +1,168 @@
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from reminder.recurrence import WEEKDAYS, next_fire_times
+from reminder.store import DEFAULT_TENANT
+from reminder.timezones import DEFAULT_TIMEZONE, is_valid_timezone
+
+# Columns of the bulk import/export format; only the first three are required
+BULK_COLUMNS = [
+    "receiver_chat_id", "frequency", "time", "receiver_name",
+    "sender_name", "day_of_week", "day_of_month", "date", "text", "due_date", "timezone",
+]
+REQUIRED_COLUMNS = ["receiver_chat_id", "frequency", "time"]
+FREQUENCIES = ["Daily", "Weekly", "Monthly", "One-time"]
+
+
+# Function to read a CSV or Parquet file (path or uploaded buffer) into a DataFrame
+def read_bulk_file(source, file_format=None):
+    name = getattr(source, "name", source if isinstance(source, str) else "")
+    if file_format is None:
+        file_format = "parquet" if str(name).lower().endswith(".parquet") else "csv"
+    if file_format == "parquet":
+        return pd.read_parquet(source)
+    # Read everything as text so chat ids and times keep their exact spelling
+    return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+
+# Function to validate rows in bulk; returns (valid rows, rejected rows with a reason)
+def validate_reminders(df, now=None):
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    df = df.reindex(columns=BULK_COLUMNS).reset_index(drop=True)
+    text_columns = [c for c in BULK_COLUMNS if c != "day_of_month"]
+    df[text_columns] = df[text_columns].fillna("").astype(str).apply(lambda col: col.str.strip())
+    df["frequency"] = df["frequency"].str.title().replace({"One-Time": "One-time", "Once": "One-time"})
+    df["day_of_week"] = df["day_of_week"].str.title()
+    # Parquet dates/times may come back as timestamps; keep just the part we need
+    df["date"] = df["date"].str.slice(0, 10)
+    df["due_date"] = df["due_date"].str.slice(0, 10)
+    df["timezone"] = df["timezone"].replace("", DEFAULT_TIMEZONE)
+    valid_timezone = df["timezone"].isin([zone for zone in df["timezone"].unique() if is_valid_timezone(zone)])
+
+    parsed_time = pd.to_datetime(df["time"], format="%H:%M", errors="coerce").fillna(
+        pd.to_datetime(df["time"], format="%H:%M:%S", errors="coerce"))
+    day_of_month = pd.to_numeric(df["day_of_month"], errors="coerce")
+    parsed_date = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
+    parsed_due = pd.to_datetime(df["due_date"], format="%Y-%m-%d", errors="coerce")
+
+    now = pd.Timestamp(now if now is not None else time.time(), unit="s", tz="UTC")
+    # One-time instants, localized one time zone at a time
+    local_at = parsed_date + (parsed_time - parsed_time.dt.normalize())
+    one_time_at = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+    for zone, rows in df[valid_timezone].groupby("timezone").groups.items():
+        one_time_at[rows] = local_at[rows].dt.tz_localize(zone, ambiguous=True, nonexistent="shift_forward")
+
+    frequency = df["frequency"]
+    checks = [
+        (df["receiver_chat_id"] == "", "missing receiver_chat_id"),
+        (~frequency.isin(FREQUENCIES), "frequency must be one of " + ", ".join(FREQUENCIES)),
+        (parsed_time.isna(), "time must be HH:MM (24-hour, recipient's local time)"),
+        (~valid_timezone, "timezone must be an IANA name such as Asia/Kolkata"),
+        ((frequency == "Weekly") & ~df["day_of_week"].isin(WEEKDAYS), "day_of_week must be Monday..Sunday"),
+        ((frequency == "Monthly") & ~(day_of_month.between(1, 31) & (day_of_month % 1 == 0)),
+         "day_of_month must be 1..31"),
+        ((frequency == "One-time") & parsed_date.isna(), "date must be YYYY-MM-DD"),
+        ((frequency == "One-time") & (one_time_at <= now), "the scheduled time has already passed"),
+        ((df["due_date"] != "") & parsed_due.isna(), "due_date must be YYYY-MM-DD"),
+    ]
+    # First failing check per row, evaluated column-wise over the whole frame
+    reason = np.select([mask.fillna(True).to_numpy() for mask, _ in checks],
+                       [message for _, message in checks], default="")
+    bad = reason != ""
+
+    valid = df[~bad].copy()
+    valid["time"] = parsed_time[~bad].dt.strftime("%H:%M")
+    valid["day_of_month"] = day_of_month.where(frequency == "Monthly")[~bad].astype("Int64")
+    valid["one_time_at"] = one_time_at[~bad]
+
+    rejected = df[bad].copy()
+    rejected.insert(0, "row", rejected.index + 1)
+    rejected["error"] = reason[bad]
+    return valid, rejected
+
+
+# Function to turn validated rows into reminder dicts with their first fire instant
+def build_reminders(valid, now=None):
+    now = time.time() if now is None else now
+    if valid.empty:
+        return []
+
+    # Schedule descriptions are left empty and worked out when shown
+    # (recurrence.describe_schedule), so a large import stores less per row
+    frequency = valid["frequency"]
+    weekly = frequency == "Weekly"
+    monthly = frequency == "Monthly"
+    once = frequency == "One-time"
+    scheduled_iso = pd.Series(None, index=valid.index, dtype=object)
+    once_rows = valid[once]
+    scheduled_iso[once] = [
+        ts.tz_convert(zone).isoformat() for ts, zone in zip(once_rows["one_time_at"], once_rows["timezone"])
+    ]
+
+    frame = pd.DataFrame({
+        "type": "Medication",
+        "text": valid["text"],
+        "frequency": frequency,
+        "sender_name": valid["sender_name"],
+        "receiver_name": valid["receiver_name"],
+        "receiver_chat_id": valid["receiver_chat_id"],
+        "timezone": valid["timezone"],
+        "due_date": valid["due_date"].where(valid["due_date"] != "", None),
+        "active": True,
+        "selected_time_ist": valid["time"],
+        "day_of_week": valid["day_of_week"].where(weekly, None),
+        "day_of_month": valid["day_of_month"].where(monthly, None),
+        "scheduled_datetime_ist": scheduled_iso,
+    })
+    reminders = frame.astype(object).where(frame.notna(), None).to_dict("records")
+    for reminder in reminders:
+        if reminder["day_of_month"] is not None:
+            reminder["day_of_month"] = int(reminder["day_of_month"])
+
+    for reminder, fire_at in zip(reminders, next_fire_times(reminders, now)):
+        reminder["next_fire_at"] = fire_at
+    return reminders
+
+
+# Function to import a bulk file into the store (for `tenant`, or the default
+# tenant) in one transaction. Returns (number imported, DataFrame of rejected rows).
+def import_reminders(store, source, file_format=None, now=None, tenant=None):
+    now = time.time() if now is None else now
+    valid, rejected = validate_reminders(read_bulk_file(source, file_format), now)
+    reminders = build_reminders(valid, now)
+    for reminder in reminders:
+        reminder["tenant"] = tenant
+    store.add_many(reminders)
+    return len(reminders), rejected
+
+
+# Function to export the current schedule of `tenant` (or the default tenant)
+# in the import format (CSV or Parquet bytes). Only active reminders are
+# exported: the format has no active column, so paused and already-sent
+# one-time reminders would come back active on re-import.
+def export_reminders(store, file_format="csv", tenant=None):
+    df = pd.DataFrame(store.list(tenant=DEFAULT_TENANT if tenant is None else tenant, active=True))
+    if not df.empty:
+        # Group reminders have no single chat id and are not part of the bulk format
+        df = df[df["audience"].isna()]
+    if df.empty:
+        df = pd.DataFrame(columns=BULK_COLUMNS)
+    else:
+        once = df["frequency"] == "One-time"
+        scheduled = df["scheduled_datetime_ist"].where(once, None)
+        df["time"] = df["selected_time_ist"]
+        df["date"] = scheduled.str.slice(0, 10).fillna("")
+        df["day_of_month"] = pd.to_numeric(df["day_of_month"]).astype("Int64")
+        df = df[BULK_COLUMNS]
+
+    if file_format == "parquet":
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return df.to_csv(index=False).encode()
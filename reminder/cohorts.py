@@ -0,0 +1,77 @@
+import json
+from datetime import date, timedelta
+
+# A pregnancy is counted as 40 weeks (280 days) ending on the due date
+PREGNANCY_DAYS = 280
+
+# Gestational weeks (inclusive) covered by each trimester
+TRIMESTERS = {1: (0, 13), 2: (14, 27), 3: (28, 42)}
+
+# Recipients fetched from the store per round trip when a group fires
+CHUNK_SIZE = 1000
+
+# A group reminder's audience is stored as JSON on the reminder, either
+#     {"weeks": [first, last]}  everyone whose due date puts them in those
+#                               gestational weeks on the day it fires, or
+#     {"members": true}         the chat ids listed for it in group_members.
+
+
+# Function to get the gestational week on `today` for a due date (ISO string or date)
+def gestational_week(due_date, today):
+    if isinstance(due_date, str):
+        due_date = date.fromisoformat(due_date[:10])
+    return (PREGNANCY_DAYS - (due_date - today).days) // 7
+
+
+# Function to get the due dates (ISO, inclusive) that put a pregnancy in weeks
+# [first_week, last_week] on `today`
+def due_date_window(first_week, last_week, today):
+    start = today + timedelta(days=PREGNANCY_DAYS - 7 * last_week - 6)
+    end = today + timedelta(days=PREGNANCY_DAYS - 7 * first_week)
+    return start.isoformat(), end.isoformat()
+
+
+def weeks_audience(first_week, last_week):
+    return json.dumps({"weeks": [int(first_week), int(last_week)]})
+
+
+def members_audience():
+    return json.dumps({"members": True})
+
+
+# Function to describe an audience for schedule displays
+def audience_label(audience):
+    audience = json.loads(audience)
+    if "weeks" in audience:
+        first_week, last_week = audience["weeks"]
+        for trimester, weeks in TRIMESTERS.items():
+            if weeks == (first_week, last_week):
+                return f"Trimester {trimester} (weeks {first_week}-{last_week})"
+        return f"Weeks {first_week}-{last_week}"
+    return "Group"
+
+
+# Function to stream a group reminder's recipients in chunks. Only one chunk is
+# held at a time (keyset paging over an index), so memory stays flat however
+# large the group is. `today` is the fire date in the reminder's time zone;
+# only recipients of the reminder's own tenant are included.
+def iter_recipients(store, reminder, today, chunk_size=CHUNK_SIZE):
+    audience = json.loads(reminder['audience'])
+    if "weeks" in audience:
+        start, end = due_date_window(*audience["weeks"], today)
+        after = None
+        while True:
+            chunk = store.recipients_due_between(start, end, after=after, limit=chunk_size,
+                                                 tenant=reminder['tenant'])
+            if not chunk:
+                return
+            yield chunk
+            after = (chunk[-1]['due_date'], chunk[-1]['chat_id'])
+    else:
+        after = ""
+        while True:
+            chunk = store.group_members(reminder['id'], after=after, limit=chunk_size, tenant=reminder['tenant'])
+            if not chunk:
+                return
+            yield chunk
+            after = chunk[-1]['chat_id']
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import numpy as np
+
+from reminder.cohorts import PREGNANCY_DAYS
+from reminder.messages import medication_message_templates, week_message_templates
+from reminder.recurrence import DAY, days_from_civil
+from reminder.timezones import zone_table
+
+# Last week of pregnancy with its own message set
+MAX_WEEK = 42
+
+GENERAL_TEMPLATES = tuple(medication_message_templates)
+
+
+# Function to build the week -> templates index once at import. Each entry is a
+# shared tuple, so a send only does one list index to find its message set.
+def _build_week_index():
+    index = [GENERAL_TEMPLATES] * (MAX_WEEK + 1)
+    for (first_week, last_week), templates in week_message_templates.items():
+        for week in range(first_week, last_week + 1):
+            index[week] = tuple(templates)
+    return tuple(index)
+
+
+WEEK_TEMPLATES = _build_week_index()
+
+
+# Function to turn an ISO due date into days since the Unix epoch (None if unusable)
+def due_day(due_date):
+    try:
+        y, m, d = due_date[:10].split("-")
+        return days_from_civil(int(y), int(m), int(d))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+# zone -> (today's local day number, UTC second at which it may end)
+_today = {}
+
+
+# Function to get the current (or `at`'s) day number in a time zone's local
+# calendar. Today's is kept per zone until local midnight or the zone's next
+# offset change, whichever comes first, so a per-message render skips the lookup.
+def local_day(timezone=None, at=None):
+    if at is not None:
+        return zone_table(timezone).to_local(int(at)) // DAY
+    now = time.time()
+    cached = _today.get(timezone)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+    table = zone_table(timezone)
+    utc = int(now)
+    local = table.to_local(utc)
+    until = utc + DAY - local % DAY
+    changes = table.transitions_between(utc + 1, until)
+    _today[timezone] = (local // DAY, changes[0] if changes else until)
+    return local // DAY
+
+
+# Function to get the message set for a gestational week (the general set outside 0-42)
+def templates_for_week(week):
+    if week is None or week < 0 or week > MAX_WEEK:
+        return GENERAL_TEMPLATES
+    return WEEK_TEMPLATES[week]
+
+
+class StageCache:
+    """Message set per due date, worked out lazily and kept for the day.
+
+    A send is one dict lookup from due date to its week's template tuple. The
+    first lookup of a new day recomputes every cached entry in one NumPy pass
+    instead of entry by entry on each send. Lookups for an earlier day (a
+    recipient in a zone that has not reached midnight yet) are computed
+    without touching the cache.
+    """
+
+    def __init__(self, maxsize=200_000):
+        self.maxsize = maxsize
+        self.day = None
+        self._due_days = {}
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    # Function to get the gestational week for a due date on `day`, or None
+    def week(self, due_date, day):
+        due = self._due_day(due_date)
+        return None if due is None else (PREGNANCY_DAYS - (due - day)) // 7
+
+    # Function to get the templates to pick from for a due date on `day`
+    def templates(self, due_date, day):
+        if day == self.day:
+            templates = self._templates.get(due_date)
+            if templates is not None:
+                return templates
+        if not due_date:
+            return GENERAL_TEMPLATES
+        if self.day is not None and day < self.day:
+            return templates_for_week(self.week(due_date, day))
+        if day != self.day:
+            self.refresh(day)
+        templates = templates_for_week(self.week(due_date, day))
+        with self._lock:
+            # A refresh to a later day may have run meanwhile
+            if day == self.day:
+                if len(self._templates) >= self.maxsize:
+                    self._templates = {}
+                self._templates[due_date] = templates
+        return templates
+
+    # Function to get the due date -> templates map for `day`, for callers that
+    # look up many recipients at once (fall back to templates() on a miss)
+    def for_day(self, day):
+        if self.day is None or day > self.day:
+            self.refresh(day)
+        return self._templates if day == self.day else {}
+
+    # Function to move the cache to a new day, recomputing all known entries at once
+    def refresh(self, day):
+        with self._lock:
+            if self.day is not None and day <= self.day:
+                return
+            keys = [k for k, v in self._due_days.items() if v is not None]
+            due_days = np.fromiter((self._due_days[k] for k in keys), dtype=np.int64, count=len(keys))
+            weeks = (PREGNANCY_DAYS - (due_days - day)) // 7
+            self._templates = {k: templates_for_week(week) for k, week in zip(keys, weeks.tolist())}
+            self._templates.update((k, GENERAL_TEMPLATES) for k, v in self._due_days.items() if v is None)
+            self._templates.update({None: GENERAL_TEMPLATES, "": GENERAL_TEMPLATES})
+            self.day = day
+
+    def _due_day(self, due_date):
+        value = self._due_days.get(due_date)
+        if value is None and due_date not in self._due_days:
+            value = due_day(due_date)
+            with self._lock:
+                if len(self._due_days) >= self.maxsize:
+                    # A new dict, so a refresh iterating the old one is not disturbed
+                    self._due_days = {}
+                self._due_days[due_date] = value
+        return value
+
+
+# Shared by every render in the process
+stages = StageCache()
@@ -0,0 +1,223 @@
+import os
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Bot API server; $TELEGRAM_API_BASE points the app at another one (a local
+# Bot API server, or the fake one in benchmarks/)
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org")
+
+# Telegram's documented limits: about 30 messages per second per bot overall,
+# one message per second to a private chat and 20 per minute to a group
+GLOBAL_RATE = 30.0
+PRIVATE_CHAT_RATE = 1.0
+GROUP_CHAT_RATE = 20.0 / 60.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    `reserve()` always takes a token and returns how long the caller must wait
+    before using it, so concurrent callers queue up fairly instead of spinning.
+    """
+
+    def __init__(self, rate, capacity=1.0, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    @property
+    def idle(self):
+        with self._lock:
+            return self._tokens + (self._clock() - self._updated) * self.rate >= self.capacity
+
+
+class TelegramClient:
+    """Bot API client that keeps connections alive in a pooled requests.Session."""
+
+    def __init__(self, token, api_base=TELEGRAM_API_BASE, pool_size=16, timeout=10):
+        self.token = token
+        self.api_base = api_base.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # Function to call a Bot API method; returns (status_code, response_json)
+    def call(self, method, params):
+        url = f"{self.api_base}/bot{self.token}/{method}"
+        response = self.session.post(url, data=params, timeout=self.timeout)
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = {'ok': False, 'description': f"HTTP {response.status_code}"}
+        return response.status_code, response_json
+
+    # Function to send a message; returns (success, description, retry_after, retryable)
+    def send_message(self, chat_id, message):
+        try:
+            status_code, response_json = self.call("sendMessage", {
+                'chat_id': chat_id,
+                'text': message,
+                'parse_mode': 'HTML'  # Allow some HTML formatting
+            })
+        except requests.RequestException as e:
+            return False, f"Error sending message: {str(e)}", None, True
+
+        if status_code == 200 and response_json.get('ok'):
+            return True, "Message sent successfully!", None, False
+
+        error_description = response_json.get('description', 'Unknown error')
+        retry_after = (response_json.get('parameters') or {}).get('retry_after')
+        retryable = status_code == 429 or status_code >= 500
+        return False, f"Failed to send message: {error_description}", retry_after, retryable
+
+    def close(self):
+        self.session.close()
+
+
+class Sender:
+    """Delivery stage: a bounded queue drained by a pool of worker threads.
+
+    Sends are paced by a global token bucket plus one bucket per chat. A 429
+    pauses every worker for the `retry_after` Telegram asks for; network
+    errors and 5xx responses are retried with exponential backoff.
+    `on_result(chat_id, success, description, context)` is called once per
+    message after its final attempt. A reminder.metrics.Metrics, if given,
+    records every attempt's latency, retries and final outcomes.
+    """
+
+    def __init__(self, client, workers=8, queue_size=1000, global_rate=GLOBAL_RATE,
+                 private_chat_rate=PRIVATE_CHAT_RATE, group_chat_rate=GROUP_CHAT_RATE,
+                 max_retries=3, backoff=1.0, on_result=None, metrics=None):
+        self.client = client
+        self.metrics = metrics
+        self.private_chat_rate = private_chat_rate
+        self.group_chat_rate = group_chat_rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.on_result = on_result
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_buckets = {}
+        self._chat_lock = threading.Lock()
+        self._paused_until = 0.0
+        self._workers = [
+            threading.Thread(target=self._work, name=f"reminder-sender-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            for worker in self._workers:
+                worker.start()
+        return self
+
+    # Function to queue a message; blocks when the queue is full (backpressure)
+    def submit(self, chat_id, message, context=None, block=True, timeout=None):
+        try:
+            self._queue.put((chat_id, message, context), block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    # Function to wait until everything queued so far has been attempted
+    def join(self):
+        self._queue.join()
+
+    def stop(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.join()
+        self._started = False
+
+    def _chat_bucket(self, chat_id):
+        with self._chat_lock:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                # Drop buckets of chats that have been quiet long enough to be full again
+                if len(self._chat_buckets) > 10000:
+                    self._chat_buckets = {k: b for k, b in self._chat_buckets.items() if not b.idle}
+                rate = self.group_chat_rate if str(chat_id).startswith('-') else self.private_chat_rate
+                bucket = self._chat_buckets[chat_id] = TokenBucket(rate)
+            return bucket
+
+    # Function to reserve a send slot for a chat; returns how long to wait for it
+    def _slot_delay(self, chat_id):
+        delay = max(self._chat_bucket(chat_id).reserve(), self._global_bucket.reserve())
+        return max(delay, self._paused_until - time.monotonic())
+
+    # Function to judge one attempt: True when it is final (recording its latency)
+    def _attempt_done(self, result, attempt, started):
+        success, _, _, retryable = result
+        # Client errors (bad chat id, bot blocked, ...) will not succeed on retry
+        done = success or not retryable or attempt >= self.max_retries
+        if self.metrics is not None:
+            self.metrics.record_send_attempt(time.monotonic() - started, retry=not done)
+        return done
+
+    # Function to get how long to back off before retrying a failed attempt
+    def _retry_delay(self, retry_after, attempt):
+        if retry_after is None:
+            return self.backoff * (2 ** attempt)
+        # Flood control applies to the whole bot, so hold every worker
+        self._paused_until = max(self._paused_until, time.monotonic() + float(retry_after))
+        return 0.0
+
+    def _deliver(self, chat_id, message):
+        attempt = 0
+        while True:
+            delay = self._slot_delay(chat_id)
+            if delay > 0:
+                time.sleep(delay)
+            started = time.monotonic()
+            result = self.client.send_message(chat_id, message)
+            if self._attempt_done(result, attempt, started):
+                return result[:2]
+            delay = self._retry_delay(result[2], attempt)
+            if delay > 0:
+                time.sleep(delay)
+            attempt += 1
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                chat_id, message, context = job
+                try:
+                    success, description = self._deliver(chat_id, message)
+                except Exception as e:
+                    success, description = False, f"Error sending message: {str(e)}"
+                if self.metrics is not None:
+                    self.metrics.record_result(success, description)
+                if self.on_result is not None:
+                    self.on_result(chat_id, success, description, context)
+            finally:
+                self._queue.task_done()
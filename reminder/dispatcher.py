@@ -0,0 +1,271 @@
+import heapq
+import threading
+import time
+
+
+class Dispatcher:
+    """Fires reminders at their next-fire instant from a min-heap.
+
+    Entries are keyed by UTC epoch seconds. The dispatch thread sleeps until
+    the earliest entry is due and is woken early whenever the head of the heap
+    may have changed (a reminder added or removed).
+
+    `callback(due)` receives every (reminder_id, fire_at) pair that came due in
+    one tick and returns an iterable of (reminder_id, next_fire_at) pairs to put
+    back on the heap.
+
+    With a `source`, the heap only holds reminders due within `horizon` seconds.
+    `source(start, until)` returns the (reminder_id, fire_at) pairs due in
+    [start, until) (start is None on the first load) and is called again as the
+    window slides forward, so a large store is never loaded in one go.
+
+    `changed()`, if given, is polled every `poll_interval` seconds from the
+    dispatch thread; when it returns True the window is dropped and reloaded so
+    reminders written by another process are picked up.
+
+    A failed load keeps the current window and is retried with backoff; a
+    tick whose callback fails is held back and fired again after a delay.
+    """
+
+    # Rebuild the heap once this fraction of it is made of removed entries
+    COMPACT_RATIO = 0.5
+    # Seconds before retrying a failed load or tick, doubling per failure up to the maximum
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, callback, clock=time.time, source=None, horizon=3600.0,
+                 changed=None, poll_interval=1.0):
+        self._callback = callback
+        self._clock = clock
+        self._source = source
+        self._horizon = horizon
+        self._changed = changed
+        self._poll_interval = poll_interval
+        self._next_poll = 0.0
+        # Everything due before this instant has been loaded from the source
+        self._loaded_until = None
+        # When to retry a failed load, and how many loads have failed in a row
+        self._retry_at = None
+        self._load_failures = 0
+        # Due entries of failed ticks, fired again once `_held_until` passes
+        self._held = []
+        self._held_until = None
+        self._fire_failures = 0
+        self._heap = []
+        # reminder_id -> fire_at of its live heap entry; anything else on the
+        # heap is stale and dropped when popped (lazy deletion)
+        self._entries = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Function to schedule (or reschedule) a reminder at an epoch instant
+    def add(self, reminder_id, fire_at):
+        with self._cond:
+            if not self._push(reminder_id, fire_at):
+                return
+            if self._heap[0][1] == reminder_id:
+                self._notify()
+
+    # Function to schedule many reminders with a single heapify
+    def add_many(self, items):
+        with self._cond:
+            for reminder_id, fire_at in items:
+                if self._in_window(fire_at):
+                    self._entries[reminder_id] = fire_at
+                    self._heap.append((fire_at, reminder_id))
+                else:
+                    self._entries.pop(reminder_id, None)
+            heapq.heapify(self._heap)
+            self._notify()
+
+    # Function to unschedule a reminder
+    def remove(self, reminder_id):
+        with self._cond:
+            if self._entries.pop(reminder_id, None) is None:
+                return False
+            self._maybe_compact()
+            self._notify()
+            return True
+
+    def next_fire_at(self, reminder_id):
+        return self._entries.get(reminder_id)
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self._thread
+            self._running = True
+        self._thread = threading.Thread(target=self.run, name="reminder-dispatcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._running = False
+            self._notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # Main loop: sleep until the head is due, then fire everything that is due
+    def run(self):
+        with self._cond:
+            self._running = True
+        while True:
+            if self._changed is not None:
+                self._poll_changes()
+            if self._source is not None and self._needs_refill(self._clock()):
+                self.refill()
+            with self._cond:
+                if not self._running:
+                    return
+                now = self._clock()
+                due = self._pop_due(now)
+                if not due:
+                    self._cond.wait(self._timeout(now))
+                    continue
+            self.fire(due)
+
+    # Function to get how long the loop may sleep: until the head is due, the
+    # window needs a refill or the source is due a change check (None: forever)
+    def _timeout(self, now):
+        timeout = self._heap[0][0] - now if self._heap else None
+        if self._held:
+            held_in = self._held_until - now
+            timeout = held_in if timeout is None else min(timeout, held_in)
+        if self._source is not None:
+            if self._retry_at is not None:
+                refill_in = self._retry_at - now
+            elif self._loaded_until is None:
+                refill_in = 0.0
+            else:
+                refill_in = self._loaded_until - self._horizon / 2 - now
+            timeout = refill_in if timeout is None else min(timeout, refill_in)
+        if self._changed is not None:
+            poll_in = self._next_poll - now
+            timeout = poll_in if timeout is None else min(timeout, poll_in)
+        return timeout
+
+    # Function to wake the loop; called with the condition held
+    def _notify(self):
+        self._cond.notify()
+
+    # Function to load the next window of reminders from the source
+    def refill(self):
+        start = self._loaded_until
+        until = self._clock() + self._horizon
+        try:
+            items = self._source(start, until)
+        except Exception as e:
+            with self._cond:
+                self._load_failures += 1
+                delay = self._retry_delay(self._load_failures)
+                self._retry_at = self._clock() + delay
+            print(f"Dispatcher failed to load reminders due before {until}: {e}; retrying in {delay:g}s")
+            return
+        with self._cond:
+            self._retry_at = None
+            self._load_failures = 0
+            self._loaded_until = until
+            for reminder_id, fire_at in items:
+                # Keep entries that were rescheduled in memory after the query ran
+                if reminder_id not in self._entries:
+                    self._entries[reminder_id] = fire_at
+                    self._heap.append((fire_at, reminder_id))
+            heapq.heapify(self._heap)
+            self._notify()
+
+    # Function to drop everything in memory so the next refill starts from scratch
+    def reload(self):
+        with self._cond:
+            self._heap = []
+            self._entries = {}
+            self._loaded_until = None
+            self._held = []
+            self._notify()
+
+    def _poll_changes(self):
+        now = self._clock()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + self._poll_interval
+        try:
+            changed = self._changed()
+        except Exception as e:
+            print(f"Dispatcher failed to check for changes: {e}")
+            return
+        if changed and self._source is not None:
+            self.reload()
+
+    def _needs_refill(self, now):
+        if self._retry_at is not None and now < self._retry_at:
+            return False
+        return self._loaded_until is None or now + self._horizon / 2 >= self._loaded_until
+
+    def _retry_delay(self, failures):
+        return min(self.MAX_RETRY_DELAY, self.RETRY_DELAY * 2 ** (failures - 1))
+
+    def _in_window(self, fire_at):
+        if self._source is None:
+            return True
+        return self._loaded_until is not None and fire_at < self._loaded_until
+
+    # Function to run the callback for one tick and requeue recurring reminders
+    def fire(self, due):
+        try:
+            rescheduled = self._callback(due) or ()
+        except Exception as e:
+            # The entries are already off the heap and the source only loads
+            # ahead of the window, so hold them for another try
+            with self._cond:
+                self._fire_failures += 1
+                delay = self._retry_delay(self._fire_failures)
+                self._held.extend(due)
+                self._held_until = self._clock() + delay
+                self._notify()
+            print(f"Dispatcher callback failed for {len(due)} reminder(s): {e}; retrying in {delay:g}s")
+            return
+        with self._cond:
+            self._fire_failures = 0
+            for reminder_id, next_fire_at in rescheduled:
+                # Skip ids that were re-added by someone else while firing
+                if next_fire_at is not None and reminder_id not in self._entries:
+                    self._push(reminder_id, next_fire_at)
+            self._notify()
+
+    # Function to put an entry on the heap; entries beyond the loaded window are
+    # left to the source and only drop any stale in-memory entry
+    def _push(self, reminder_id, fire_at):
+        if not self._in_window(fire_at):
+            self._entries.pop(reminder_id, None)
+            return False
+        self._entries[reminder_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, reminder_id))
+        self._maybe_compact()
+        return True
+
+    def _pop_due(self, now):
+        due = []
+        heap = self._heap
+        entries = self._entries
+        while heap and heap[0][0] <= now:
+            fire_at, reminder_id = heapq.heappop(heap)
+            if entries.get(reminder_id) == fire_at:
+                del entries[reminder_id]
+                due.append((reminder_id, fire_at))
+        if self._held and self._held_until <= now:
+            # Skip held entries that were scheduled again meanwhile
+            due.extend(entry for entry in self._held if entry[0] not in entries)
+            self._held = []
+        # Drop stale entries sitting at the head so the sleep timeout is exact
+        while heap and entries.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return due
+
+    def _maybe_compact(self):
+        if len(self._heap) > 64 and len(self._entries) < len(self._heap) * self.COMPACT_RATIO:
+            self._heap = [(fire_at, reminder_id) for reminder_id, fire_at in self._entries.items()]
+            heapq.heapify(self._heap)
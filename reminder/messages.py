@@ -0,0 +1,82 @@
+# Enhanced Medication message templates with more variety
+medication_message_templates = [
+    "Hello beautiful! 💕 It's time for your daily prenatal vitamins. These little nutrients are doing big work helping your baby grow strong and healthy!",
+
+    "Sending you warm thoughts today! ✨ Just a friendly reminder about your prenatal vitamins/medication. Taking care of yourself means taking care of your little miracle too!",
+
+    "Hope your day is going wonderfully! 💖 This is your gentle reminder to take your medication - a small act with a big impact on your baby's development.",
+
+    "Good day, mom-to-be! 💫 Time for your prenatal vitamins - they're helping to build your baby's bones, brain, and body systems right now!",
+
+    "Hello lovely! 🌷 Just a caring reminder that your medication/vitamins are waiting for you. Your commitment to your health supports your little one's growth journey!",
+
+    "Thinking of you both today! 👼 Remember those prenatal vitamins that help prevent neural tube defects and support healthy development? It's time for them!",
+
+    "Sending a gentle nudge about your medication! 🌟 These important nutrients are supporting your baby's development right now in ways you can't see but will definitely benefit from!",
+
+    "Hi there beautiful mom-to-be! 💝 Your medication reminder has arrived - these vitamins are particularly important during pregnancy when your nutritional needs increase.",
+
+    "A friendly reminder with love! 💊 Your prenatal vitamins are essential partners on this incredible journey - they're helping your baby develop properly every day!",
+
+    "Hello sunshine! ☀️ Don't forget your medication today - it's providing important nutrients like folic acid, iron, calcium, and DHA that your growing baby needs!",
+
+    "Gentle reminder time! 🕒 Your vitamins are waiting - they're supporting your immune system while you work on the amazing job of growing your little miracle!",
+
+    "Thinking of you and your precious cargo! 🚢 Time to take your prenatal vitamins - they're helping prevent anemia and other complications while supporting healthy growth!",
+
+    "Hello wonderful! 🌈 This is your medication reminder - consistent vitamin intake helps ensure your baby gets all the nutrients needed for optimal development!",
+
+    "Special delivery! 📬 Your friendly reminder to take your prenatal medication - it's providing essential nutrients that might be hard to get enough of from diet alone!",
+
+    "Sending care your way! 💗 Your medication reminder has arrived - these supplements are especially important when growing your precious little one!"
+]
+
+# Stage-specific templates, keyed by the (first, last) week of pregnancy they fit.
+# Weeks with no set of their own use medication_message_templates.
+week_message_templates = {
+    (0, 12): [
+        "Hello beautiful! 🌱 These early weeks are when your baby's neural tube forms - your folic acid and prenatal vitamins are doing their most important work right now. Time for today's dose!",
+
+        "Gentle reminder, mom-to-be! 💕 If the mornings feel rough, taking your vitamins with a small snack can help. Your little one is growing fast this first trimester!",
+
+        "Thinking of you today! ✨ Your baby's heart has started beating and every organ is taking shape. Your prenatal vitamins are helping build it all - don't forget them today!",
+
+        "A caring nudge! 🌷 The first trimester asks a lot of your body. Keep up your folic acid and medication - small steps now protect your baby's development.",
+    ],
+    (13, 20): [
+        "Hello sunshine! ☀️ Welcome to the second trimester - your baby's bones are hardening, so your calcium and vitamins matter more than ever. Time for today's dose!",
+
+        "Friendly reminder! 💖 Your little one can now hear muffled sounds - tell them it's vitamin time! Your iron and prenatal vitamins support your growing blood supply.",
+
+        "Hi lovely! 🌸 Many moms feel more energetic around now. Keep that momentum going with your medication - it's helping your baby grow stronger every day.",
+
+        "Sending warm thoughts! 🤗 Your baby is busy growing fingerprints and tiny nails. Your prenatal vitamins are right there helping - please take them today!",
+    ],
+    (21, 27): [
+        "Hello wonderful! 🌈 Have you felt those little kicks? Your baby's brain and lungs are developing quickly, and your DHA and vitamins are helping. Time for today's dose!",
+
+        "Gentle reminder time! 🕒 Iron needs climb in these weeks as your blood volume grows. Taking your medication helps keep you and your baby energized.",
+
+        "Thinking of you both! 👼 Your baby is practicing breathing movements now. Keep supporting that amazing development with today's vitamins.",
+
+        "A loving nudge! 💝 You're nearing the third trimester - consistent vitamins now help prevent anemia later on. Please don't skip today's dose!",
+    ],
+    (28, 35): [
+        "Hello strong mama! 💪 Third trimester! Your baby is gaining weight and storing iron for after birth - your medication is helping fill those stores. Time for today's dose!",
+
+        "Friendly reminder! 🌟 Your baby's brain is growing rapidly now, and DHA and your prenatal vitamins are fueling it. Take a moment for your medication today.",
+
+        "Sending you calm and care! 🌙 Heartburn and busy nights are common now - if your vitamins bother you, try taking them with dinner. Your baby is almost ready to meet you!",
+
+        "Hi beautiful! 🍼 Your little one's bones are fully formed and getting stronger with the calcium you take in. Keep it up with today's medication!",
+    ],
+    (36, 42): [
+        "Hello mama! 🎀 The big day is close! Keep taking your vitamins right to the end - your baby is still building reserves for their first weeks.",
+
+        "Gentle reminder! 💐 You're in the home stretch. Staying on your medication keeps your iron up for delivery and recovery. Time for today's dose!",
+
+        "Thinking of you as you count down the days! ⏳ Your prenatal vitamins are still supporting your baby's final growth spurt - don't forget them today.",
+
+        "Almost there! 🌼 Your body is preparing for birth and your baby is getting ready too. A quick reminder to take your medication - you're doing amazingly!",
+    ],
+}
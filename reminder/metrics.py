@@ -0,0 +1,278 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bucket upper bounds in seconds
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SEND_BUCKETS = (0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0)
+
+# Error descriptions are labels; past this many distinct ones the rest count as "other"
+MAX_ERROR_LABELS = 50
+# Minutes of fire counts kept for the fires-per-minute series
+FIRE_HISTORY_MINUTES = 60
+
+
+# Function to get where the worker (or one shard of it) writes its stats file
+# for a given database
+def stats_path(db_path, shard=None):
+    base = os.path.splitext(db_path)[0]
+    return f"{base}-stats.json" if shard is None else f"{base}-stats-{shard}.json"
+
+
+# Function to list the stats files written for a database, one per shard when sharded
+def stats_paths(db_path):
+    paths = glob.glob(glob.escape(os.path.splitext(db_path)[0]) + "-stats*.json")
+    return sorted(paths, key=lambda path: (len(path), path))
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style (constant memory)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # Function to estimate a quantile by interpolating inside its bucket,
+    # as Prometheus' histogram_quantile does
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+    def snapshot(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """Counters and histograms for dispatch and delivery, shared across threads.
+
+    Gauges are callables sampled when a snapshot is taken, so the hot paths
+    only ever increment numbers under one lock.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started_at = clock()
+        self.lag = Histogram(LAG_BUCKETS)
+        self.send_latency = Histogram(SEND_BUCKETS)
+        self.fired = 0
+        self.skipped = 0
+        self.missed = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.errors = {}
+        self._fires_by_minute = deque(maxlen=FIRE_HISTORY_MINUTES)
+        self._gauges = {}
+
+    # Function to register a gauge, e.g. the sender queue depth
+    def gauge(self, name, fn):
+        self._gauges[name] = fn
+
+    # Function to record a dispatch tick: intended fire instants against now,
+    # with the unreachable chats skipped and the misfires dropped by policy
+    def record_fired(self, fire_ats, skipped=0, missed=0):
+        now = self._clock()
+        minute = int(now // 60) * 60
+        with self._lock:
+            for fire_at in fire_ats:
+                self.lag.observe(max(0.0, now - fire_at))
+            self.fired += len(fire_ats)
+            self.skipped += skipped
+            self.missed += missed
+            if self._fires_by_minute and self._fires_by_minute[-1][0] == minute:
+                self._fires_by_minute[-1][1] += len(fire_ats)
+            else:
+                self._fires_by_minute.append([minute, len(fire_ats)])
+
+    # Function to record messages not sent because their chat is unreachable
+    def record_skipped(self, count):
+        with self._lock:
+            self.skipped += count
+
+    # Function to record one sendMessage round trip
+    def record_send_attempt(self, seconds, retry=False):
+        with self._lock:
+            self.send_latency.observe(seconds)
+            if retry:
+                self.retries += 1
+
+    # Function to record the final outcome of one message
+    def record_result(self, success, description=None):
+        with self._lock:
+            if success:
+                self.sent += 1
+                return
+            self.failed += 1
+            label = (description or "Unknown error").replace("Failed to send message: ", "")
+            if label not in self.errors and len(self.errors) >= MAX_ERROR_LABELS:
+                label = "other"
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def snapshot(self):
+        gauges = {}
+        for name, fn in self._gauges.items():
+            try:
+                gauges[name] = fn()
+            except Exception:
+                gauges[name] = None
+        with self._lock:
+            return {
+                'updated_at': self._clock(),
+                'started_at': self.started_at,
+                'fired': self.fired,
+                'skipped': self.skipped,
+                'missed': self.missed,
+                'sent': self.sent,
+                'failed': self.failed,
+                'retries': self.retries,
+                'errors': dict(self.errors),
+                'fires_per_minute': [list(item) for item in self._fires_by_minute],
+                'lag': self.lag.snapshot(),
+                'send_latency': self.send_latency.snapshot(),
+                'gauges': gauges,
+            }
+
+    # Function to render the Prometheus text exposition format
+    def render_prometheus(self):
+        snap = self.snapshot()
+        lines = []
+
+        def counter(name, help_text, value):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"])
+
+        def histogram(name, help_text, hist):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+            cumulative = 0
+            for upper, count in zip(hist['buckets'], hist['counts']):
+                cumulative += count
+                lines.append(f'{name}_bucket{{le="{upper}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {hist["count"]}')
+            lines.append(f"{name}_sum {hist['sum']}")
+            lines.append(f"{name}_count {hist['count']}")
+
+        counter("reminder_fired_total", "Reminders fired by the dispatcher.", snap['fired'])
+        counter("reminder_skipped_total", "Reminders not sent because the chat is unreachable.", snap['skipped'])
+        counter("reminder_missed_total", "Late fires dropped by their misfire policy.", snap['missed'])
+        counter("reminder_sent_total", "Messages delivered.", snap['sent'])
+        counter("reminder_failed_total", "Messages that failed after all retries.", snap['failed'])
+        counter("reminder_send_retries_total", "sendMessage attempts that were retried.", snap['retries'])
+        lines.extend(["# HELP reminder_send_errors_total Failed messages by Telegram error description.",
+                      "# TYPE reminder_send_errors_total counter"])
+        for description, count in sorted(snap['errors'].items()):
+            escaped = description.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+            lines.append(f'reminder_send_errors_total{{description="{escaped}"}} {count}')
+        histogram("reminder_dispatch_lag_seconds", "Actual minus intended fire time.", snap['lag'])
+        histogram("reminder_send_latency_seconds", "sendMessage round-trip time.", snap['send_latency'])
+        for name, value in snap['gauges'].items():
+            if value is not None:
+                lines.extend([f"# TYPE {name} gauge", f"{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+    # Function to write the snapshot as JSON; the rename keeps readers from
+    # ever seeing a half-written file
+    def write_stats(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+
+# Function to read a stats file written by the worker; None if there is none yet
+def read_stats(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class MetricsReporter:
+    """Background thread that writes the stats file and, if given a port,
+    serves /metrics in the Prometheus text format."""
+
+    def __init__(self, metrics, path=None, interval=5.0, port=None, host="127.0.0.1"):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+            self._server.daemon_threads = True
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, name="reminder-metrics-http", daemon=True).start()
+        if self.path:
+            self._thread = threading.Thread(target=self._write_loop, name="reminder-metrics-file", daemon=True)
+            self._thread.start()
+        return self
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            self.metrics.write_stats(self.path)
+        except OSError as e:
+            print(f"Could not write stats file {self.path}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.path:
+            self._write()
@@ -0,0 +1,35 @@
+# What happens to a fire that runs later than its grace window (the worker
+# was down, or the dispatcher fell behind):
+#     fire_once  every missed occurrence is delivered, once each
+#     coalesce   all missed occurrences are delivered as one message
+#     skip       missed occurrences are dropped
+# In every case the reminder then carries on from its next future occurrence.
+# Late deliveries are not sent straight away; they are queued in the outbox
+# and released at the worker's bounded catch-up rate.
+FIRE_ONCE, COALESCE, SKIP = "fire_once", "coalesce", "skip"
+POLICIES = {
+    FIRE_ONCE: "Send each missed reminder",
+    COALESCE: "Send one reminder for all missed",
+    SKIP: "Skip missed reminders",
+}
+
+DEFAULT_POLICY = COALESCE
+# Seconds a fire may run late and still count as on time
+DEFAULT_GRACE = 900.0
+
+# What to do with one fire
+SEND, DEFER, DROP = "send", "defer", "drop"
+
+
+# Function to decide how to handle a fire at `now`. Returns (action, after):
+# the action for this fire and the instant to compute the next occurrence from.
+def plan_fire(reminder, fire_at, now):
+    grace = reminder.get('misfire_grace')
+    if now - fire_at <= (DEFAULT_GRACE if grace is None else grace):
+        return SEND, fire_at
+    policy = reminder.get('misfire_policy') or DEFAULT_POLICY
+    if policy == SKIP:
+        return DROP, now
+    if policy == COALESCE:
+        return DEFER, now
+    return DEFER, fire_at
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from reminder.store import FAILED, SENT
+
+# How many finished days of outbox history to keep
+RETENTION = 7 * 86400
+
+
+class OutboxWriter:
+    """Records send outcomes in the store's outbox in group-committed batches.
+
+    Sender threads only append to an in-memory buffer; a background thread
+    writes the buffer in one transaction every `interval` seconds (sooner once
+    `batch_size` outcomes are waiting). With SQLite in WAL mode and
+    synchronous=NORMAL a commit does not fsync, so durability costs one small
+    transaction per batch rather than one per message. A crash loses at most
+    the last unflushed batch of outcomes; those messages stay "pending" and are
+    sent again on replay, which is the only window for a duplicate.
+    """
+
+    def __init__(self, store, interval=0.2, batch_size=500):
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self._buffer = []
+        self._cond = threading.Condition()
+        # Held while a batch is written, so flush() returns only once everything
+        # recorded before it is committed
+        self._write_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="reminder-outbox", daemon=True)
+        self._thread.start()
+        return self
+
+    # Function to queue the outcome of one send; `key` is (reminder_id, fire_at, chat_id)
+    def record(self, key, success, description):
+        with self._cond:
+            self._buffer.append((SENT if success else FAILED, None if success else description, *key))
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self):
+        with self._write_lock:
+            with self._cond:
+                batch, self._buffer = self._buffer, []
+            if batch:
+                try:
+                    self.store.mark_outbox(batch)
+                except Exception:
+                    # Keep the outcomes for the next attempt
+                    with self._cond:
+                        self._buffer[:0] = batch
+                    raise
+            return len(batch)
+
+    def _run(self):
+        last_prune = 0.0
+        while True:
+            with self._cond:
+                if self._running and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.interval)
+                running = self._running
+            try:
+                self.flush()
+                if time.time() - last_prune > 3600:
+                    last_prune = time.time()
+                    self.store.prune_outbox(last_prune - RETENTION)
+            except Exception as e:
+                print(f"Could not write delivery outcomes to the outbox: {e}")
+            if not running:
+                return
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
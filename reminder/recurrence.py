@@ -0,0 +1,196 @@
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+from reminder.timezones import DEFAULT_TIMEZONE, zone_label, zone_table
+
+# Reminders without a timezone of their own are in IST
+ist = pytz.timezone(DEFAULT_TIMEZONE)
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WEEKDAY_INDEX = {name: i for i, name in enumerate(WEEKDAYS)}
+
+# Integer codes for the recurrence rules
+DAILY, WEEKLY, MONTHLY, ONE_TIME = 0, 1, 2, 3
+FREQUENCY_CODES = {"Daily": DAILY, "Weekly": WEEKLY, "Monthly": MONTHLY, "One-time": ONE_TIME}
+
+DAY = 86400
+
+# The engine works on whole seconds and whole days since the Unix epoch in the
+# reminder's local wall-clock time, so no datetime objects are created per
+# call. Local time is mapped to and from UTC through the zone's precomputed
+# transition table (reminder.timezones). Calendar conversion uses Howard
+# Hinnant's days_from_civil / civil_from_days, which is branch-light integer
+# arithmetic and runs the same on Python ints and NumPy arrays.
+
+
+def days_from_civil(y, m, d):
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    mp = (m + 9) % 12
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def civil_from_days(days):
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    d = doy - (153 * mp + 2) // 5 + 1
+    m = mp + 3 - 12 * (mp >= 10)
+    y = yoe + era * 400 + (m <= 2)
+    return y, m, d
+
+
+def days_in_month(y, m):
+    next_y = y + (m == 12)
+    next_m = m % 12 + 1
+    return days_from_civil(next_y, next_m, 1) - days_from_civil(y, m, 1)
+
+
+# Function to find the next local fire time (local epoch seconds) after `local`
+def _next_local(code, second_of_day, weekday, day_of_month, local):
+    day, now_second = divmod(local, DAY)
+    today_is_open = second_of_day > now_second
+
+    if code == DAILY:
+        fire_day = day if today_is_open else day + 1
+    elif code == WEEKLY:
+        # 1970-01-01 was a Thursday (weekday 3)
+        ahead = (weekday - (day + 3)) % 7
+        if ahead == 0 and not today_is_open:
+            ahead = 7
+        fire_day = day + ahead
+    else:
+        y, m, d = civil_from_days(day)
+        target = min(day_of_month, days_in_month(y, m))
+        if target < d or (target == d and not today_is_open):
+            y, m = y + (m == 12), m % 12 + 1
+            target = min(day_of_month, days_in_month(y, m))
+        fire_day = days_from_civil(y, m, target)
+
+    return fire_day * DAY + second_of_day
+
+
+# Function to compute the next fire instant (UTC epoch seconds) strictly after `after`.
+# `second_of_day` is the local fire time; `weekday` is 0=Monday; a monthly
+# `day_of_month` past the end of a short month fires on its last day.
+def next_occurrence(code, second_of_day, weekday, day_of_month, once_at, after, zone=None):
+    if code == ONE_TIME:
+        return once_at if once_at > after else None
+
+    zone = zone or zone_table(DEFAULT_TIMEZONE)
+    fire_local = _next_local(code, second_of_day, weekday, day_of_month, zone.to_local(int(after)))
+    fire_at = zone.to_utc(fire_local)
+    if fire_at <= after:
+        # The clocks went back and this wall time already passed once
+        fire_at = zone.to_utc(_next_local(code, second_of_day, weekday, day_of_month, fire_local))
+    return fire_at
+
+
+def _next_local_array(codes, seconds_of_day, weekdays, days_of_month, local):
+    day, now_second = np.divmod(local, DAY)
+    closed = seconds_of_day <= now_second
+
+    daily_day = day + closed
+
+    ahead = (weekdays - (day + 3)) % 7
+    weekly_day = day + np.where((ahead == 0) & closed, 7, ahead)
+
+    y, m, d = civil_from_days(day)
+    target = np.minimum(days_of_month, days_in_month(y, m))
+    roll = (target < d) | ((target == d) & closed)
+    y = np.where(roll, y + (m == 12), y)
+    m = np.where(roll, m % 12 + 1, m)
+    target = np.minimum(days_of_month, days_in_month(y, m))
+    monthly_day = days_from_civil(y, m, target)
+
+    fire_day = np.choose(np.clip(codes, DAILY, MONTHLY), [daily_day, weekly_day, monthly_day])
+    return fire_day * DAY + seconds_of_day
+
+
+# Function to compute next fire instants for whole arrays of reminders in one zone.
+# Arguments are equal-length arrays (or scalars that broadcast); the result is
+# an int64 array of UTC epoch seconds with -1 where a one-time reminder is over.
+def next_occurrence_array(codes, seconds_of_day, weekdays, days_of_month, once_at, after, zone=None):
+    zone = zone or zone_table(DEFAULT_TIMEZONE)
+    codes = np.asarray(codes, dtype=np.int64)
+    seconds_of_day = np.asarray(seconds_of_day, dtype=np.int64)
+    weekdays = np.asarray(weekdays, dtype=np.int64)
+    days_of_month = np.asarray(days_of_month, dtype=np.int64)
+    once_at = np.asarray(once_at, dtype=np.int64)
+    after_exact = np.asarray(after, dtype=np.float64)
+    after = after_exact.astype(np.int64)
+
+    fire_local = _next_local_array(codes, seconds_of_day, weekdays, days_of_month, zone.to_local_array(after))
+    fire_at = zone.to_utc_array(fire_local)
+    # The clocks went back and this wall time already passed once
+    passed = fire_at <= after_exact
+    if passed.any():
+        later = zone.to_utc_array(_next_local_array(codes, seconds_of_day, weekdays, days_of_month, fire_local))
+        fire_at = np.where(passed, later, fire_at)
+
+    once = np.where(once_at > after_exact, once_at, -1)
+    return np.where(codes == ONE_TIME, once, fire_at)
+
+
+# Function to pull the rule fields out of a reminder dict
+def rule_fields(reminder):
+    code = FREQUENCY_CODES[reminder['frequency']]
+    hour, minute = map(int, reminder['selected_time_ist'].split(':'))
+    weekday = WEEKDAY_INDEX.get(reminder.get('day_of_week'), 0)
+    day_of_month = int(reminder.get('day_of_month') or 1)
+    once_at = 0
+    if code == ONE_TIME:
+        once_at = int(datetime.fromisoformat(reminder['scheduled_datetime_ist']).timestamp())
+    return code, hour * 3600 + minute * 60, weekday, day_of_month, once_at
+
+
+# Function to compute the next fire instant (UTC epoch seconds) strictly after `after`
+def next_fire_time(reminder, after):
+    return next_occurrence(*rule_fields(reminder), after, zone_table(reminder.get('timezone')))
+
+
+# Function to compute the next fire instant for a batch of reminders in one call.
+# `after` is one instant for all of them or one per reminder. Reminders are
+# grouped by time zone and each group is computed with one vectorized call.
+def next_fire_times(reminders, after):
+    if not reminders:
+        return []
+    fields = np.array([rule_fields(reminder) for reminder in reminders], dtype=np.int64)
+    after = np.broadcast_to(np.asarray(after, dtype=np.float64), (len(reminders),))
+    zones = np.array([reminder.get('timezone') or DEFAULT_TIMEZONE for reminder in reminders])
+    fire_at = np.empty(len(reminders), dtype=np.int64)
+    for zone in np.unique(zones):
+        rows = zones == zone
+        fire_at[rows] = next_occurrence_array(*fields[rows].T, after[rows], zone_table(str(zone)))
+    return [None if value < 0 else value for value in fire_at.tolist()]
+
+
+# Function to describe a reminder's schedule in its own time zone, e.g. "Every
+# Monday at 08:00 AM IST". Worked out when shown instead of stored per reminder.
+# A group reminder is prefixed with its audience label (its receiver name).
+def describe_schedule(reminder):
+    if reminder.get('audience'):
+        return f"{reminder['receiver_name']}: {_describe_schedule(reminder)}"
+    return _describe_schedule(reminder)
+
+
+def _describe_schedule(reminder):
+    hour, minute = map(int, reminder['selected_time_ist'].split(':'))
+    at = f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'} {zone_label(reminder.get('timezone'))}"
+    frequency = reminder['frequency']
+    if frequency == "Daily":
+        return f"Daily at {at}"
+    if frequency == "Weekly":
+        return f"Every {reminder.get('day_of_week')} at {at}"
+    if frequency == "Monthly":
+        return f"Monthly on day {reminder.get('day_of_month')} at {at}"
+    once = datetime.fromisoformat(reminder['scheduled_datetime_ist'])
+    return f"Once on {once.strftime('%b %d, %Y')} at {at}"
@@ -0,0 +1,96 @@
+import random
+import time
+from functools import lru_cache
+
+from jinja2 import Environment
+
+from reminder.content import GENERAL_TEMPLATES, local_day, stages
+
+# Marks where the randomly chosen base message goes in the rendered layout
+BODY_MARKER = "\x00"
+# Stands in for the recipient's name when the greeting is rendered for a group
+NAME_MARKER = "\x01"
+
+# The message layout is compiled once. Everything around the base message
+# depends only on the reminder, so it is rendered once per reminder and cached
+# as a (prefix, suffix) pair; each send is then just two string joins.
+_environment = Environment(autoescape=False, keep_trailing_newline=True)
+_layout = _environment.from_string(
+    "{% if receiver_name %}Dear {{ receiver_name }},\n\n{% endif %}"
+    + BODY_MARKER
+    + "{% if reminder_text %}\n\n📝 {{ reminder_text }}{% endif %}"
+    + "{% if sender_name %}\n\nWarmly,\n{{ sender_name }}{% endif %}"
+)
+
+
+# Function to get the fixed greeting/text/signature parts around the base message.
+# functools' C-level LRU keeps the per-send lookup cheaper than building the
+# strings again, which a pure-Python cache would not.
+@lru_cache(maxsize=100_000)
+def message_parts(reminder_text="", sender_name="", receiver_name=""):
+    rendered = _layout.render(receiver_name=receiver_name, reminder_text=reminder_text, sender_name=sender_name)
+    prefix, _, suffix = rendered.partition(BODY_MARKER)
+    return prefix, suffix
+
+
+# Function to generate a cordial message; with a due date the base message
+# is picked from the set for the current week of pregnancy. Without one the
+# local day does not matter, so it is not worked out.
+def generate_cordial_message(reminder_text, sender_name="", receiver_name="", due_date=None, timezone=None):
+    prefix, suffix = message_parts(reminder_text or "", sender_name or "", receiver_name or "")
+    bodies = stages.templates(due_date, local_day(timezone)) if due_date else GENERAL_TEMPLATES
+    return prefix + bodies[int(random.random() * len(bodies))] + suffix
+
+
+# Function to get the greeting around a recipient's name, rendered once
+@lru_cache(maxsize=1)
+def greeting_parts():
+    head, _, tail = message_parts("", "", NAME_MARKER)[0].partition(NAME_MARKER)
+    return head, tail
+
+
+# Function to render one group reminder for a chunk of recipient names. The text
+# and signature are shared by the whole group and the greeting only differs by
+# name, so nothing is rendered or cached per recipient.
+# `day` is the local fire day (reminder.content.local_day) shared by the group.
+def render_group(reminder, recipients, day=None):
+    _, suffix = message_parts(reminder.get('text') or '', reminder.get('sender_name') or '', '')
+    head, tail = greeting_parts()
+    day = local_day(reminder.get('timezone')) if day is None else day
+    templates = stages.templates
+    cached = stages.for_day(day)
+    pick = random.random
+    messages = []
+    for recipient in recipients:
+        name = recipient.get('name')
+        bodies = cached.get(recipient.get('due_date')) or templates(recipient.get('due_date'), day)
+        messages.append((head + name + tail if name else "") + bodies[int(pick() * len(bodies))] + suffix)
+    return messages
+
+
+# Function to render the messages for every reminder due in one dispatch tick.
+# `days` are the reminders' local fire days; by default, today in each one's zone.
+def render_batch(reminders, days=None):
+    if days is None:
+        now = time.time()
+        today = {}
+        for reminder in reminders:
+            zone = reminder.get('timezone')
+            if zone not in today:
+                today[zone] = local_day(zone, now)
+        days = [today[reminder.get('timezone')] for reminder in reminders]
+    parts = message_parts
+    templates = stages.templates
+    cached_day = days[0] if days else None
+    cached = stages.for_day(cached_day) if days else {}
+    pick = random.random
+    messages = []
+    for reminder, day in zip(reminders, days):
+        prefix, suffix = parts(reminder.get('text') or '', reminder.get('sender_name') or '',
+                               reminder.get('receiver_name') or '')
+        due_date = reminder.get('due_date')
+        bodies = cached.get(due_date) if day == cached_day else None
+        if bodies is None:
+            bodies = templates(due_date, day)
+        messages.append(prefix + bodies[int(pick() * len(bodies))] + suffix)
+    return messages
@@ -0,0 +1,35 @@
+import hashlib
+from bisect import bisect
+
+# Points each shard gets on the ring; more points spread tenants more evenly
+REPLICAS = 100
+
+
+# Function to hash a key to a stable 64-bit ring position (the same in every
+# process, unlike the built-in hash(), which is salted per process)
+def _position(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring that assigns tenants to worker shards.
+
+    Every worker process builds the same ring from the shard count alone, so
+    they agree on which shard owns a tenant without talking to each other.
+    Changing the shard count only moves the tenants whose ring arc changed
+    hands (about 1/N of them), not everyone.
+    """
+
+    def __init__(self, shards, replicas=REPLICAS):
+        self.shards = shards
+        points = sorted((_position(f"shard-{shard}-{replica}"), shard)
+                        for shard in range(shards) for replica in range(replicas))
+        self._positions = [position for position, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    # Function to get the shard that owns a tenant
+    def shard_for(self, tenant):
+        if self.shards == 1:
+            return 0
+        index = bisect(self._positions, _position(str(tenant))) % len(self._positions)
+        return self._shards[index]
@@ -0,0 +1,613 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from sys import intern
+
+from reminder.misfire import DEFAULT_GRACE, DEFAULT_POLICY
+from reminder.timezones import DEFAULT_TIMEZONE
+
+DEFAULT_DB_PATH = os.environ.get("REMINDER_DB", "reminders.db")
+
+# Key under which the UI saves the bot token for the worker
+TOKEN_SETTING = "telegram_bot_token"
+# Tenant of reminders added without one; it sends with the token above
+DEFAULT_TENANT = ""
+# Key of the counter bumped by every write that changes what the UI shows
+REVISION_SETTING = "revision"
+# Bumped when reminders are added or deleted or tenants change: the writes a
+# running worker has to reload for (its own fire-time updates do not bump it)
+SCHEDULE_SETTING = "schedule_revision"
+# Set once recipients left behind by deletes from before they were pruned are gone
+RECIPIENTS_PRUNED_SETTING = "recipients_pruned"
+
+# Columns that make up a reminder, in the order they are stored
+COLUMNS = (
+    "id", "type", "text", "frequency", "schedule_display", "schedule_key",
+    "sender_name", "receiver_name", "receiver_chat_id", "due_date", "active",
+    "selected_time_ist", "selected_time_system", "day_of_week", "day_of_month",
+    "scheduled_datetime_ist", "next_fire_at", "created_at", "timezone", "audience",
+    "misfire_policy", "misfire_grace", "tenant",
+)
+
+# Column list for reads, so rows come back in COLUMNS order
+SELECT_COLUMNS = ", ".join(COLUMNS)
+
+# Values used for columns a new reminder leaves out
+DEFAULTS = {
+    "type": "Medication", "text": "", "schedule_display": "", "schedule_key": "",
+    "sender_name": "", "receiver_name": "", "active": True, "timezone": DEFAULT_TIMEZONE,
+    "misfire_policy": DEFAULT_POLICY, "misfire_grace": DEFAULT_GRACE, "tenant": DEFAULT_TENANT,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL DEFAULT 'Medication',
+    text TEXT NOT NULL DEFAULT '',
+    frequency TEXT NOT NULL,
+    schedule_display TEXT NOT NULL DEFAULT '',
+    schedule_key TEXT NOT NULL DEFAULT '',
+    sender_name TEXT NOT NULL DEFAULT '',
+    receiver_name TEXT NOT NULL DEFAULT '',
+    receiver_chat_id TEXT NOT NULL,
+    due_date TEXT,
+    active INTEGER NOT NULL DEFAULT 1,
+    selected_time_ist TEXT NOT NULL,
+    selected_time_system TEXT,
+    day_of_week TEXT,
+    day_of_month INTEGER,
+    scheduled_datetime_ist TEXT,
+    next_fire_at REAL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS tenants (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    token TEXT
+);
+CREATE TABLE IF NOT EXISTS recipients (
+    tenant TEXT NOT NULL DEFAULT '',
+    chat_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    due_date TEXT,
+    timezone TEXT,
+    PRIMARY KEY (tenant, chat_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS group_members (
+    reminder_id INTEGER NOT NULL,
+    chat_id TEXT NOT NULL,
+    PRIMARY KEY (reminder_id, chat_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    reminder_id INTEGER NOT NULL,
+    fire_at INTEGER NOT NULL,
+    chat_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT,
+    detail TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (reminder_id, fire_at, chat_id)
+) WITHOUT ROWID;
+"""
+
+# Outbox statuses. One row per (reminder, fire instant, chat); a group
+# reminder's own row has an empty chat id and tracks its expansion. Late
+# messages wait as "deferred" until the catch-up rate lets them out.
+PENDING, SENT, FAILED, SKIPPED = "pending", "sent", "failed", "skipped"
+DEFERRED = "deferred"
+EXPANDING, EXPANDED = "expanding", "expanded"
+
+
+# Columns added after the first release, applied to older databases on open.
+# selected_time_ist holds the wall-clock time in the reminder's own timezone.
+# audience is NULL for single-recipient reminders and JSON for group reminders
+# (see reminder.cohorts). tenant is the id of the reminder's tenant in the
+# tenants table ('' for the default tenant).
+MIGRATIONS = [
+    ("reminders", "timezone", f"TEXT NOT NULL DEFAULT '{DEFAULT_TIMEZONE}'"),
+    ("reminders", "audience", "TEXT"),
+    ("reminders", "misfire_policy", f"TEXT NOT NULL DEFAULT '{DEFAULT_POLICY}'"),
+    ("reminders", "misfire_grace", f"REAL NOT NULL DEFAULT {DEFAULT_GRACE}"),
+    ("reminders", "tenant", "TEXT NOT NULL DEFAULT ''"),
+]
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (active, next_fire_at);
+CREATE INDEX IF NOT EXISTS idx_reminders_tenant_due ON reminders (tenant, active, next_fire_at);
+CREATE INDEX IF NOT EXISTS idx_reminders_chat ON reminders (receiver_chat_id, active);
+CREATE INDEX IF NOT EXISTS idx_reminders_timezone ON reminders (timezone, active);
+CREATE INDEX IF NOT EXISTS idx_reminders_frequency ON reminders (frequency, active);
+CREATE INDEX IF NOT EXISTS idx_recipients_due ON recipients (tenant, due_date, chat_id);
+CREATE INDEX IF NOT EXISTS idx_outbox_open ON outbox (status) WHERE status IN ('pending', 'expanding');
+CREATE INDEX IF NOT EXISTS idx_outbox_deferred ON outbox (fire_at) WHERE status = 'deferred';
+"""
+
+# Every chat that has a single-recipient reminder is a recipient of that
+# reminder's tenant; the latest reminder's name, due date and timezone win
+UPSERT_RECIPIENT = """
+INSERT INTO recipients (tenant, chat_id, name, due_date, timezone) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (tenant, chat_id) DO UPDATE SET
+    name = excluded.name,
+    due_date = COALESCE(excluded.due_date, recipients.due_date),
+    timezone = excluded.timezone
+"""
+
+# A chat stays a recipient of a tenant only while it has a single-recipient
+# reminder there, so deleting a mother's last reminder also takes her out of
+# every cohort broadcast
+PRUNE_RECIPIENTS = """
+DELETE FROM recipients WHERE NOT EXISTS (
+    SELECT 1 FROM reminders WHERE reminders.receiver_chat_id = recipients.chat_id
+    AND reminders.tenant = recipients.tenant AND reminders.audience IS NULL)
+"""
+
+# Columns covered by the full-text search index
+SEARCH_COLUMNS = ("receiver_name", "sender_name", "receiver_chat_id", "text")
+
+# Full-text index over the searchable columns, kept in step by triggers.
+# Fire-time updates do not touch these columns, so they never reach the index.
+SEARCH_SCHEMA = f"""
+CREATE VIRTUAL TABLE reminders_search USING fts5(
+    {', '.join(SEARCH_COLUMNS)}, content='reminders', content_rowid='id', detail=none
+);
+CREATE TRIGGER reminders_search_insert AFTER INSERT ON reminders BEGIN
+    INSERT INTO reminders_search (rowid, {', '.join(SEARCH_COLUMNS)})
+    VALUES (new.id, {', '.join('new.' + c for c in SEARCH_COLUMNS)});
+END;
+CREATE TRIGGER reminders_search_delete AFTER DELETE ON reminders BEGIN
+    INSERT INTO reminders_search (reminders_search, rowid, {', '.join(SEARCH_COLUMNS)})
+    VALUES ('delete', old.id, {', '.join('old.' + c for c in SEARCH_COLUMNS)});
+END;
+CREATE TRIGGER reminders_search_update AFTER UPDATE OF {', '.join(SEARCH_COLUMNS)} ON reminders BEGIN
+    INSERT INTO reminders_search (reminders_search, rowid, {', '.join(SEARCH_COLUMNS)})
+    VALUES ('delete', old.id, {', '.join('old.' + c for c in SEARCH_COLUMNS)});
+    INSERT INTO reminders_search (rowid, {', '.join(SEARCH_COLUMNS)})
+    VALUES (new.id, {', '.join('new.' + c for c in SEARCH_COLUMNS)});
+END;
+INSERT INTO reminders_search (reminders_search) VALUES ('rebuild');
+"""
+
+
+class Reminder:
+    """One reminder read from the store, kept compact for large ticks.
+
+    Fixed slots instead of a dict per row, and every string is interned, so
+    repeated names, chat ids, times, zones and texts share one copy across
+    all the reminders held in the process, whichever read they came from.
+    Reads like a dict (`reminder['frequency']`, `reminder.get('timezone')`),
+    which is all the scheduling and rendering code needs.
+    """
+
+    __slots__ = COLUMNS
+
+    # Function to build a reminder from a row in COLUMNS order
+    @classmethod
+    def from_row(cls, row):
+        reminder = cls.__new__(cls)
+        for column, value in zip(COLUMNS, row):
+            if value.__class__ is str:
+                value = intern(value)
+            setattr(reminder, column, value)
+        reminder.active = bool(reminder.active)
+        return reminder
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in COLUMNS else default
+
+    def __contains__(self, key):
+        return key in COLUMNS
+
+    def keys(self):
+        return COLUMNS
+
+    def __repr__(self):
+        return f"Reminder(id={self.id!r}, frequency={self.frequency!r}, receiver_chat_id={self.receiver_chat_id!r})"
+
+
+class ReminderStore:
+    """SQLite-backed reminder store (WAL mode, one connection per thread).
+
+    The (active, next_fire_at) index makes due-window scans O(log n + k) and
+    lookups by id go through the primary key, so nothing has to be loaded into
+    memory up front. Listing pages through the table with filters on indexed
+    columns and an FTS5 search index (a LIKE scan where SQLite lacks FTS5).
+
+    Worker shards pass the tenants they own to the scheduling and outbox
+    queries; None means every tenant.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # recipients is derived from reminders; a table from before tenants
+            # is dropped and rebuilt below
+            if "tenant" not in {row[1] for row in conn.execute("PRAGMA table_info(recipients)")}:
+                conn.execute("DROP TABLE recipients")
+                conn.executescript(SCHEMA)
+            for table, column, definition in MIGRATIONS:
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            conn.executescript(INDEXES)
+            if conn.execute("SELECT COUNT(*) FROM recipients").fetchone()[0] == 0:
+                conn.execute(
+                    "INSERT OR REPLACE INTO recipients (tenant, chat_id, name, due_date, timezone) "
+                    "SELECT tenant, receiver_chat_id, receiver_name, due_date, timezone FROM reminders "
+                    "WHERE audience IS NULL ORDER BY id")
+            if conn.execute("SELECT 1 FROM settings WHERE key = ?", (RECIPIENTS_PRUNED_SETTING,)).fetchone() is None:
+                conn.execute(PRUNE_RECIPIENTS)
+                conn.execute("INSERT INTO settings (key, value) VALUES (?, '1')", (RECIPIENTS_PRUNED_SETTING,))
+            self.full_text_search = self._create_search_index(conn)
+
+    @staticmethod
+    def _create_search_index(conn):
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'reminders_search'").fetchone():
+            return True
+        try:
+            # Built (and filled from existing rows) only the first time
+            conn.executescript(f"BEGIN; {SEARCH_SCHEMA} COMMIT;")
+        except sqlite3.OperationalError:
+            conn.rollback()
+            return False
+        return True
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL only fsyncs at checkpoints; commits stay durable across app crashes
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        reminder = dict(row)
+        reminder['active'] = bool(reminder['active'])
+        return reminder
+
+    @staticmethod
+    def _reminders(rows):
+        return [Reminder.from_row(row) for row in rows]
+
+    # Function to insert a reminder; returns its new id
+    def add(self, reminder):
+        return self.add_many([reminder])[0]
+
+    # Function to insert many reminders in one transaction; returns their ids
+    def add_many(self, reminders):
+        conn = self._connect()
+        with conn:
+            ids = self._insert(conn, reminders)
+            self._bump_revision(conn)
+            self._bump_revision(conn, SCHEDULE_SETTING)
+        return ids
+
+    def _insert(self, conn, reminders):
+        columns = [c for c in COLUMNS if c != "id"]
+        sql = f"INSERT INTO reminders ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        now = time.time()
+        ids = []
+        for reminder in reminders:
+            values = dict(DEFAULTS, created_at=now)
+            values.update((k, v) for k, v in reminder.items() if v is not None)
+            values['active'] = int(values.get('active', True))
+            cursor = conn.execute(sql, [values.get(c) for c in columns])
+            ids.append(cursor.lastrowid)
+            if values.get('audience') is None:
+                conn.execute(UPSERT_RECIPIENT, (values['tenant'], values['receiver_chat_id'],
+                                                values['receiver_name'], values.get('due_date'),
+                                                values['timezone']))
+        return ids
+
+    # Function to insert a group reminder and its member chat ids in one
+    # transaction; `chat_ids` may be any iterable and is streamed into the table
+    def add_group(self, reminder, chat_ids=()):
+        conn = self._connect()
+        with conn:
+            reminder_id = self._insert(conn, [dict(reminder, receiver_chat_id="")])[0]
+            self._bump_revision(conn)
+            self._bump_revision(conn, SCHEDULE_SETTING)
+            conn.executemany("INSERT OR IGNORE INTO group_members (reminder_id, chat_id) VALUES (?, ?)",
+                             ((reminder_id, str(chat_id)) for chat_id in chat_ids))
+        return reminder_id
+
+    # Function to page through a group's members (with any recipient details
+    # from the group's tenant), ordered by chat id; pass the last chat id seen as `after`
+    def group_members(self, reminder_id, after="", limit=1000, tenant=DEFAULT_TENANT):
+        rows = self._connect().execute(
+            "SELECT m.chat_id, COALESCE(r.name, '') AS name, r.due_date, r.timezone FROM group_members m "
+            "LEFT JOIN recipients r ON r.tenant = ? AND r.chat_id = m.chat_id "
+            "WHERE m.reminder_id = ? AND m.chat_id > ? ORDER BY m.chat_id LIMIT ?",
+            (tenant, reminder_id, after, limit))
+        return [dict(row) for row in rows]
+
+    # Function to page through a tenant's recipients with a due date in [start, end]
+    # (ISO dates), in (due_date, chat_id) order; pass the last row's pair as `after`
+    def recipients_due_between(self, start, end, after=None, limit=1000, tenant=DEFAULT_TENANT):
+        after_due, after_chat = after or ("", "")
+        rows = self._connect().execute(
+            "SELECT chat_id, name, due_date, timezone FROM recipients "
+            "WHERE tenant = ? AND (due_date, chat_id) > (?, ?) AND due_date >= ? AND due_date <= ? "
+            "ORDER BY due_date, chat_id LIMIT ?",
+            (tenant, after_due, after_chat, start, end, limit))
+        return [dict(row) for row in rows]
+
+    def get(self, reminder_id):
+        rows = self._connect().execute(f"SELECT {SELECT_COLUMNS} FROM reminders WHERE id = ?", (reminder_id,))
+        reminders = self._reminders(rows)
+        return reminders[0] if reminders else None
+
+    def get_many(self, reminder_ids):
+        reminder_ids = list(reminder_ids)
+        if not reminder_ids:
+            return {}
+        conn = self._connect()
+        rows = []
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(reminder_ids), 500):
+            chunk = reminder_ids[i:i + 500]
+            rows.extend(conn.execute(
+                f"SELECT {SELECT_COLUMNS} FROM reminders WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        return {reminder.id: reminder for reminder in self._reminders(rows)}
+
+    def delete(self, reminder_id):
+        conn = self._connect()
+        with conn:
+            recipient = conn.execute("SELECT tenant, receiver_chat_id FROM reminders WHERE id = ? AND audience IS NULL",
+                                     (reminder_id,)).fetchone()
+            cursor = conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+            conn.execute("DELETE FROM group_members WHERE reminder_id = ?", (reminder_id,))
+            if recipient is not None:
+                conn.execute(f"{PRUNE_RECIPIENTS} AND tenant = ? AND chat_id = ?", tuple(recipient))
+            conn.execute("UPDATE outbox SET status = ?, detail = 'Reminder deleted', updated_at = ? "
+                         "WHERE reminder_id = ? AND status IN (?, ?, ?)",
+                         (SKIPPED, time.time(), reminder_id, PENDING, EXPANDING, DEFERRED))
+            if cursor.rowcount:
+                self._bump_revision(conn)
+                self._bump_revision(conn, SCHEDULE_SETTING)
+        return cursor.rowcount > 0
+
+    # Function to record next fire instants; a None instant retires the reminder
+    def set_next_fire_many(self, updates):
+        conn = self._connect()
+        with conn:
+            self._set_next_fire(conn, updates)
+
+    def _set_next_fire(self, conn, updates):
+        updates = [(fire_at, fire_at, reminder_id) for reminder_id, fire_at in updates]
+        conn.executemany(
+            "UPDATE reminders SET next_fire_at = ?, active = (? IS NOT NULL) AND active WHERE id = ?", updates)
+        # Only retiring a reminder changes what the UI shows
+        if any(fire_at is None for fire_at, _, _ in updates):
+            self._bump_revision(conn)
+
+    # Function to commit one dispatch tick in a single transaction: record its
+    # outbox entries and move its reminders on to their next fire (None retires
+    # them). Entries are (reminder_id, fire_at, chat_id, message, status);
+    # returns those that were not already in the outbox.
+    def record_tick(self, rescheduled, entries):
+        conn = self._connect()
+        with conn:
+            new = self._insert_outbox(conn, entries)
+            self._set_next_fire(conn, rescheduled)
+        return new
+
+    # Function to record outbox entries (e.g. one chunk of a group); returns the new ones
+    def add_outbox(self, entries):
+        conn = self._connect()
+        with conn:
+            return self._insert_outbox(conn, entries)
+
+    @staticmethod
+    def _insert_outbox(conn, entries):
+        now = time.time()
+        new = []
+        for entry in entries:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO outbox (reminder_id, fire_at, chat_id, message, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (*entry, now))
+            if cursor.rowcount:
+                new.append(entry)
+        return new
+
+    # Function to record outcomes as (status, detail, reminder_id, fire_at, chat_id)
+    def mark_outbox(self, updates):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "UPDATE outbox SET status = ?, detail = ?, updated_at = ? "
+                "WHERE reminder_id = ? AND fire_at = ? AND chat_id = ?",
+                [(status, detail, now, *key) for status, detail, *key in updates])
+
+    # Function to list outbox entries that were never finished (pending sends and
+    # group expansions), oldest first
+    def open_outbox(self, tenants=None):
+        clause, params = self._outbox_tenants(tenants)
+        rows = self._connect().execute(
+            "SELECT reminder_id, fire_at, chat_id, message, status FROM outbox "
+            f"WHERE status IN (?, ?){clause} ORDER BY fire_at", (PENDING, EXPANDING, *params))
+        return [tuple(row) for row in rows]
+
+    # Function to move up to `limit` of the oldest deferred messages to pending
+    # and return them; the caller sends them right after
+    def release_deferred(self, limit, tenants=None):
+        clause, params = self._outbox_tenants(tenants)
+        conn = self._connect()
+        with conn:
+            rows = [tuple(row) for row in conn.execute(
+                "SELECT reminder_id, fire_at, chat_id, message FROM outbox "
+                f"WHERE status = ?{clause} ORDER BY fire_at LIMIT ?", (DEFERRED, *params, limit))]
+            conn.executemany(
+                "UPDATE outbox SET status = ? WHERE reminder_id = ? AND fire_at = ? AND chat_id = ?",
+                [(PENDING, *row[:3]) for row in rows])
+        return [(*row, PENDING) for row in rows]
+
+    def deferred_count(self, tenants=None):
+        clause, params = self._outbox_tenants(tenants)
+        return self._connect().execute(f"SELECT COUNT(*) FROM outbox WHERE status = ?{clause}",
+                                       (DEFERRED, *params)).fetchone()[0]
+
+    @staticmethod
+    def _outbox_tenants(tenants):
+        if tenants is None:
+            return "", ()
+        tenants = list(tenants)
+        return (f" AND reminder_id IN (SELECT id FROM reminders WHERE tenant IN ({', '.join('?' * len(tenants))}))",
+                tuple(tenants))
+
+    # Function to drop finished outbox entries for fires before `before`
+    def prune_outbox(self, before):
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM outbox WHERE fire_at < ? AND status NOT IN (?, ?, ?)",
+                                  (before, PENDING, EXPANDING, DEFERRED))
+        return cursor.rowcount
+
+    # Function to list (id, next_fire_at) of active reminders due in [start, until),
+    # with instants as integer UTC epoch seconds
+    def due_between(self, start, until, tenants=None):
+        where, params = ["active = 1", "next_fire_at < ?"], [until]
+        if start is not None:
+            where.append("next_fire_at >= ?")
+            params.append(start)
+        if tenants is not None:
+            tenants = list(tenants)
+            where.append(f"tenant IN ({', '.join('?' * len(tenants))})")
+            params.extend(tenants)
+        rows = self._connect().execute(
+            f"SELECT id, CAST(next_fire_at AS INTEGER) FROM reminders WHERE {' AND '.join(where)}", params)
+        return [(row[0], row[1]) for row in rows]
+
+    def timezones(self):
+        rows = self._connect().execute("SELECT DISTINCT timezone FROM reminders WHERE active = 1")
+        return [row[0] for row in rows]
+
+    def active_in_timezone(self, timezone):
+        rows = self._connect().execute(
+            f"SELECT {SELECT_COLUMNS} FROM reminders WHERE timezone = ? AND active = 1", (timezone,))
+        return self._reminders(rows)
+
+    # Function to list reminders in id order, optionally only one tenant's
+    # and only active (or inactive) ones
+    def list(self, tenant=None, active=None):
+        where, params = [], []
+        if tenant is not None:
+            where.append("tenant = ?")
+            params.append(tenant)
+        if active is not None:
+            where.append("active = ?")
+            params.append(int(active))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        rows = self._connect().execute(f"SELECT * FROM reminders {clause} ORDER BY id", params)
+        return [self._to_dict(row) for row in rows]
+
+    # Function to get one page of reminders, in id order, plus the number that
+    # match. `search` matches words (by prefix) in names, chat id and text.
+    def page(self, offset=0, limit=50, search=None, frequency=None, active=None, tenant=None):
+        where, params = [], []
+        words = re.findall(r"\w+", search or "")
+        if words and self.full_text_search:
+            where.append("id IN (SELECT rowid FROM reminders_search WHERE reminders_search MATCH ?)")
+            params.append(" ".join(f'"{word}"*' for word in words))
+        elif words:
+            for word in words:
+                where.append("(" + " OR ".join(f"{c} LIKE ?" for c in SEARCH_COLUMNS) + ")")
+                params.extend([f"%{word}%"] * len(SEARCH_COLUMNS))
+        if frequency:
+            where.append("frequency = ?")
+            params.append(frequency)
+        if active is not None:
+            where.append("active = ?")
+            params.append(int(active))
+        if tenant is not None:
+            where.append("tenant = ?")
+            params.append(tenant)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM reminders {clause}", params).fetchone()[0]
+        rows = conn.execute(f"SELECT * FROM reminders {clause} ORDER BY id LIMIT ? OFFSET ?",
+                            params + [limit, offset])
+        return [self._to_dict(row) for row in rows], total
+
+    # Function to list the distinct chat ids of a tenant's active reminders
+    def chat_ids(self, tenant=DEFAULT_TENANT):
+        rows = self._connect().execute(
+            "SELECT DISTINCT receiver_chat_id FROM reminders WHERE active = 1 AND audience IS NULL AND tenant = ?",
+            (tenant,))
+        return [row[0] for row in rows]
+
+    # Function to count reminders, all of them or only `tenant`'s
+    def count(self, tenant=None):
+        if tenant is None:
+            return self._connect().execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+        return self._connect().execute("SELECT COUNT(*) FROM reminders WHERE tenant = ?", (tenant,)).fetchone()[0]
+
+    # Function to add a tenant or update its name and bot token
+    def set_tenant(self, tenant_id, name, token):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT INTO tenants (id, name, token) VALUES (?, ?, ?) "
+                         "ON CONFLICT (id) DO UPDATE SET name = excluded.name, token = excluded.token",
+                         (tenant_id, name, token))
+            self._bump_revision(conn, SCHEDULE_SETTING)
+
+    def tenants(self):
+        rows = self._connect().execute("SELECT id, name, token FROM tenants ORDER BY name")
+        return [dict(row) for row in rows]
+
+    # Function to get a tenant's bot token; the default tenant's is the one the UI saves
+    def tenant_token(self, tenant):
+        if tenant == DEFAULT_TENANT:
+            return self.get_setting(TOKEN_SETTING)
+        row = self._connect().execute("SELECT token FROM tenants WHERE id = ?", (tenant,)).fetchone()
+        return None if row is None else row[0]
+
+    def get_setting(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _bump_revision(self, conn, key=REVISION_SETTING):
+        conn.execute("INSERT INTO settings (key, value) VALUES (?, 1) "
+                     "ON CONFLICT (key) DO UPDATE SET value = value + 1", (key,))
+
+    # Function to get a number that changes whenever a reminder is added, deleted
+    # or retired, from any process; views can be cached on it
+    def revision(self):
+        return int(self.get_setting(REVISION_SETTING, 0))
+
+    # Function to get a number that changes whenever a reminder is added or
+    # deleted or a tenant changes, from any process
+    def schedule_revision(self):
+        return int(self.get_setting(SCHEDULE_SETTING, 0))
+
+    def set_setting(self, key, value):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    # Function to detect writes from other connections (e.g. the UI process).
+    # The value only changes when someone else commits, so callers compare it
+    # against the last value they saw on the same thread.
+    def data_version(self):
+        return self._connect().execute("PRAGMA data_version").fetchone()[0]
@@ -0,0 +1,109 @@
+import zlib
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pytz
+
+DEFAULT_TIMEZONE = 'Asia/Kolkata'
+
+_EPOCH = datetime(1970, 1, 1)
+# UTC offsets never change twice within this many seconds of each other
+_TRANSITION_GAP = 86400
+
+
+class ZoneTable:
+    """Precomputed UTC offset transitions for one time zone.
+
+    `transitions[i]` is the UTC epoch second from which `offsets[i]` (seconds
+    east of UTC) applies. Lookups are a bisect over integers, so converting
+    between UTC and local wall-clock seconds never goes through pytz at fire
+    time.
+    """
+
+    def __init__(self, name):
+        tz = pytz.timezone(name)
+        self.name = name
+        utc_transitions = getattr(tz, '_utc_transition_times', None)
+        if utc_transitions:
+            transitions = [
+                -2 ** 62 if t == datetime.min else int((t - _EPOCH).total_seconds())
+                for t in utc_transitions
+            ]
+            offsets = [int(info[0].total_seconds()) for info in tz._transition_info]
+        else:
+            transitions = [-2 ** 62]
+            offsets = [int(tz.utcoffset(None).total_seconds())]
+        self.transitions = transitions
+        self.offsets = offsets
+        self._transitions_array = np.array(transitions, dtype=np.int64)
+        self._offsets_array = np.array(offsets, dtype=np.int64)
+        self.fixed = len(set(offsets)) == 1
+        self.fingerprint = zlib.crc32(self._transitions_array.tobytes() + self._offsets_array.tobytes())
+
+    # Function to get the UTC offset in effect at a UTC instant
+    def offset_at(self, utc):
+        if self.fixed:
+            return self.offsets[0]
+        return self.offsets[bisect_right(self.transitions, utc) - 1]
+
+    def to_local(self, utc):
+        return utc + self.offset_at(utc)
+
+    # Function to turn local wall-clock seconds into a UTC instant. Ambiguous
+    # times (clocks going back) resolve to the first occurrence; times skipped
+    # by clocks going forward are shifted forward by the size of the gap.
+    def to_utc(self, local):
+        if self.fixed:
+            return local - self.offsets[0]
+        before = self.offset_at(local - _TRANSITION_GAP)
+        after = self.offset_at(local + _TRANSITION_GAP)
+        if before == after:
+            return local - before
+        if self.offset_at(local - before) == before:
+            return local - before
+        if self.offset_at(local - after) == after:
+            return local - after
+        return local - before
+
+    def offset_at_array(self, utc):
+        if self.fixed:
+            return np.full(np.shape(utc), self.offsets[0], dtype=np.int64)
+        index = np.searchsorted(self._transitions_array, utc, side='right') - 1
+        return self._offsets_array[index]
+
+    def to_local_array(self, utc):
+        return utc + self.offset_at_array(utc)
+
+    def to_utc_array(self, local):
+        if self.fixed:
+            return local - self.offsets[0]
+        before = self.offset_at_array(local - _TRANSITION_GAP)
+        after = self.offset_at_array(local + _TRANSITION_GAP)
+        before_ok = self.offset_at_array(local - before) == before
+        after_ok = self.offset_at_array(local - after) == after
+        return np.where(before_ok | ~after_ok, local - before, local - after)
+
+    # Function to list the UTC instants in [start, end) at which the offset changes
+    def transitions_between(self, start, end):
+        lo = bisect_right(self.transitions, start)
+        hi = bisect_right(self.transitions, end - 1)
+        return self.transitions[lo:hi]
+
+
+# Tables are built once per zone and shared by every reminder in it
+@lru_cache(maxsize=None)
+def zone_table(name):
+    return ZoneTable(name or DEFAULT_TIMEZONE)
+
+
+# Function to give a short label for schedule descriptions ("IST" for the default zone)
+def zone_label(name):
+    if not name or name == DEFAULT_TIMEZONE:
+        return "IST"
+    return name
+
+
+def is_valid_timezone(name):
+    return name in pytz.all_timezones_set
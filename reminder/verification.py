@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# How long a verified chat, and a chat that cannot be reached, stay cached
+VERIFIED_TTL = 3600.0
+UNREACHABLE_TTL = 6 * 3600.0
+
+# Telegram descriptions that mean the chat itself cannot receive messages from
+# the bot (blocked, kicked, deleted account, wrong id), as opposed to a bad
+# message or a temporary failure
+_UNREACHABLE_MARKERS = ("Forbidden:", "chat not found", "user not found", "PEER_ID_INVALID")
+
+
+# Function to tell whether an error description means the chat is unreachable
+def is_unreachable(description):
+    return any(marker in (description or "") for marker in _UNREACHABLE_MARKERS)
+
+
+class VerificationCache:
+    """Thread-safe TTL cache of chat verification results keyed by (token, chat_id).
+
+    Verified chats and unreachable chats expire separately, so a chat that has
+    blocked the bot is not asked about again on every send. When full, expired
+    entries are dropped first and then the oldest ones.
+    """
+
+    def __init__(self, ttl=VERIFIED_TTL, negative_ttl=UNREACHABLE_TTL, maxsize=100_000, clock=time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    # Function to get a cached (success, result) pair, or None when unknown or expired
+    def get(self, token, chat_id):
+        key = (token, str(chat_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, success, result = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            return success, result
+
+    def put(self, token, chat_id, success, result):
+        key = (token, str(chat_id))
+        now = self._clock()
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.maxsize:
+                self._entries = {k: e for k, e in self._entries.items() if e[0] > now}
+                while len(self._entries) >= self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (now + (self.ttl if success else self.negative_ttl), success, result)
+
+    def discard(self, token, chat_id):
+        with self._lock:
+            self._entries.pop((token, str(chat_id)), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ChatVerifier:
+    """Verifies chat ids for one bot with getChat, through a VerificationCache.
+
+    Only definite answers are cached: a valid chat, or one Telegram says the
+    bot cannot reach. Network errors and rate limiting are returned but not
+    remembered. `verify_many` checks uncached ids concurrently over the
+    client's pooled connections.
+    """
+
+    def __init__(self, client, cache=None, workers=8):
+        self.client = client
+        self.cache = cache if cache is not None else VerificationCache()
+        self.workers = workers
+
+    # Function to verify one chat id; returns (success, chat data or error description)
+    def verify(self, chat_id):
+        cached = self.cache.get(self.client.token, chat_id)
+        if cached is not None:
+            return cached
+        return self._fetch(chat_id)
+
+    # Function to verify many chat ids at once; returns {chat_id: (success, result)}
+    def verify_many(self, chat_ids):
+        results = {}
+        missing = []
+        for chat_id in dict.fromkeys(chat_ids):
+            cached = self.cache.get(self.client.token, chat_id)
+            if cached is None:
+                missing.append(chat_id)
+            else:
+                results[chat_id] = cached
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                results.update(zip(missing, pool.map(self._fetch, missing)))
+        return results
+
+    # Function to get the reason a chat is known to be unreachable, without a request
+    def known_unreachable(self, chat_id):
+        cached = self.cache.get(self.client.token, chat_id)
+        if cached is not None and not cached[0]:
+            return cached[1]
+        return None
+
+    # Function to learn from a send: a delivered message proves the chat works and
+    # a "blocked"/"not found" failure proves it does not
+    def record_send(self, chat_id, success, description):
+        if success:
+            if self.known_unreachable(chat_id) is not None:
+                self.cache.discard(self.client.token, chat_id)
+        elif is_unreachable(description):
+            self.cache.put(self.client.token, chat_id, False, description)
+
+    def _fetch(self, chat_id):
+        try:
+            status_code, response_json = self.client.call("getChat", {'chat_id': chat_id})
+        except requests.RequestException as e:
+            return False, str(e)
+
+        if status_code == 200 and response_json.get('ok'):
+            result = (True, response_json.get('result', {}))
+        else:
+            result = (False, response_json.get('description', 'Unknown error'))
+            if not is_unreachable(result[1]):
+                return result
+        self.cache.put(self.client.token, chat_id, *result)
+        return result
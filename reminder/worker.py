@@ -0,0 +1,528 @@
+import argparse
+import os
+import queue
+import signal
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from reminder.cohorts import iter_recipients
+from reminder.content import local_day
+from reminder.delivery import TELEGRAM_API_BASE, Sender, TelegramClient, TokenBucket
+from reminder.dispatcher import Dispatcher
+from reminder.metrics import Metrics, MetricsReporter, stats_path
+from reminder.misfire import DEFER, DROP, SEND, plan_fire
+from reminder.outbox import OutboxWriter
+from reminder.recurrence import ist, next_fire_times
+from reminder.render import render_batch, render_group
+from reminder.sharding import HashRing
+from reminder.store import (DEFAULT_DB_PATH, DEFAULT_TENANT, DEFERRED, EXPANDED, EXPANDING, PENDING,
+                            SKIPPED, TOKEN_SETTING, ReminderStore)
+from reminder.timezones import zone_table
+from reminder.verification import ChatVerifier
+
+
+class Worker:
+    """Headless process that owns scheduling and delivery.
+
+    The Streamlit UI only writes reminders to the shared store; the worker
+    picks them up (polling the store's data_version), fires them from its own
+    dispatcher and hands the messages to a pooled Sender. Chats that have
+    blocked the bot (or do not exist) are remembered per token and skipped
+    until the negative cache entry expires. Dispatch lag, send latency and
+    outcomes go to `metrics`, which a MetricsReporter publishes.
+
+    Group reminders are one scheduled entry each; when one fires, a fan-out
+    thread streams its recipients from the store a chunk at a time into the
+    sender, so the dispatcher is never held up by a large group.
+
+    Every message is written to the store's outbox as (reminder, fire
+    instant, chat) in the same transaction that moves its reminder on, and
+    its outcome is group-committed later by an OutboxWriter. A restart
+    replays what was left pending, and the outbox key keeps a fire from
+    being sent twice.
+
+    Fires later than their reminder's grace window (after downtime) follow
+    its misfire policy. Late messages wait in the outbox as deferred and a
+    catch-up thread releases them, oldest first, at no more than
+    `catch_up_rate` per second, so a restart does not burst into Telegram's
+    rate limits and on-time reminders keep going out alongside.
+
+    Each tenant sends with its own bot, through its own Sender (connection
+    pool and per-bot rate budget). Messages reach a Sender through the
+    bot's own unbounded feed and feeder thread, so a bot whose queue is full
+    (it is behind its rate limit) holds up only its own feed, never the
+    dispatcher or the other bots. With `shards` > 1 a consistent hash ring
+    splits the tenants between worker processes; this worker only schedules,
+    replays and catches up the reminders of the tenants it owns, so a bot's
+    rate limit is only ever spent by one process.
+    """
+
+    def __init__(self, store, token=None, workers=8, horizon=3600.0, poll_interval=1.0, metrics=None,
+                 catch_up_rate=5.0, shard=0, shards=1, api_base=TELEGRAM_API_BASE):
+        self.store = store
+        self.api_base = api_base
+        self.metrics = metrics or Metrics()
+        # Token for the default tenant; other tenants' tokens come from the store
+        self.token = token
+        self.shard = shard
+        self.ring = HashRing(shards)
+        # Tenants owned by this shard (None: all of them) and their bot tokens
+        self._tenants = None
+        self._tokens = {}
+        self._load_tenants()
+        self.workers = workers
+        self.catch_up_rate = catch_up_rate
+        self._catch_up_wake = threading.Event()
+        self._stopping = threading.Event()
+        self._catch_up_thread = None
+        self._senders = {}
+        # token -> (queue of messages waiting for the bot's sender, its feeder thread)
+        self._feeds = {}
+        self._verifiers = {}
+        self._senders_lock = threading.Lock()
+        self._fanout = queue.Queue()
+        self._fanout_thread = None
+        self.outbox = OutboxWriter(store)
+        self._last_version = None
+        self._last_revision = None
+        self.dispatcher = Dispatcher(
+            self.fire_due_reminders,
+            source=lambda start, until: store.due_between(start, until, self._tenants),
+            horizon=horizon,
+            changed=self._store_changed,
+            poll_interval=poll_interval,
+        )
+        self.metrics.gauge("reminder_send_queue_depth",
+                           lambda: sum(sender.queue_depth for sender in list(self._senders.values()))
+                           + sum(feed.qsize() for feed, _ in list(self._feeds.values())))
+        self.metrics.gauge("reminder_dispatcher_pending", lambda: len(self.dispatcher))
+        self.metrics.gauge("reminder_catch_up_backlog", lambda: store.deferred_count(self._tenants))
+
+    # Function to (re)load the tenants and their tokens; a shard keeps only the
+    # tenants the hash ring assigns to it
+    def _load_tenants(self):
+        self._tokens = {tenant['id']: tenant['token'] for tenant in self.store.tenants()}
+        if self.ring.shards > 1:
+            self._tenants = [tenant for tenant in [DEFAULT_TENANT, *self._tokens]
+                             if self.ring.shard_for(tenant) == self.shard]
+
+    # Function to map each tenant of `reminders` to its bot token (None if it has
+    # none). For the default tenant an explicit token wins over the one saved by the UI.
+    def _tokens_for(self, reminders):
+        tokens = {}
+        for reminder in reminders:
+            tenant = reminder['tenant']
+            if tenant not in tokens:
+                tokens[tenant] = ((self.token or self.store.get_setting(TOKEN_SETTING))
+                                  if tenant == DEFAULT_TENANT else self._tokens.get(tenant))
+        return tokens
+
+    def _sender(self, token):
+        with self._senders_lock:
+            return self._sender_locked(token)
+
+    def _sender_locked(self, token):
+        sender = self._senders.get(token)
+        if sender is None:
+            client = self._make_client(token)
+            verifier = self._verifiers[token] = ChatVerifier(client)
+
+            def on_result(chat_id, success, description, key):
+                verifier.record_send(chat_id, success, description)
+                self.outbox.record(key, success, description)
+                self.log_delivery(chat_id, success, description, key[0])
+
+            self.outbox.start()
+            sender = self._senders[token] = self._make_sender(client, on_result)
+            feed = queue.Queue()
+            thread = threading.Thread(target=self._feed_loop, args=(feed, sender), name="reminder-feed", daemon=True)
+            self._feeds[token] = (feed, thread)
+            thread.start()
+        return sender
+
+    # Function to queue a message for a bot without waiting on its sender
+    def _submit(self, token, chat_id, message, context):
+        with self._senders_lock:
+            self._sender_locked(token)
+            feed = self._feeds[token][0]
+        feed.put((chat_id, message, context))
+
+    # Function to move a bot's fed messages into its sender; only this thread
+    # waits when the sender's queue is full
+    def _feed_loop(self, feed, sender):
+        while True:
+            job = feed.get()
+            try:
+                if job is None:
+                    return
+                sender.submit(*job)
+            finally:
+                feed.task_done()
+
+    def _make_client(self, token):
+        return TelegramClient(token, api_base=self.api_base)
+
+    def _make_sender(self, client, on_result):
+        return Sender(client, workers=self.workers, on_result=on_result, metrics=self.metrics).start()
+
+    def _verifier(self, token):
+        self._sender(token)
+        return self._verifiers[token]
+
+    # Function for the dispatcher to poll for reminders or tenants written by
+    # another process. data_version is a cheap first check, but it also moves
+    # for this worker's own outbox commits from other threads, so only a new
+    # schedule revision counts as a change.
+    def _store_changed(self):
+        version = self.store.data_version()
+        if version == self._last_version:
+            return False
+        self._last_version = version
+        revision = self.store.schedule_revision()
+        changed = self._last_revision is not None and revision != self._last_revision
+        self._last_revision = revision
+        if changed:
+            self._load_tenants()
+        return changed
+
+    # Function to log the outcome of a scheduled send
+    def log_delivery(self, chat_id, success, description, reminder_id):
+        now = datetime.now(ist)
+        print(f"Reminder {reminder_id} executed at {now.strftime('%Y-%m-%d %H:%M:%S')} IST - Success: {success}")
+
+    # Function for the dispatcher to run for every batch of due reminders
+    def fire_due_reminders(self, due):
+        # One indexed lookup for the whole tick; deleted reminders simply drop out
+        reminders = self.store.get_many(reminder_id for reminder_id, _ in due)
+        firing = [(reminders[reminder_id], fire_at) for reminder_id, fire_at in due
+                  if reminder_id in reminders and reminders[reminder_id]['active']]
+        tokens = self._tokens_for(reminder for reminder, _ in firing)
+        verifiers = {token: self._verifier(token) for token in set(tokens.values()) if token}
+        # Late fires follow their reminder's misfire policy
+        now = time.time()
+        plans = [plan_fire(reminder, fire_at, now) for reminder, fire_at in firing]
+
+        # Outbox rows for this tick: (reminder_id, fire_at, chat_id, message, status)
+        entries = []
+        sending = []
+        missed = no_token = 0
+        for (reminder, fire_at), (action, _) in zip(firing, plans):
+            chat_id = reminder['receiver_chat_id'] if reminder['audience'] is None else ""
+            token = tokens[reminder['tenant']]
+            if action == DROP or not token:
+                entries.append((reminder['id'], fire_at, chat_id, None, SKIPPED))
+                if action == DROP:
+                    missed += 1
+                else:
+                    no_token += 1
+                continue
+            if reminder['audience'] is not None:
+                entries.append((reminder['id'], fire_at, "", None, EXPANDING))
+                continue
+            # Sends to chats already known to be unreachable would only fail again
+            reason = verifiers[token].known_unreachable(chat_id)
+            if reason is None:
+                sending.append((reminder, fire_at, DEFERRED if action == DEFER else PENDING))
+                continue
+            entries.append((reminder['id'], fire_at, chat_id, None, SKIPPED))
+            print(f"Reminder {reminder['id']} skipped - chat {chat_id} is unreachable: {reason}")
+        if no_token:
+            print(f"No Telegram bot token configured; skipping {no_token} reminder(s)")
+        if missed:
+            print(f"Skipped {missed} missed reminder(s) past their grace window")
+
+        # Render the whole tick at once (each message picked for the recipient's
+        # week of pregnancy on the recipient's local fire day)
+        messages = render_batch([reminder for reminder, _, _ in sending],
+                                [local_day(reminder['timezone'], fire_at) for reminder, fire_at, _ in sending])
+        entries.extend((reminder['id'], fire_at, reminder['receiver_chat_id'], message, status)
+                       for (reminder, fire_at, status), message in zip(sending, messages))
+
+        # Recurring reminders go back on the heap at their next occurrence
+        # (computed for the whole tick in one vectorized call); one-time
+        # reminders get None and are retired by the store. Skipped and
+        # coalesced misfires continue from now, past the occurrences missed.
+        next_fires = next_fire_times([reminder for reminder, _ in firing], [after for _, after in plans])
+        rescheduled = [(reminder['id'], next_fire_at) for (reminder, _), next_fire_at in zip(firing, next_fires)]
+
+        # The outbox rows and the rescheduling commit together, before anything
+        # is sent: a crash after this point is finished by replay_outbox, a
+        # crash before it fires the tick again. Rows already in the outbox are
+        # duplicates and are not sent again.
+        new_entries = self.store.record_tick(rescheduled, entries)
+        self.metrics.record_fired([fire_at for _, fire_at in firing],
+                                  skipped=sum(1 for entry in entries if entry[4] == SKIPPED) - missed,
+                                  missed=missed)
+        self._dispatch(new_entries, reminders, tokens)
+        return rescheduled
+
+    # Function to hand outbox entries on: pending messages to their tenant's
+    # sender, deferred ones to the catch-up thread and group expansions to the
+    # fan-out thread. Every entry's tenant must have a token in `tokens`.
+    def _dispatch(self, entries, reminders, tokens):
+        for reminder_id, fire_at, chat_id, message, status in entries:
+            token = tokens[reminders[reminder_id]['tenant']]
+            if status == PENDING:
+                self._submit(token, chat_id, message, (reminder_id, fire_at, chat_id))
+            elif status == DEFERRED:
+                self._catch_up()
+            elif status == EXPANDING:
+                self._expand_group(reminders[reminder_id], fire_at, token)
+
+    # Function to wake the catch-up thread (starting it if need be)
+    def _catch_up(self):
+        if self._catch_up_thread is None:
+            self._catch_up_thread = threading.Thread(target=self._catch_up_loop, name="reminder-catch-up",
+                                                     daemon=True)
+            self._catch_up_thread.start()
+        self._catch_up_wake.set()
+
+    # Function to release deferred messages to the sender, oldest first, at no
+    # more than catch_up_rate per second. Each batch is moved to pending in
+    # the outbox before it is submitted, so a stop midway leaves the rest of
+    # the batch for replay_outbox.
+    def _catch_up_loop(self):
+        bucket = TokenBucket(self.catch_up_rate)
+        batch_size = max(1, int(self.catch_up_rate))
+        while not self._stopping.is_set():
+            entries = self.store.release_deferred(batch_size, self._tenants)
+            if not entries:
+                self._catch_up_wake.wait(1.0)
+                self._catch_up_wake.clear()
+                continue
+            reminders = self.store.get_many({entry[0] for entry in entries})
+            tokens = self._tokens_for(reminders.values())
+            self.store.mark_outbox(
+                [(SKIPPED, "Reminder deleted", *entry[:3]) for entry in entries if entry[0] not in reminders]
+                + [(SKIPPED, "No bot token configured", *entry[:3]) for entry in entries
+                   if entry[0] in reminders and not tokens[reminders[entry[0]]['tenant']]])
+            for reminder_id, fire_at, chat_id, message, _ in entries:
+                token = tokens[reminders[reminder_id]['tenant']] if reminder_id in reminders else None
+                if not token:
+                    continue
+                if self._stopping.wait(bucket.reserve()):
+                    return
+                self._submit(token, chat_id, message, (reminder_id, fire_at, chat_id))
+
+    # Function to finish what an earlier run left open. Pending messages were
+    # never confirmed, so they are sent (their stored text, once); group
+    # expansions resume and skip members already in the outbox.
+    def replay_outbox(self):
+        entries = self.store.open_outbox(self._tenants)
+        if not entries:
+            return 0
+        reminders = self.store.get_many({entry[0] for entry in entries})
+        deleted = [entry for entry in entries if entry[0] not in reminders]
+        self.store.mark_outbox([(SKIPPED, "Reminder deleted", *entry[:3]) for entry in deleted])
+        tokens = self._tokens_for(reminders.values())
+        entries = [entry for entry in entries if entry[0] in reminders]
+        waiting = [entry for entry in entries if not tokens[reminders[entry[0]]['tenant']]]
+        if waiting:
+            print(f"No Telegram bot token configured; {len(waiting)} outbox entries left to replay")
+        entries = [entry for entry in entries if tokens[reminders[entry[0]]['tenant']]]
+        self._dispatch(entries, reminders, tokens)
+        print(f"Replayed {len(entries)} unfinished outbox entries")
+        return len(entries)
+
+    def _expand_group(self, reminder, fire_at, token):
+        if self._fanout_thread is None:
+            self._fanout_thread = threading.Thread(target=self._fanout_loop, name="reminder-fanout", daemon=True)
+            self._fanout_thread.start()
+        self._fanout.put((reminder, fire_at, token))
+
+    def _fanout_loop(self):
+        while True:
+            job = self._fanout.get()
+            try:
+                if job is None:
+                    return
+                self.send_group(*job)
+            except Exception as e:
+                print(f"Group reminder {job[0]['id']} failed to expand: {e}")
+            finally:
+                self._fanout.task_done()
+
+    # Function to send one group reminder to each of its recipients. Recipients
+    # come from the store a chunk at a time and the sender's bounded queue
+    # pushes back, so memory stays flat for any group size. A group expanded
+    # after its grace window has its messages deferred to the catch-up rate.
+    def send_group(self, reminder, fire_at, token):
+        sender = self._sender(token)
+        verifier = self._verifier(token)
+        deliver = PENDING if plan_fire(reminder, fire_at, time.time())[0] == SEND else DEFERRED
+        day = local_day(reminder['timezone'], fire_at)
+        today = date(1970, 1, 1) + timedelta(days=day)
+        queued = skipped = 0
+        for chunk in iter_recipients(self.store, reminder, today):
+            reachable, unreachable = [], []
+            for recipient in chunk:
+                if verifier.known_unreachable(recipient['chat_id']) is None:
+                    reachable.append(recipient)
+                else:
+                    unreachable.append(recipient)
+            messages = render_group(reminder, reachable, day)
+            # Each chunk is one outbox transaction; members already recorded by
+            # an interrupted expansion are not sent again
+            new_entries = self.store.add_outbox(
+                [(reminder['id'], fire_at, r['chat_id'], message, deliver) for r, message in zip(reachable, messages)]
+                + [(reminder['id'], fire_at, r['chat_id'], None, SKIPPED) for r in unreachable])
+            for reminder_id, _, chat_id, message, status in new_entries:
+                if status == PENDING:
+                    sender.submit(chat_id, message, context=(reminder_id, fire_at, chat_id))
+                    queued += 1
+                elif status == DEFERRED:
+                    self._catch_up()
+                    queued += 1
+                else:
+                    skipped += 1
+        self.store.mark_outbox([(EXPANDED, None, reminder['id'], fire_at, "")])
+        if skipped:
+            self.metrics.record_skipped(skipped)
+        print(f"Group reminder {reminder['id']} queued for {queued} recipient(s), "
+              f"skipped {skipped} unreachable")
+        return queued
+
+    # Function to recompute upcoming fires for zones whose offset rules changed
+    # (e.g. a tzdata update moved a DST transition) since the last start.
+    # Each affected zone is rescheduled with one vectorized call and one
+    # transaction; reminders in unchanged zones are not touched.
+    def reschedule_changed_zones(self, now=None):
+        now = time.time() if now is None else now
+        for zone in self.store.timezones():
+            fingerprint = str(zone_table(zone).fingerprint)
+            key = f"zone_fingerprint:{zone}"
+            known = self.store.get_setting(key)
+            if known is not None and known != fingerprint:
+                upcoming = [r for r in self.store.active_in_timezone(zone)
+                            if r['next_fire_at'] is not None and r['next_fire_at'] > now]
+                next_fires = next_fire_times(upcoming, now)
+                self.store.set_next_fire_many(zip([r['id'] for r in upcoming], next_fires))
+                print(f"Time zone rules for {zone} changed; rescheduled {len(upcoming)} reminder(s)")
+            if known != fingerprint:
+                self.store.set_setting(key, fingerprint)
+
+    def run(self, reporter=None):
+        self.reschedule_changed_zones()
+        self.replay_outbox()
+        self._catch_up()
+        if reporter is not None:
+            reporter.start()
+        # Load the first window before reporting in, so "started" means ready to fire
+        self.dispatcher.refill()
+        shard = f" (shard {self.shard + 1} of {self.ring.shards})" if self.ring.shards > 1 else ""
+        print(f"Reminder worker started on {self.store.path}{shard}")
+        try:
+            self.dispatcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop_threads()
+            for sender in self._senders.values():
+                sender.join()
+                sender.stop()
+            self.outbox.stop()
+            if reporter is not None:
+                reporter.stop()
+            print("Reminder worker stopped")
+
+    # Function to stop the catch-up, fan-out and feeder threads (they feed the
+    # senders); messages already fed are handed on first
+    def _stop_threads(self):
+        self._stopping.set()
+        if self._catch_up_thread is not None:
+            self._catch_up_wake.set()
+            self._catch_up_thread.join()
+        if self._fanout_thread is not None:
+            self._fanout.put(None)
+            self._fanout_thread.join()
+        with self._senders_lock:
+            feeds = list(self._feeds.values())
+        for feed, _ in feeds:
+            feed.put(None)
+        for _, thread in feeds:
+            thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m reminder worker",
+                                     description="Run the reminder scheduler and Telegram sender")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="path to the reminder database")
+    parser.add_argument("--token", default=os.environ.get("TELEGRAM_BOT_TOKEN"),
+                        help="default tenant's bot token (defaults to $TELEGRAM_BOT_TOKEN, "
+                             "then the one saved by the UI)")
+    parser.add_argument("--api-base", default=TELEGRAM_API_BASE,
+                        help="Bot API server (defaults to $TELEGRAM_API_BASE, then https://api.telegram.org)")
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads",
+                        help="send with a thread pool per bot, or with asyncio tasks on one event loop")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent sender threads (threads engine)")
+    parser.add_argument("--max-in-flight", type=int, default=10000,
+                        help="sends in flight at once across all bots (async engine)")
+    parser.add_argument("--horizon", type=float, default=3600.0,
+                        help="seconds of upcoming reminders kept in memory")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="seconds between checks for reminders written by the UI")
+    parser.add_argument("--catch-up-rate", type=float, default=5.0,
+                        help="messages per second sent for reminders missed while the worker was down")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="split tenants across this many worker processes")
+    parser.add_argument("--shard", type=int, default=None,
+                        help="run only this shard (0-based); without it all shards are started")
+    parser.add_argument("--stats-file", default=None,
+                        help="where to write metrics for the UI dashboard (defaults to <db>-stats.json, "
+                             "or <db>-stats-<shard>.json with --shards)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics "
+                             "(PORT + shard for each shard)")
+    args = parser.parse_args(argv)
+
+    if args.shards > 1 and args.shard is None:
+        run_shards(list(argv if argv is not None else []), args.shards)
+        return
+    shard = args.shard or 0
+    options = dict(token=args.token, horizon=args.horizon, poll_interval=args.poll_interval,
+                   catch_up_rate=args.catch_up_rate, shard=shard, shards=args.shards, api_base=args.api_base)
+    if args.engine == "async":
+        # Only the async engine needs aiohttp
+        from reminder.aio import AsyncWorker
+        worker = AsyncWorker(ReminderStore(args.db), max_in_flight=args.max_in_flight, **options)
+    else:
+        worker = Worker(ReminderStore(args.db), workers=args.workers, **options)
+    port = args.metrics_port + shard if args.metrics_port is not None else None
+    path = args.stats_file or stats_path(args.db, shard if args.shards > 1 else None)
+    reporter = MetricsReporter(worker.metrics, path=path, port=port)
+    worker.run(reporter)
+
+
+# Function to start one worker process per shard and wait for them all. Ctrl-C
+# or SIGTERM on the parent is passed to each shard once, as SIGTERM, and every
+# shard shuts down as a single worker does on Ctrl-C.
+def run_shards(argv, shards):
+    # Only the parent of several shards needs multiprocessing
+    import multiprocessing
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    processes = [multiprocessing.Process(target=_run_shard, args=(argv + ["--shard", str(shard)],),
+                                         name=f"reminder-shard-{shard}")
+                 for shard in range(shards)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+def _run_shard(argv):
+    # Ctrl-C on the terminal reaches every process; only the parent acts on it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _interrupt)
+    main(argv)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
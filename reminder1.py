@@ -1,16 +1,20 @@
 import streamlit as st
-import pandas as pd
 import datetime
+import os
+import re
 import time
-import random
-import schedule
-import threading
-import requests
 from datetime import datetime, timedelta
 import pytz
 
-# Global storage for reminders that can be accessed by the background thread
-global_reminders = {}
+from reminder.cohorts import TRIMESTERS, audience_label, members_audience, weeks_audience
+from reminder.delivery import TelegramClient
+from reminder.metrics import read_stats, stats_paths
+from reminder.misfire import DEFAULT_GRACE, DEFAULT_POLICY, POLICIES
+from reminder.render import generate_cordial_message
+from reminder.recurrence import describe_schedule, next_fire_time
+from reminder.store import DEFAULT_TENANT, TOKEN_SETTING, ReminderStore
+from reminder.timezones import DEFAULT_TIMEZONE, zone_label
+from reminder.verification import ChatVerifier, is_unreachable
 
 # Set page config
 st.set_page_config(
@@ -26,206 +30,100 @@ This app allows you to schedule friendly medication reminders for expectant moth
 The app generates supportive and encouraging messages via Telegram.
 """)
 
-# Set timezone to IST
-ist = pytz.timezone('Asia/Kolkata')
-system_tz = datetime.now().astimezone().tzinfo
+# Durable reminder storage shared by every session and the reminder worker.
+# Scheduling and delivery run in a separate process: `python -m reminder worker`
+@st.cache_resource
+def get_store():
+    return ReminderStore()
 
-# Initialize session state variables if they don't exist
-if 'reminders' not in st.session_state:
-    st.session_state.reminders = []
-if 'scheduled_jobs' not in st.session_state:
-    st.session_state.scheduled_jobs = {}
+store = get_store()
 
 # Sidebar for Telegram Bot configuration
 st.sidebar.title("Telegram Bot Configuration")
 st.sidebar.info("You need to create a Telegram bot to use this app. Visit @BotFather on Telegram to create one.")
 telegram_bot_token = st.sidebar.text_input("Telegram Bot Token", type="password")
 
-# Store Telegram credentials in session state
-if not st.session_state.get('telegram_configured'):
-    if telegram_bot_token:
-        st.session_state['telegram_bot_token'] = telegram_bot_token
-        st.session_state['telegram_configured'] = True
-        st.sidebar.success("Telegram bot configured!")
+# The default tenant's token is shared configuration in the store, used by the
+# worker and by every session, so it only changes when someone saves a new one
+if st.sidebar.button("Save Token"):
+    if telegram_bot_token.strip():
+        store.set_setting(TOKEN_SETTING, telegram_bot_token.strip())
+        st.sidebar.success("Telegram bot token saved!")
     else:
-        st.sidebar.warning("Please provide your Telegram bot token to use the app.")
+        st.sidebar.error("Please enter a bot token to save.")
+elif store.get_setting(TOKEN_SETTING):
+    st.sidebar.success("Telegram bot configured!")
+else:
+    st.sidebar.warning("Please provide your Telegram bot token to use the app.")
 
-# Enhanced Medication message templates with more variety
-medication_message_templates = [
-    "Hello beautiful! 💕 It's time for your daily prenatal vitamins. These little nutrients are doing big work helping your baby grow strong and healthy!",
-    
-    "Sending you warm thoughts today! ✨ Just a friendly reminder about your prenatal vitamins/medication. Taking care of yourself means taking care of your little miracle too!",
-    
-    "Hope your day is going wonderfully! 💖 This is your gentle reminder to take your medication - a small act with a big impact on your baby's development.",
-    
-    "Good day, mom-to-be! 💫 Time for your prenatal vitamins - they're helping to build your baby's bones, brain, and body systems right now!",
-    
-    "Hello lovely! 🌷 Just a caring reminder that your medication/vitamins are waiting for you. Your commitment to your health supports your little one's growth journey!",
-    
-    "Thinking of you both today! 👼 Remember those prenatal vitamins that help prevent neural tube defects and support healthy development? It's time for them!",
-    
-    "Sending a gentle nudge about your medication! 🌟 These important nutrients are supporting your baby's development right now in ways you can't see but will definitely benefit from!",
-    
-    "Hi there beautiful mom-to-be! 💝 Your medication reminder has arrived - these vitamins are particularly important during pregnancy when your nutritional needs increase.",
-    
-    "A friendly reminder with love! 💊 Your prenatal vitamins are essential partners on this incredible journey - they're helping your baby develop properly every day!",
-    
-    "Hello sunshine! ☀️ Don't forget your medication today - it's providing important nutrients like folic acid, iron, calcium, and DHA that your growing baby needs!",
-    
-    "Gentle reminder time! 🕒 Your vitamins are waiting - they're supporting your immune system while you work on the amazing job of growing your little miracle!",
-    
-    "Thinking of you and your precious cargo! 🚢 Time to take your prenatal vitamins - they're helping prevent anemia and other complications while supporting healthy growth!",
-    
-    "Hello wonderful! 🌈 This is your medication reminder - consistent vitamin intake helps ensure your baby gets all the nutrients needed for optimal development!",
-    
-    "Special delivery! 📬 Your friendly reminder to take your prenatal medication - it's providing essential nutrients that might be hard to get enough of from diet alone!",
-    
-    "Sending care your way! 💗 Your medication reminder has arrived - these supplements are especially important when growing your precious little one!"
-]
+# Tenants each have their own bot and reminders; the default tenant uses the token above
+st.sidebar.title("Tenant")
+tenant_names = {DEFAULT_TENANT: "Default"}
+tenant_names.update((t['id'], t['name']) for t in store.tenants())
+tenant = st.sidebar.selectbox("Tenant", list(tenant_names), format_func=tenant_names.get)
+with st.sidebar.expander("Add a Tenant"):
+    new_tenant_name = st.text_input("Tenant Name")
+    new_tenant_token = st.text_input("Tenant Bot Token", type="password")
+    if st.button("Save Tenant"):
+        tenant_id = re.sub(r"\W+", "-", new_tenant_name.strip().lower()).strip("-")
+        if not tenant_id or not new_tenant_token:
+            st.error("Please enter a name and a bot token for the tenant.")
+        else:
+            store.set_tenant(tenant_id, new_tenant_name.strip(), new_tenant_token)
+            st.rerun()
 
-# Function to generate a cordial message
-def generate_cordial_message(reminder_text, sender_name="", receiver_name=""):
-    base_message = random.choice(medication_message_templates)
-    
-    message_parts = []
-    
-    # Add personalized greeting if receiver name is provided
-    if receiver_name:
-        message_parts.append(f"Dear {receiver_name},\n\n")
-    
-    # Add the main message
-    message_parts.append(base_message)
-    
-    # Add the reminder text if provided
-    if reminder_text:
-        message_parts.append(f"\n\n📝 {reminder_text}")
-    
-    # Add sender signature if provided
-    if sender_name:
-        message_parts.append(f"\n\nWarmly,\n{sender_name}")
-    
-    return "".join(message_parts)
+# Function to get the selected tenant's bot token (None until one is configured)
+def tenant_token():
+    if tenant == DEFAULT_TENANT:
+        return store.get_setting(TOKEN_SETTING)
+    return store.tenant_token(tenant)
+
+# One pooled, keep-alive Bot API client per bot token
+@st.cache_resource
+def get_telegram_client(token):
+    return TelegramClient(token)
+
+# Chat verification results are cached per token across reruns and sessions
+@st.cache_resource
+def get_chat_verifier(token):
+    return ChatVerifier(get_telegram_client(token))
 
 # Function to send message via Telegram
 def send_telegram_message(chat_id, message):
-    try:
-        # Check if Telegram is configured
-        if not st.session_state.get('telegram_configured'):
-            return False, "Telegram bot token not configured. Please provide it in the sidebar."
-        
-        # Telegram Bot API endpoint for sending messages
-        url = f"https://api.telegram.org/bot{st.session_state['telegram_bot_token']}/sendMessage"
-        
-        # Parameters for the API call
-        params = {
-            'chat_id': chat_id,
-            'text': message,
-            'parse_mode': 'HTML'  # Allow some HTML formatting
-        }
-        
-        # Send the message
-        response = requests.post(url, params=params)
-        response_json = response.json()
-        
-        if response.status_code == 200 and response_json.get('ok'):
-            return True, "Message sent successfully!"
-        else:
-            error_description = response_json.get('description', 'Unknown error')
-            return False, f"Failed to send message: {error_description}"
-    
-    except Exception as e:
-        return False, f"Error sending message: {str(e)}"
+    # Check if Telegram is configured
+    token = tenant_token()
+    if not token:
+        return False, "Telegram bot token not configured. Please provide it in the sidebar."
+    
+    success, description, _, _ = get_telegram_client(token).send_message(chat_id, message)
+    get_chat_verifier(token).record_send(chat_id, success, description)
+    return success, description
 
 # Function to verify a Telegram chat ID
 def verify_telegram_chat_id(chat_id):
     try:
         # Check if Telegram is configured
-        if not st.session_state.get('telegram_configured'):
+        token = tenant_token()
+        if not token:
             return False, "Telegram bot token not configured. Please provide it in the sidebar."
         
-        # Try to send a test message to the chat ID
-        url = f"https://api.telegram.org/bot{st.session_state['telegram_bot_token']}/getChat"
-        params = {'chat_id': chat_id}
-        
-        response = requests.post(url, params=params)
-        response_json = response.json()
-        
-        if response.status_code == 200 and response_json.get('ok'):
-            user_data = response_json.get('result', {})
-            return True, user_data
-        else:
-            error_description = response_json.get('description', 'Unknown error')
-            return False, error_description
+        return get_chat_verifier(token).verify(chat_id)
     
     except Exception as e:
         return False, str(e)
 
-# Function to execute a scheduled reminder
-def execute_reminder(reminder_id):
-    # Use the global reminders dictionary instead of session state
-    reminder = global_reminders.get(reminder_id)
-    
-    if reminder and reminder['active']:
-        # Generate the message
-        message = generate_cordial_message(
-            reminder.get('text', ''),
-            reminder.get('sender_name', ''),
-            reminder.get('receiver_name', '')
-        )
-        
-        # Send the message
-        success, _ = send_telegram_message(reminder['receiver_chat_id'], message)
-        
-        # Log the execution
-        now = datetime.now(ist)
-        print(f"Reminder {reminder_id} executed at {now.strftime('%Y-%m-%d %H:%M:%S')} IST - Success: {success}")
+# Function to get why reminders cannot be scheduled for a chat, or None if they can.
+# Only a definite answer (blocked, not found) blocks; a network error does not.
+def unreachable_reason(chat_id):
+    success, result = verify_telegram_chat_id(chat_id)
+    if not success and is_unreachable(result):
+        return result
+    return None
 
 # Function to delete a reminder
 def delete_reminder(reminder_id):
-    # Find the reminder in the list
-    reminder_index = next((i for i, r in enumerate(st.session_state.reminders) if r['id'] == reminder_id), None)
-    
-    if reminder_index is not None:
-        # Cancel the scheduled job if it exists
-        if reminder_id in st.session_state.scheduled_jobs:
-            schedule.cancel_job(st.session_state.scheduled_jobs[reminder_id])
-            del st.session_state.scheduled_jobs[reminder_id]
-        
-        # Remove the reminder from the list
-        st.session_state.reminders.pop(reminder_index)
-        
-        # Also remove from global reminders
-        if reminder_id in global_reminders:
-            del global_reminders[reminder_id]
-            
-        return True
-    
-    return False
-
-# Function to convert IST time to system time for scheduling
-def convert_ist_to_system_time(ist_time):
-    # Create a datetime with today's date and the given IST time
-    ist_naive = datetime.combine(datetime.now().date(), ist_time)
-    
-    # Localize to IST
-    ist_dt = ist.localize(ist_naive)
-    
-    # Convert to system timezone
-    system_dt = ist_dt.astimezone(system_tz)
-    
-    # Return just the time portion
-    return system_dt.time()
-
-# Function for the scheduler to run
-def run_scheduled_jobs():
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
-
-# Start the scheduler in a separate thread
-if 'scheduler_thread' not in st.session_state:
-    st.session_state.scheduler_thread = threading.Thread(target=run_scheduled_jobs, daemon=True)
-    st.session_state.scheduler_thread.start()
+    # Remove the reminder from the store; the worker skips ids it can no longer find
+    return store.delete(reminder_id)
 
 # Create two columns for sender and receiver information
 col1, col2 = st.columns(2)
@@ -239,11 +137,15 @@ with col2:
     receiver_name = st.text_input("Mom-to-Be Name", key="receiver_name")
     receiver_chat_id = st.text_input("Telegram Chat ID", 
                                      help="The recipient must start a conversation with your bot first. You can find their Chat ID using @userinfobot on Telegram.")
-    due_date = st.date_input("Expected Due Date", min_value=datetime.now(ist).date())
+    receiver_timezone = st.selectbox("Recipient Time Zone", pytz.common_timezones,
+                                     index=pytz.common_timezones.index(DEFAULT_TIMEZONE))
+    recipient_tz = pytz.timezone(receiver_timezone)
+    tz_label = zone_label(receiver_timezone)
+    due_date = st.date_input("Expected Due Date", min_value=datetime.now(recipient_tz).date())
 
     # Verify Chat ID button
     if st.button("Verify Chat ID"):
-        if not st.session_state.get('telegram_configured'):
+        if not tenant_token():
             st.error("Please configure your Telegram bot token in the sidebar first.")
         elif not receiver_chat_id:
             st.error("Please enter a Chat ID to verify.")
@@ -257,8 +159,9 @@ with col2:
                 else:
                     st.error(f"Invalid Chat ID: {result}")
 
-# Display IST time note
-st.info(f"Current IST time: {datetime.now(ist).strftime('%Y-%m-%d %H:%M:%S')}. All reminders will be scheduled in IST.")
+# Display the recipient's local time note
+st.info(f"Current {tz_label} time: {datetime.now(recipient_tz).strftime('%Y-%m-%d %H:%M:%S')}. "
+        f"Reminders will be scheduled in the recipient's time zone ({tz_label}).")
 
 # Create reminder form
 st.subheader("Add a New Medication Reminder")
@@ -279,22 +182,28 @@ with st.form(key="reminder_form"):
         
         if frequency == "Daily":
             # No default time - user must select a time
-            selected_time = st.time_input("Time of Day (IST)", step=timedelta(minutes=1))
+            selected_time = st.time_input(f"Time of Day ({tz_label})", step=timedelta(minutes=1))
         elif frequency == "Weekly":
             day_of_week = st.selectbox(
                 "Day of Week",
                 ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
             )
             # No default time
-            selected_time = st.time_input("Time of Day (IST)")
+            selected_time = st.time_input(f"Time of Day ({tz_label})")
         elif frequency == "Monthly":
             day_of_month = st.number_input("Day of Month", min_value=1, max_value=31, value=1)
             # No default time
-            selected_time = st.time_input("Time of Day (IST)")
+            selected_time = st.time_input(f"Time of Day ({tz_label})")
         else:  # One-time
-            date = st.date_input("Date", min_value=datetime.now(ist).date())
+            date = st.date_input("Date", min_value=datetime.now(recipient_tz).date())
             # No default time
-            selected_time = st.time_input("Time (IST)")
+            selected_time = st.time_input(f"Time ({tz_label})")
+        
+        # What the worker does with this reminder if it was down when it was due
+        misfire_policy = st.selectbox("If missed", list(POLICIES), format_func=POLICIES.get,
+                                      index=list(POLICIES).index(DEFAULT_POLICY))
+        misfire_grace = st.number_input("Late by more than (minutes)", min_value=1,
+                                        value=int(DEFAULT_GRACE // 60))
     
     submit_button = st.form_submit_button(label="Add Medication Reminder")
 
@@ -302,133 +211,223 @@ with st.form(key="reminder_form"):
 if submit_button:
     if not receiver_chat_id:
         st.error("Please enter the receiver's Telegram Chat ID.")
-    elif not st.session_state.get('telegram_configured'):
+    elif not tenant_token():
         st.error("Please configure your Telegram bot token in the sidebar first.")
+    elif (unreachable := unreachable_reason(receiver_chat_id)) is not None:
+        st.error(f"Cannot schedule reminders for this Chat ID: {unreachable}")
     else:
-        # Create a unique reminder ID
-        reminder_id = len(st.session_state.reminders)
-        
-        # Convert the selected IST time to system timezone for scheduling
-        system_time = convert_ist_to_system_time(selected_time)
-        time_str = system_time.strftime('%H:%M')
-        
-        # Format the schedule information for display using the IST time
-        if frequency == "Daily":
-            schedule_display = f"Daily at {selected_time.strftime('%I:%M %p')} IST"
-            schedule_key = f"daily-{selected_time.strftime('%H:%M')}"
-            
-            # Schedule the job using the system time
-            job = schedule.every().day.at(time_str).do(execute_reminder, reminder_id)
-            st.session_state.scheduled_jobs[reminder_id] = job
-            
-        elif frequency == "Weekly":
-            schedule_display = f"Every {day_of_week} at {selected_time.strftime('%I:%M %p')} IST"
-            schedule_key = f"weekly-{day_of_week}-{selected_time.strftime('%H:%M')}"
-            
-            # Schedule the job using the system time
-            if day_of_week == "Monday":
-                job = schedule.every().monday.at(time_str).do(execute_reminder, reminder_id)
-            elif day_of_week == "Tuesday":
-                job = schedule.every().tuesday.at(time_str).do(execute_reminder, reminder_id)
-            elif day_of_week == "Wednesday":
-                job = schedule.every().wednesday.at(time_str).do(execute_reminder, reminder_id)
-            elif day_of_week == "Thursday":
-                job = schedule.every().thursday.at(time_str).do(execute_reminder, reminder_id)
-            elif day_of_week == "Friday":
-                job = schedule.every().friday.at(time_str).do(execute_reminder, reminder_id)
-            elif day_of_week == "Saturday":
-                job = schedule.every().saturday.at(time_str).do(execute_reminder, reminder_id)
-            else:  # Sunday
-                job = schedule.every().sunday.at(time_str).do(execute_reminder, reminder_id)
-                
-            st.session_state.scheduled_jobs[reminder_id] = job
-            
+        # The schedule description is worked out from these fields when shown
+        # (recurrence.describe_schedule), so it is not stored
+        scheduled_datetime_ist = None
+        day_of_week_value = None
+        day_of_month_value = None
+        if frequency == "Weekly":
+            day_of_week_value = day_of_week
         elif frequency == "Monthly":
-            schedule_display = f"Monthly on day {day_of_month} at {selected_time.strftime('%I:%M %p')} IST"
-            schedule_key = f"monthly-{day_of_month}-{selected_time.strftime('%H:%M')}"
-            
-            # For monthly jobs, use the system time
-            job = schedule.every().day.at(time_str).do(
-                lambda: execute_reminder(reminder_id) if datetime.now(ist).day == day_of_month else None
-            )
-            st.session_state.scheduled_jobs[reminder_id] = job
-            
-        else:  # One-time
-            schedule_display = f"Once on {date.strftime('%b %d, %Y')} at {selected_time.strftime('%I:%M %p')} IST"
-            schedule_key = f"once-{date.strftime('%Y-%m-%d')}-{selected_time.strftime('%H:%M')}"
-            
-            # For one-time jobs, we'll need a more complex approach
-            # Create a datetime object in IST timezone
+            day_of_month_value = int(day_of_month)
+        elif frequency == "One-time":
+            # Create a datetime object in the recipient's timezone
             naive_datetime = datetime.combine(date, selected_time)
-            scheduled_datetime_ist = ist.localize(naive_datetime)
-            
-            # Convert to system timezone for comparison with system now
-            scheduled_datetime_system = scheduled_datetime_ist.astimezone(system_tz)
-            
-            # Get current time in system timezone
-            current_time_system = datetime.now(system_tz)
-            
-            if scheduled_datetime_system <= current_time_system:
-                st.error("The scheduled time has already passed.")
-            else:
-                # Calculate seconds until the scheduled time
-                delta = (scheduled_datetime_system - current_time_system).total_seconds()
-                
-                # Schedule a job to run once after the delay
-                job = schedule.every(int(delta)).seconds.do(
-                    lambda: (execute_reminder(reminder_id), schedule.cancel_job(st.session_state.scheduled_jobs[reminder_id]))
-                )
-                st.session_state.scheduled_jobs[reminder_id] = job
+            scheduled_datetime_ist = recipient_tz.localize(naive_datetime)
         
-        # Store the IST time for reference
+        # Store the local time for reference
         ist_time_str = selected_time.strftime('%H:%M')
         
         # Create the reminder object
         reminder = {
-            "id": reminder_id,
             "type": "Medication",
             "text": reminder_text,
             "frequency": frequency,
-            "schedule_display": schedule_display,
-            "schedule_key": schedule_key,
             "sender_name": sender_name,
             "receiver_name": receiver_name,
             "receiver_chat_id": receiver_chat_id,
+            "timezone": receiver_timezone,
+            "tenant": tenant,
+            "due_date": due_date.isoformat(),
             "active": True,
-            # Store both IST and system time for reference
+            "misfire_policy": misfire_policy,
+            "misfire_grace": misfire_grace * 60.0,
             "selected_time_ist": ist_time_str,
-            "selected_time_system": time_str,
+            "day_of_week": day_of_week_value,
+            "day_of_month": day_of_month_value,
             # For one-time reminders, store the full datetime
             "scheduled_datetime_ist": scheduled_datetime_ist.isoformat() if frequency == "One-time" else None
         }
         
-        # Generate a sample message for preview
-        sample_message = generate_cordial_message(reminder_text, sender_name, receiver_name)
-        
-        # Add the reminder to the session state
-        st.session_state.reminders.append(reminder)
+        # Work out the first fire instant; one-time reminders in the past have none
+        first_fire_at = next_fire_time(reminder, time.time())
         
-        # Also add to global reminders for background thread access
-        global_reminders[reminder_id] = reminder
-        
-        # Show success message with preview
-        st.success(f"Medication reminder added successfully! Will send at {selected_time.strftime('%I:%M %p')} IST.")
-        with st.expander("Preview Message", expanded=True):
-            st.markdown(f"**Sample message that will be sent:**\n\n{sample_message}")
+        if first_fire_at is None:
+            st.error("The scheduled time has already passed.")
+        else:
+            # Generate a sample message for preview, for the current week of pregnancy
+            sample_message = generate_cordial_message(reminder_text, sender_name, receiver_name,
+                                                      due_date.isoformat(), receiver_timezone)
+            
+            # Save the reminder; the store assigns its unique ID and the worker
+            # picks it up on its next poll
+            reminder["next_fire_at"] = first_fire_at
+            store.add(reminder)
+            
+            # Show success message with preview
+            st.success(f"Medication reminder added successfully! Will send at {selected_time.strftime('%I:%M %p')} {tz_label}.")
+            with st.expander("Preview Message", expanded=True):
+                st.markdown(f"**Sample message that will be sent:**\n\n{sample_message}")
+
+# Group reminders: one scheduled entry for a whole cohort or list of chats
+with st.expander("Group Reminder"):
+    st.markdown("Send one reminder to many recipients at once. A pregnancy-stage cohort is worked out "
+                "from each recipient's due date on the day the reminder fires.")
+    audience_type = st.radio("Recipients", ["Trimester", "Pregnancy weeks", "Chat ID list"], horizontal=True)
+    if audience_type == "Trimester":
+        trimester = st.selectbox("Trimester", list(TRIMESTERS))
+        group_audience = weeks_audience(*TRIMESTERS[trimester])
+        group_chat_ids = []
+    elif audience_type == "Pregnancy weeks":
+        first_week, last_week = st.slider("Weeks of pregnancy", 0, 42, (20, 24))
+        group_audience = weeks_audience(first_week, last_week)
+        group_chat_ids = []
+    else:
+        chat_id_text = st.text_area("Chat IDs (one per line or comma-separated)")
+        group_audience = members_audience()
+        group_chat_ids = [c.strip() for c in chat_id_text.replace(",", "\n").splitlines() if c.strip()]
+    
+    group_col1, group_col2 = st.columns(2)
+    with group_col1:
+        group_text = st.text_area("Message details (optional)", key="group_text", height=100)
+    with group_col2:
+        group_frequency = st.selectbox("Frequency", ["Daily", "Weekly", "Monthly", "One-time"], key="group_frequency")
+        group_day_of_week = group_day_of_month = group_date = None
+        if group_frequency == "Weekly":
+            group_day_of_week = st.selectbox("Day of Week", ["Monday", "Tuesday", "Wednesday", "Thursday",
+                                                             "Friday", "Saturday", "Sunday"], key="group_dow")
+        elif group_frequency == "Monthly":
+            group_day_of_month = int(st.number_input("Day of Month", min_value=1, max_value=31, value=1,
+                                                     key="group_dom"))
+        elif group_frequency == "One-time":
+            group_date = st.date_input("Date", min_value=datetime.now(recipient_tz).date(), key="group_date")
+        group_time = st.time_input(f"Time ({tz_label})", key="group_time")
+        group_misfire_policy = st.selectbox("If missed", list(POLICIES), format_func=POLICIES.get,
+                                            index=list(POLICIES).index(DEFAULT_POLICY), key="group_misfire")
+        group_misfire_grace = st.number_input("Late by more than (minutes)", min_value=1,
+                                              value=int(DEFAULT_GRACE // 60), key="group_grace")
+    
+    if st.button("Add Group Reminder"):
+        label = audience_label(group_audience) if audience_type != "Chat ID list" else f"{len(group_chat_ids)} chats"
+        group_reminder = {
+            "type": "Group",
+            "text": group_text,
+            "frequency": group_frequency,
+            "sender_name": sender_name,
+            "receiver_name": label,
+            "timezone": receiver_timezone,
+            "tenant": tenant,
+            "audience": group_audience,
+            "misfire_policy": group_misfire_policy,
+            "misfire_grace": group_misfire_grace * 60.0,
+            "selected_time_ist": group_time.strftime('%H:%M'),
+            "day_of_week": group_day_of_week,
+            "day_of_month": group_day_of_month,
+            "scheduled_datetime_ist": (recipient_tz.localize(datetime.combine(group_date, group_time)).isoformat()
+                                       if group_frequency == "One-time" else None),
+        }
+        first_fire_at = next_fire_time(group_reminder, time.time())
+        if audience_type == "Chat ID list" and not group_chat_ids:
+            st.error("Please enter at least one Chat ID.")
+        elif first_fire_at is None:
+            st.error("The scheduled time has already passed.")
+        else:
+            group_reminder["next_fire_at"] = first_fire_at
+            store.add_group(group_reminder, group_chat_ids)
+            st.success(f"Group reminder added: {describe_schedule(group_reminder)}")
+
+# Bulk import/export: thousands of reminders in one pass instead of one form per reminder
+with st.expander("Bulk Import / Export"):
+    st.markdown("Upload a CSV or Parquet file with the columns `receiver_chat_id`, `frequency`, `time`, "
+                "and optionally `receiver_name`, `sender_name`, `day_of_week`, `day_of_month`, `date`, "
+                "`text`, `due_date` and `timezone`. Times are HH:MM in the recipient's time zone (optional `timezone` column, "
+                "IANA name, default Asia/Kolkata); dates are YYYY-MM-DD.")
+    bulk_file = st.file_uploader("Reminders file", type=["csv", "parquet"])
+    
+    if bulk_file is not None and st.button("Import Reminders"):
+        # The bulk module (and pandas with it) is only loaded once a file is imported or exported
+        from reminder.bulk import import_reminders
+        try:
+            imported, rejected = import_reminders(store, bulk_file, tenant=tenant)
+        except ValueError as e:
+            st.error(f"Could not import the file: {e}")
+        else:
+            st.success(f"Imported {imported} reminder(s).")
+            if not rejected.empty:
+                st.warning(f"{len(rejected)} row(s) were rejected:")
+                st.dataframe(rejected[['row', 'receiver_chat_id', 'frequency', 'time', 'error']])
+    
+    # Check every scheduled chat at once; results are cached, so only new or
+    # expired chat ids cost a request
+    if tenant_token() and st.button("Verify All Chat IDs"):
+        chat_ids = store.chat_ids(tenant)
+        with st.spinner(f"Verifying {len(set(chat_ids))} chat ID(s)..."):
+            results = get_chat_verifier(tenant_token()).verify_many(chat_ids)
+        failed = [{'receiver_chat_id': chat_id, 'error': result}
+                  for chat_id, (success, result) in results.items() if not success]
+        if failed:
+            st.warning(f"{len(failed)} of {len(results)} chat ID(s) could not be verified:")
+            st.dataframe(failed)
+        else:
+            st.success(f"All {len(results)} chat ID(s) are valid.")
+    
+    # The export is only built on request, not on every rerun
+    export_format = st.radio("Export format", ["csv", "parquet"], horizontal=True)
+    if st.button("Prepare Export"):
+        from reminder.bulk import export_reminders
+        st.session_state['bulk_export'] = (tenant, export_format, export_reminders(store, export_format, tenant=tenant))
+    
+    # A prepared export belongs to the tenant it was made for
+    if st.session_state.get('bulk_export', (None,))[0] == tenant:
+        _, prepared_format, prepared_data = st.session_state['bulk_export']
+        st.download_button(f"Download reminders.{prepared_format}", data=prepared_data,
+                           file_name=f"reminders.{prepared_format}",
+                           mime="text/csv" if prepared_format == "csv" else "application/octet-stream")
+
+# One page of the reminders table. The store's revision changes whenever a
+# reminder is added, deleted or retired (by any process), so the cached page is
+# only rebuilt when something it shows has changed.
+@st.cache_data(max_entries=100)
+def load_reminder_page(revision, tenant, page, page_size, search, frequency, status):
+    active = {"Active": True, "Inactive": False}.get(status)
+    rows, total = store.page(offset=(page - 1) * page_size, limit=page_size, search=search,
+                             frequency=frequency if frequency != "All" else None, active=active, tenant=tenant)
+    # pandas is only needed once there are reminders to list
+    import pandas as pd
+    display_df = pd.DataFrame({
+        'ID': [r['id'] for r in rows],
+        'Recipient': [r['receiver_name'] for r in rows],
+        'Chat ID': [r['receiver_chat_id'] for r in rows],
+        'Schedule': [describe_schedule(r) for r in rows],
+        'Active': [r['active'] for r in rows],
+    })
+    return {r['id']: r for r in rows}, display_df, total
 
 # Display existing reminders
-if st.session_state.reminders:
+if store.count(tenant):
     st.subheader("Your Scheduled Medication Reminders")
     
-    # Convert to DataFrame for easier display
-    df = pd.DataFrame(st.session_state.reminders)
+    # Filters and paging run as queries against the store
+    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns([3, 1, 1, 1])
+    search = filter_col1.text_input("Search by name, chat ID or details")
+    frequency_filter = filter_col2.selectbox("Frequency", ["All", "Daily", "Weekly", "Monthly", "One-time"])
+    status_filter = filter_col3.selectbox("Status", ["All", "Active", "Inactive"])
+    page_size = filter_col4.selectbox("Per page", [25, 50, 100], index=1)
     
-    # Select columns to display
-    display_df = df[['id', 'schedule_display', 'active']].copy()
-    display_df.columns = ['ID', 'Schedule', 'Active']
+    total = load_reminder_page(store.revision(), tenant, 1, page_size, search, frequency_filter, status_filter)[2]
+    page_count = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    reminders_by_id, display_df, total = load_reminder_page(
+        store.revision(), tenant, page, page_size, search, frequency_filter, status_filter)
+    st.caption(f"{total} matching reminder(s)")
     
-    # Display as a table
-    st.table(display_df)
+    # Display the page; the dataframe view only renders the rows on screen
+    st.dataframe(display_df, hide_index=True, use_container_width=True)
     
     # Add options for testing and deleting reminders
     st.subheader("Manage Reminders")
@@ -437,27 +436,31 @@ if st.session_state.reminders:
     
     with manage_col1:
         st.markdown("#### Test a Reminder")
-        if not st.session_state.get('telegram_configured'):
+        if not tenant_token():
             st.warning("Please configure your Telegram bot token in the sidebar to test sending messages.")
         else:
             test_reminder_id = st.selectbox(
-                "Select a reminder to test",
-                options=[r['id'] for r in st.session_state.reminders],
-                format_func=lambda x: f"ID {x}: {next((r['schedule_display'] for r in st.session_state.reminders if r['id'] == x), '')}"
+                "Select a reminder to test (from this page)",
+                options=list(reminders_by_id),
+                format_func=lambda x: f"ID {x}: {describe_schedule(reminders_by_id[x])}"
             )
             
-            test_button = st.button("Send Test Message Now")
+            test_button = st.button("Send Test Message Now", disabled=not reminders_by_id)
             
             if test_button:
                 # Find the selected reminder
-                selected_reminder = next((r for r in st.session_state.reminders if r['id'] == test_reminder_id), None)
+                selected_reminder = reminders_by_id.get(test_reminder_id)
                 
-                if selected_reminder:
+                if selected_reminder and selected_reminder.get('audience'):
+                    st.warning("Group reminders go to their whole audience; test one of the recipients' own reminders instead.")
+                elif selected_reminder:
                     # Generate the message
                     message = generate_cordial_message(
                         selected_reminder.get('text', ''),
                         selected_reminder.get('sender_name', ''),
-                        selected_reminder.get('receiver_name', '')
+                        selected_reminder.get('receiver_name', ''),
+                        selected_reminder.get('due_date'),
+                        selected_reminder.get('timezone')
                     )
                     
                     # Send the test message
@@ -472,13 +475,13 @@ if st.session_state.reminders:
     with manage_col2:
         st.markdown("#### Delete a Reminder")
         delete_reminder_id = st.selectbox(
-            "Select a reminder to delete",
-            options=[r['id'] for r in st.session_state.reminders],
-            format_func=lambda x: f"ID {x}: {next((r['schedule_display'] for r in st.session_state.reminders if r['id'] == x), '')}",
+            "Select a reminder to delete (from this page)",
+            options=list(reminders_by_id),
+            format_func=lambda x: f"ID {x}: {describe_schedule(reminders_by_id[x])}",
             key="delete_select"
         )
         
-        delete_button = st.button("Delete Selected Reminder", type="primary")
+        delete_button = st.button("Delete Selected Reminder", type="primary", disabled=not reminders_by_id)
         
         if delete_button:
             if delete_reminder(delete_reminder_id):
@@ -489,6 +492,60 @@ if st.session_state.reminders:
 else:
     st.info("No medication reminders have been added yet. Add a reminder using the form above.")
 
+# Dashboard of the stats the worker writes next to the database
+with st.expander("Worker Metrics"):
+    # A sharded worker writes one stats file per shard
+    stats_files = stats_paths(store.path)
+    if len(stats_files) > 1:
+        stats_file = st.selectbox("Worker shard", stats_files, format_func=os.path.basename)
+    else:
+        stats_file = stats_files[0] if stats_files else None
+    stats = read_stats(stats_file) if stats_file else None
+    if stats is None:
+        st.info("No metrics yet. They appear once `python -m reminder worker` is running.")
+    else:
+        st.caption(f"Updated {datetime.fromtimestamp(stats['updated_at']).strftime('%Y-%m-%d %H:%M:%S')}"
+                   f" (system time); worker up since "
+                   f"{datetime.fromtimestamp(stats['started_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+        fires_per_minute = stats['fires_per_minute']
+        lag = stats['lag']
+        send_latency = stats['send_latency']
+        
+        metric_cols = st.columns(6)
+        metric_cols[0].metric("Fired (last minute)", fires_per_minute[-1][1] if fires_per_minute else 0)
+        metric_cols[1].metric("Queue depth", stats['gauges'].get('reminder_send_queue_depth') or 0)
+        metric_cols[2].metric("Sent", stats['sent'])
+        metric_cols[3].metric("Failed", stats['failed'])
+        metric_cols[4].metric("Retries", stats['retries'])
+        metric_cols[5].metric("Lag p95", f"{lag['p95']:.2f}s" if lag['p95'] is not None else "-")
+        
+        # plotly is only needed once there are metrics to chart
+        import plotly.graph_objects as go
+
+        chart_col1, chart_col2 = st.columns(2)
+        with chart_col1:
+            # Lag per bucket; a growing right tail means the dispatcher is falling behind
+            labels = [f"≤{upper}s" for upper in lag['buckets']] + [f">{lag['buckets'][-1]}s"]
+            fig = go.Figure(go.Bar(x=labels, y=lag['counts']))
+            fig.update_layout(title="Dispatch lag (actual - intended fire time)", height=300,
+                              margin=dict(l=10, r=10, t=40, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        with chart_col2:
+            times = [datetime.fromtimestamp(minute) for minute, _ in fires_per_minute]
+            fig = go.Figure(go.Scatter(x=times, y=[count for _, count in fires_per_minute], mode="lines+markers"))
+            fig.update_layout(title="Reminders fired per minute", height=300,
+                              margin=dict(l=10, r=10, t=40, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        percentiles = {name: send_latency[name] for name in ('p50', 'p95', 'p99')}
+        st.markdown("**Telegram send latency:** " + ", ".join(
+            f"{name} {value * 1000:.0f} ms" if value is not None else f"{name} -"
+            for name, value in percentiles.items()))
+        if stats['errors']:
+            st.markdown("**Errors by Telegram description**")
+            errors = sorted(stats['errors'].items(), key=lambda item: -item[1])
+            st.dataframe({'Description': [e[0] for e in errors], 'Count': [e[1] for e in errors]})
+
 # Add information about how to set up the Telegram bot
 st.markdown("---")
 st.subheader("How to Set Up Your Telegram Bot")
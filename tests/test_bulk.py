@@ -0,0 +1,89 @@
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import pytz
+
+from reminder.bulk import export_reminders, import_reminders, validate_reminders
+from reminder.store import ReminderStore
+
+NOW = pytz.utc.localize(datetime(2026, 3, 10, 12, 0)).timestamp()
+
+
+def frame(*rows):
+    return pd.DataFrame([dict({"receiver_chat_id": "101", "frequency": "Daily", "time": "08:00"}, **row)
+                         for row in rows], dtype=str)
+
+
+def errors(df):
+    _, rejected = validate_reminders(df, now=NOW)
+    return dict(zip(rejected["row"], rejected["error"]))
+
+
+def test_missing_required_column_is_an_error():
+    with pytest.raises(ValueError, match="frequency"):
+        validate_reminders(pd.DataFrame({"receiver_chat_id": ["1"], "time": ["08:00"]}))
+
+
+def test_values_are_normalized():
+    valid, rejected = validate_reminders(frame(
+        {"frequency": " daily ", "time": "8:05:00"},
+        {"frequency": "once", "date": "2026-03-11 00:00:00", "time": "09:00"},
+        {"frequency": "weekly", "day_of_week": "monday"},
+        {"frequency": "Monthly", "day_of_month": "31"},
+    ), now=NOW)
+    assert rejected.empty
+    assert valid["frequency"].tolist() == ["Daily", "One-time", "Weekly", "Monthly"]
+    assert valid["time"].tolist() == ["08:05", "09:00", "08:00", "08:00"]
+    assert valid["day_of_week"][2] == "Monday" and valid["day_of_month"][3] == 31
+    assert valid["timezone"].tolist() == ["Asia/Kolkata"] * 4
+
+
+def test_each_bad_row_gets_its_first_error():
+    assert errors(frame(
+        {},
+        {"receiver_chat_id": ""},
+        {"frequency": "Hourly"},
+        {"time": "25:00"},
+        {"timezone": "Mars/Olympus"},
+        {"frequency": "Weekly", "day_of_week": "Someday"},
+        {"frequency": "Monthly", "day_of_month": "32"},
+        {"frequency": "Monthly", "day_of_month": "1.5"},
+        {"frequency": "One-time", "date": "10/03/2026"},
+        {"frequency": "One-time", "date": "2026-03-10", "time": "17:00"},
+        {"due_date": "soon"},
+        {"receiver_chat_id": "", "frequency": "Hourly"},
+    )) == {
+        2: "missing receiver_chat_id",
+        3: "frequency must be one of Daily, Weekly, Monthly, One-time",
+        4: "time must be HH:MM (24-hour, recipient's local time)",
+        5: "timezone must be an IANA name such as Asia/Kolkata",
+        6: "day_of_week must be Monday..Sunday",
+        7: "day_of_month must be 1..31",
+        8: "day_of_month must be 1..31",
+        9: "date must be YYYY-MM-DD",
+        10: "the scheduled time has already passed",
+        11: "due_date must be YYYY-MM-DD",
+        12: "missing receiver_chat_id",
+    }
+
+
+def test_one_time_is_judged_in_the_recipients_zone():
+    # 17:00 IST on the 10th has passed at 12:00 UTC; 17:00 in New York has not
+    assert errors(frame({"frequency": "One-time", "date": "2026-03-10", "time": "17:00",
+                         "timezone": "America/New_York"})) == {}
+
+
+def test_import_and_export_round_trip(tmp_path):
+    store = ReminderStore(str(tmp_path / "reminders.db"))
+    csv = ("receiver_chat_id,frequency,time,day_of_week,day_of_month,timezone\n"
+           "101,Daily,08:00,,,\n102,Weekly,09:30,Friday,,Europe/London\n103,Monthly,20:00,,31,\n104,Hourly,08:00,,,\n")
+    imported, rejected = import_reminders(store, io.BytesIO(csv.encode()), "csv", now=NOW)
+    assert imported == 3 and rejected["row"].tolist() == [4]
+
+    exported = pd.read_csv(io.BytesIO(export_reminders(store)), dtype=str, keep_default_na=False)
+    assert exported["receiver_chat_id"].tolist() == ["101", "102", "103"]
+    assert exported["day_of_week"].tolist() == ["", "Friday", ""]
+    assert exported["day_of_month"].tolist() == ["", "", "31"]
+    assert exported["timezone"].tolist() == ["Asia/Kolkata", "Europe/London", "Asia/Kolkata"]
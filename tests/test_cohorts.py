@@ -0,0 +1,84 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from reminder.cohorts import (TRIMESTERS, due_date_window, gestational_week, iter_recipients, members_audience,
+                              weeks_audience)
+from reminder.store import ReminderStore
+
+TODAY = date(2026, 3, 1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReminderStore(str(tmp_path / "reminders.db"))
+
+
+def add_mother(store, chat_id, due_date="2026-06-01", tenant=None):
+    return store.add({"text": "Take your iron tablet", "frequency": "Daily", "receiver_name": "Asha",
+                      "receiver_chat_id": chat_id, "selected_time_ist": "08:00", "due_date": due_date,
+                      "tenant": tenant, "next_fire_at": time.time() + 3600})
+
+
+def broadcast_chats(store, tenant=""):
+    reminder = {"id": 0, "audience": weeks_audience(0, 42), "tenant": tenant}
+    return [recipient['chat_id'] for chunk in iter_recipients(store, reminder, TODAY) for recipient in chunk]
+
+
+def test_deleting_the_last_reminder_removes_the_recipient(store):
+    first = add_mother(store, "555")
+    second = add_mother(store, "555")
+    add_mother(store, "555", tenant="clinic")
+
+    store.delete(first)
+    assert broadcast_chats(store) == ["555"]
+    store.delete(second)
+    assert broadcast_chats(store) == []
+    # Her reminder with another tenant keeps her in that tenant's cohorts
+    assert broadcast_chats(store, "clinic") == ["555"]
+
+
+def test_recipients_left_by_older_deletes_are_pruned_on_open(store):
+    add_mother(store, "555")
+    store._connect().execute("INSERT INTO recipients (tenant, chat_id, due_date) VALUES ('', '999', '2026-06-01')")
+    store._connect().execute("DELETE FROM settings WHERE key = 'recipients_pruned'")
+    store._connect().commit()
+
+    assert broadcast_chats(ReminderStore(store.path)) == ["555"]
+
+
+@pytest.mark.parametrize("first_week, last_week", [(0, 0), *TRIMESTERS.values(), (20, 24)])
+def test_due_date_window_holds_exactly_the_weeks(first_week, last_week):
+    start, end = due_date_window(first_week, last_week, TODAY)
+    start, end = date.fromisoformat(start), date.fromisoformat(end)
+    for day in range(-10, 300):
+        due = TODAY + timedelta(days=day)
+        in_window = start <= due <= end
+        assert in_window == (first_week <= gestational_week(due, TODAY) <= last_week), due
+
+
+def test_week_audience_streams_its_tenants_recipients_in_chunks(store):
+    in_range = [str(chat) for chat in range(100, 125)]
+    for chat_id in in_range:
+        add_mother(store, chat_id)
+    add_mother(store, "900", due_date="2025-01-01")
+    add_mother(store, "901", tenant="clinic")
+
+    reminder = {"id": 0, "audience": weeks_audience(*TRIMESTERS[2]), "tenant": ""}
+    chunks = list(iter_recipients(store, reminder, TODAY, chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert sorted(recipient['chat_id'] for chunk in chunks for recipient in chunk) == in_range
+
+
+def test_members_audience_streams_the_listed_chats(store):
+    add_mother(store, "101")
+    reminder_id = store.add_group({"frequency": "Daily", "selected_time_ist": "08:00",
+                                   "audience": members_audience(), "next_fire_at": time.time() + 3600},
+                                  ["101", "102", "103"])
+    reminder = store.get(reminder_id)
+
+    members = [member for chunk in iter_recipients(store, reminder, TODAY, chunk_size=2) for member in chunk]
+    assert [member['chat_id'] for member in members] == ["101", "102", "103"]
+    # Members who are also recipients come with their details
+    assert members[0]['name'] == "Asha" and members[1]['name'] == ""
@@ -0,0 +1,69 @@
+import threading
+from datetime import date
+
+from reminder.cohorts import PREGNANCY_DAYS, gestational_week
+from reminder.content import (GENERAL_TEMPLATES, MAX_WEEK, StageCache, WEEK_TEMPLATES, due_day, local_day,
+                              templates_for_week)
+from reminder.recurrence import DAY
+
+DAY_NUMBER = (date(2026, 3, 1) - date(1970, 1, 1)).days
+DUE = "2026-06-01"
+
+
+def test_templates_follow_the_week_of_pregnancy():
+    cache = StageCache()
+    week = gestational_week(DUE, date(2026, 3, 1))
+    assert cache.week(DUE, DAY_NUMBER) == week
+    assert cache.templates(DUE, DAY_NUMBER) is WEEK_TEMPLATES[week]
+    # A week later the same due date is a week further on
+    assert cache.templates(DUE, DAY_NUMBER + 7) is WEEK_TEMPLATES[week + 1]
+
+
+def test_missing_bad_or_out_of_range_due_dates_get_the_general_set():
+    cache = StageCache()
+    for due_date in (None, "", "not a date", "2020-01-01", "2030-01-01"):
+        assert cache.templates(due_date, DAY_NUMBER) is GENERAL_TEMPLATES
+    assert templates_for_week(-1) is templates_for_week(MAX_WEEK + 1) is GENERAL_TEMPLATES
+
+
+def test_new_day_recomputes_cached_entries_and_earlier_days_leave_it_alone():
+    cache = StageCache()
+    cache.templates(DUE, DAY_NUMBER)
+    later = cache.for_day(DAY_NUMBER + 14)
+    assert later[DUE] is templates_for_week(cache.week(DUE, DAY_NUMBER + 14))
+    # A zone that has not reached midnight yet gets an answer without moving the cache back
+    assert cache.templates(DUE, DAY_NUMBER) is templates_for_week(cache.week(DUE, DAY_NUMBER))
+    assert cache.day == DAY_NUMBER + 14
+
+
+def test_cache_is_bounded():
+    cache = StageCache(maxsize=10)
+    for i in range(50):
+        cache.templates(f"2026-06-{i % 28 + 1:02d}T{i}", DAY_NUMBER)
+    assert len(cache._templates) <= 10 + 2 and len(cache._due_days) <= 10
+
+
+def test_concurrent_lookups_across_a_day_change_agree_with_the_week():
+    cache = StageCache(maxsize=64)
+    due_dates = [f"2026-{month:02d}-{day:02d}" for month in range(4, 12) for day in range(1, 29)]
+    failures = []
+
+    def look_up(day):
+        for due_date in due_dates:
+            expected = templates_for_week((PREGNANCY_DAYS - (due_day(due_date) - day)) // 7)
+            if cache.templates(due_date, day) is not expected:
+                failures.append((due_date, day))
+
+    threads = [threading.Thread(target=look_up, args=(DAY_NUMBER + i % 3,)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+
+
+def test_local_day_follows_the_zone():
+    at = 1772407800  # 2026-03-01 23:30 UTC
+    assert local_day("Europe/London", at) == at // DAY
+    assert local_day("Asia/Kolkata", at) == at // DAY + 1
+    assert local_day("America/New_York", at) == at // DAY
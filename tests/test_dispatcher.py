@@ -0,0 +1,186 @@
+import threading
+
+import pytest
+
+from reminder.dispatcher import Dispatcher
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FlakySource:
+    """Source that fails its first `failures` calls, then returns `items`."""
+
+    def __init__(self, items, failures=0):
+        self.items = items
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, start, until):
+        self.calls.append((start, until))
+        if len(self.calls) <= self.failures:
+            raise RuntimeError("database is locked")
+        return [item for item in self.items if (start is None or item[1] >= start) and item[1] < until]
+
+
+def test_due_entries_pop_in_fire_order():
+    clock = Clock()
+    dispatcher = Dispatcher(lambda due: (), clock=clock)
+    dispatcher.add(1, 1003.0)
+    dispatcher.add(2, 1001.0)
+    dispatcher.add_many([(3, 1002.0), (4, 2000.0)])
+
+    assert dispatcher._pop_due(1005.0) == [(2, 1001.0), (3, 1002.0), (1, 1003.0)]
+    assert len(dispatcher) == 1
+    assert dispatcher._timeout(1005.0) == pytest.approx(995.0)
+
+
+def test_reschedule_and_remove_drop_the_old_entry():
+    dispatcher = Dispatcher(lambda due: (), clock=Clock())
+    dispatcher.add(1, 1001.0)
+    dispatcher.add(1, 1500.0)
+    dispatcher.add(2, 1001.0)
+    assert dispatcher.remove(2)
+    assert not dispatcher.remove(2)
+
+    assert dispatcher._pop_due(1100.0) == []
+    assert dispatcher.next_fire_at(1) == 1500.0
+    assert dispatcher._pop_due(1500.0) == [(1, 1500.0)]
+
+
+def test_fire_puts_recurring_reminders_back():
+    clock = Clock()
+    dispatcher = Dispatcher(lambda due: [(1, 1000.0 + 86400), (9, None)], clock=clock)
+    dispatcher.add(1, 1000.0)
+    dispatcher.add(9, 1000.0)
+
+    dispatcher.fire(dispatcher._pop_due(clock.now))
+    # A None next fire (one-time reminder) is not rescheduled
+    assert len(dispatcher) == 1
+    assert dispatcher.next_fire_at(1) == 1000.0 + 86400
+
+
+def test_refill_loads_only_the_window_and_slides_forward():
+    clock = Clock()
+    source = FlakySource([(1, 1010.0), (2, 1090.0), (3, 1150.0)])
+    dispatcher = Dispatcher(lambda due: (), clock=clock, source=source, horizon=100)
+
+    dispatcher.refill()
+    assert len(dispatcher) == 2
+    # Reminders beyond the window are left to the source
+    dispatcher.add(4, 1500.0)
+    assert len(dispatcher) == 2
+
+    clock.now = 1060.0
+    assert dispatcher._needs_refill(clock.now)
+    dispatcher.refill()
+    assert len(dispatcher) == 3
+    # The second load starts where the first one ended
+    assert source.calls[1][0] == source.calls[0][1]
+
+
+def test_reload_only_when_changed():
+    clock = Clock()
+    changes = iter([False, True, False])
+    source = FlakySource([(1, 1010.0)])
+    dispatcher = Dispatcher(lambda due: (), clock=clock, source=source, horizon=100,
+                            changed=lambda: next(changes), poll_interval=1.0)
+    dispatcher.refill()
+
+    dispatcher._poll_changes()
+    assert dispatcher._loaded_until is not None
+    # Polls are rate limited to one per interval
+    dispatcher._poll_changes()
+    clock.now += 1.0
+    dispatcher._poll_changes()
+    assert dispatcher._loaded_until is None and len(dispatcher) == 0
+    assert dispatcher._needs_refill(clock.now)
+
+
+def test_dispatch_thread_fires_and_stops():
+    fired = threading.Event()
+    dispatcher = Dispatcher(lambda due: fired.set())
+    dispatcher.start()
+    try:
+        dispatcher.add(1, 0.0)
+        assert fired.wait(5)
+    finally:
+        dispatcher.stop(timeout=5)
+    assert not dispatcher._thread.is_alive()
+
+
+def test_failed_refill_backs_off_instead_of_spinning():
+    clock = Clock()
+    source = FlakySource([(1, 1010.0)], failures=2)
+    dispatcher = Dispatcher(lambda due: (), clock=clock, source=source, horizon=100)
+
+    dispatcher.refill()
+    assert dispatcher._timeout(clock.now) == pytest.approx(Dispatcher.RETRY_DELAY)
+    assert not dispatcher._needs_refill(clock.now)
+
+    clock.now += Dispatcher.RETRY_DELAY
+    assert dispatcher._needs_refill(clock.now)
+    dispatcher.refill()
+    # The delay doubles per failure in a row
+    assert dispatcher._timeout(clock.now) == pytest.approx(Dispatcher.RETRY_DELAY * 2)
+
+    clock.now += Dispatcher.RETRY_DELAY * 2
+    dispatcher.refill()
+    assert len(dispatcher) == 1
+    assert dispatcher._timeout(clock.now) == pytest.approx(1010.0 - clock.now)
+
+
+def test_refill_delay_is_capped():
+    dispatcher = Dispatcher(lambda due: ())
+    assert dispatcher._retry_delay(100) == Dispatcher.MAX_RETRY_DELAY
+
+
+def test_failed_tick_is_held_and_fired_again():
+    clock = Clock()
+    ticks = []
+
+    def callback(due):
+        ticks.append(list(due))
+        if len(ticks) == 1:
+            raise RuntimeError("store unavailable")
+        return ()
+
+    dispatcher = Dispatcher(callback, clock=clock)
+    dispatcher.add(1, 1000.0)
+    dispatcher.add(2, 1000.0)
+
+    dispatcher.fire(dispatcher._pop_due(clock.now))
+    assert dispatcher._pop_due(clock.now) == []
+    assert dispatcher._timeout(clock.now) == pytest.approx(Dispatcher.RETRY_DELAY)
+
+    clock.now += Dispatcher.RETRY_DELAY
+    due = dispatcher._pop_due(clock.now)
+    assert sorted(due) == [(1, 1000.0), (2, 1000.0)]
+    dispatcher.fire(due)
+    assert ticks[1] == due
+    assert dispatcher._timeout(clock.now) is None
+
+
+def test_held_entry_rescheduled_meanwhile_is_not_fired_twice():
+    clock = Clock()
+    calls = []
+
+    def callback(due):
+        calls.append(due)
+        if len(calls) == 1:
+            raise RuntimeError("store unavailable")
+        return ()
+
+    dispatcher = Dispatcher(callback, clock=clock)
+    dispatcher.add(1, 1000.0)
+    dispatcher.fire(dispatcher._pop_due(clock.now))
+    dispatcher.add(1, 5000.0)
+
+    clock.now += Dispatcher.RETRY_DELAY
+    assert dispatcher._pop_due(clock.now) == []
+    assert len(dispatcher) == 1
@@ -0,0 +1,31 @@
+from reminder.misfire import COALESCE, DEFAULT_GRACE, DEFER, DROP, FIRE_ONCE, SEND, SKIP, plan_fire
+
+FIRE_AT = 1_000_000.0
+
+
+def test_on_time_fire_is_sent_and_moves_on_from_its_instant():
+    assert plan_fire({}, FIRE_AT, FIRE_AT + 5) == (SEND, FIRE_AT)
+
+
+def test_default_grace_window_is_inclusive():
+    assert plan_fire({}, FIRE_AT, FIRE_AT + DEFAULT_GRACE) == (SEND, FIRE_AT)
+    assert plan_fire({}, FIRE_AT, FIRE_AT + DEFAULT_GRACE + 1)[0] == DEFER
+
+
+def test_reminder_grace_overrides_default():
+    assert plan_fire({'misfire_grace': 60}, FIRE_AT, FIRE_AT + 61)[0] == DEFER
+    # A grace of 0 is a real setting, not "use the default"
+    assert plan_fire({'misfire_grace': 0}, FIRE_AT, FIRE_AT + 1)[0] == DEFER
+
+
+def test_late_fire_follows_policy():
+    now = FIRE_AT + DEFAULT_GRACE * 10
+    assert plan_fire({'misfire_policy': SKIP}, FIRE_AT, now) == (DROP, now)
+    assert plan_fire({'misfire_policy': COALESCE}, FIRE_AT, now) == (DEFER, now)
+    # Every missed occurrence gets its own fire, so the next one follows this one
+    assert plan_fire({'misfire_policy': FIRE_ONCE}, FIRE_AT, now) == (DEFER, FIRE_AT)
+
+
+def test_late_fire_without_policy_coalesces():
+    now = FIRE_AT + DEFAULT_GRACE * 10
+    assert plan_fire({'misfire_policy': None}, FIRE_AT, now) == (DEFER, now)
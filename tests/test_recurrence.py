@@ -0,0 +1,93 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from reminder.recurrence import (DAILY, MONTHLY, ONE_TIME, WEEKDAYS, WEEKLY, next_fire_time, next_fire_times,
+                                 next_occurrence, next_occurrence_array)
+from reminder.timezones import zone_table
+
+IST = pytz.timezone("Asia/Kolkata")
+
+
+def at(*fields, zone=IST):
+    return int(zone.localize(datetime(*fields)).timestamp())
+
+
+def reminder(frequency, time="08:00", **fields):
+    return dict({"frequency": frequency, "selected_time_ist": time, "timezone": "Asia/Kolkata"}, **fields)
+
+
+def test_daily_fires_later_today_or_tomorrow():
+    assert next_fire_time(reminder("Daily"), at(2026, 3, 10, 7, 59)) == at(2026, 3, 10, 8, 0)
+    # Strictly after: a reminder computed at its own fire time moves to the next day
+    assert next_fire_time(reminder("Daily"), at(2026, 3, 10, 8, 0)) == at(2026, 3, 11, 8, 0)
+    assert next_fire_time(reminder("Daily"), at(2026, 12, 31, 23, 0)) == at(2027, 1, 1, 8, 0)
+
+
+@pytest.mark.parametrize("weekday", WEEKDAYS)
+def test_weekly_fires_on_its_weekday(weekday):
+    after = at(2026, 3, 11, 9, 0)  # a Wednesday, after 08:00
+    fire = datetime.fromtimestamp(next_fire_time(reminder("Weekly", day_of_week=weekday), after), IST)
+    assert fire.strftime("%A") == weekday and (fire.hour, fire.minute) == (8, 0)
+    assert timedelta(0) < fire - datetime.fromtimestamp(after, IST) <= timedelta(days=7)
+
+
+def test_weekly_on_its_own_day_waits_a_week_once_the_time_has_passed():
+    wednesday = reminder("Weekly", day_of_week="Wednesday")
+    assert next_fire_time(wednesday, at(2026, 3, 11, 7, 0)) == at(2026, 3, 11, 8, 0)
+    assert next_fire_time(wednesday, at(2026, 3, 11, 8, 0)) == at(2026, 3, 18, 8, 0)
+
+
+@pytest.mark.parametrize("after, expected", [
+    ((2026, 1, 31, 9, 0), (2026, 2, 28, 8, 0)),   # short month: its last day
+    ((2028, 1, 31, 9, 0), (2028, 2, 29, 8, 0)),   # leap year
+    ((2026, 2, 28, 9, 0), (2026, 3, 31, 8, 0)),   # back to the 31st after a short month
+    ((2026, 4, 1, 0, 0), (2026, 4, 30, 8, 0)),
+    ((2026, 12, 31, 8, 0), (2027, 1, 31, 8, 0)),  # across the year end
+])
+def test_monthly_day_31_falls_back_to_the_last_day(after, expected):
+    assert next_fire_time(reminder("Monthly", day_of_month=31), at(*after)) == at(*expected)
+
+
+def test_one_time_fires_once():
+    once = reminder("One-time", scheduled_datetime_ist="2026-03-10T08:00:00+05:30")
+    assert next_fire_time(once, at(2026, 3, 10, 7, 0)) == at(2026, 3, 10, 8, 0)
+    assert next_fire_time(once, at(2026, 3, 10, 8, 0)) is None
+    assert next_fire_times([once, reminder("Daily")], at(2026, 3, 10, 8, 0)) == [None, at(2026, 3, 11, 8, 0)]
+
+
+# Reference: walk forward day by day with pytz, in zones without DST
+def brute_force(code, second_of_day, weekday, day_of_month, after, zone):
+    local = datetime.fromtimestamp(after, zone).replace(tzinfo=None)
+    day = local.date()
+    for _ in range(400):
+        last = (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        if (code == DAILY or (code == WEEKLY and day.weekday() == weekday)
+                or (code == MONTHLY and day.day == min(day_of_month, last.day))):
+            fire = zone.localize(datetime(day.year, day.month, day.day) + timedelta(seconds=second_of_day))
+            if fire.timestamp() > after:
+                return int(fire.timestamp())
+        day += timedelta(days=1)
+
+
+@pytest.mark.parametrize("zone_name", ["Asia/Kolkata", "Asia/Kathmandu", "America/Bogota"])
+def test_scalar_and_vector_paths_agree_with_a_day_by_day_walk(zone_name):
+    rng = random.Random(zone_name)
+    zone, table = pytz.timezone(zone_name), zone_table(zone_name)
+    rules = [(rng.choice([DAILY, WEEKLY, MONTHLY]), rng.randrange(0, 86400, 60), rng.randrange(7),
+              rng.randint(1, 31), 0, rng.uniform(1.7e9, 1.9e9)) for _ in range(500)]
+
+    expected = [brute_force(*rule[:4], rule[5], zone) for rule in rules]
+    assert [next_occurrence(*rule, table) for rule in rules] == expected
+    assert next_occurrence_array(*np.array(rules).T, table).tolist() == expected
+
+
+def test_vector_one_time_expiry_matches_scalar():
+    after = np.array([100.0, 200.0, 300.0])
+    result = next_occurrence_array([ONE_TIME] * 3, 0, 0, 1, [150, 200, 400], after, zone_table("Asia/Kolkata"))
+    assert result.tolist() == [150, -1, 400]
+    assert [next_occurrence(ONE_TIME, 0, 0, 1, once, a) for once, a in [(150, 100), (200, 200), (400, 300)]] == \
+        [150, None, 400]
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from reminder.sharding import HashRing
+
+TENANTS = [f"tenant-{i}" for i in range(4000)]
+
+
+def test_assignment_is_the_same_in_every_process():
+    ring = HashRing(4)
+    code = ("from reminder.sharding import HashRing; ring = HashRing(4); "
+            f"print([ring.shard_for(t) for t in {TENANTS[:50]!r}])")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert output.strip() == str([ring.shard_for(tenant) for tenant in TENANTS[:50]])
+
+
+def test_single_shard_owns_everything():
+    ring = HashRing(1)
+    assert {ring.shard_for(tenant) for tenant in TENANTS} == {0}
+
+
+def test_tenants_spread_over_every_shard():
+    counts = Counter(HashRing(4).shard_for(tenant) for tenant in TENANTS)
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > len(TENANTS) / 4 * 0.5
+
+
+def test_adding_a_shard_only_moves_tenants_to_it():
+    before, after = HashRing(4), HashRing(5)
+    moved = [tenant for tenant in TENANTS if before.shard_for(tenant) != after.shard_for(tenant)]
+    assert {after.shard_for(tenant) for tenant in moved} == {4}
+    assert len(moved) < len(TENANTS) * 0.35
@@ -0,0 +1,111 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from reminder.recurrence import next_fire_time, next_fire_times
+from reminder.store import ReminderStore
+from reminder.timezones import zone_table
+from reminder.worker import Worker
+
+EPOCH = datetime(1970, 1, 1)
+HOUR = 3600
+
+# Zone, the local day its clocks go forward and the local day they go back (2026)
+TRANSITION_DAYS = [
+    ("Europe/London", datetime(2026, 3, 29), datetime(2026, 10, 25)),
+    ("America/New_York", datetime(2026, 3, 8), datetime(2026, 11, 1)),
+    # Lord Howe Island moves its clocks by 30 minutes
+    ("Australia/Lord_Howe", datetime(2026, 10, 4), datetime(2026, 4, 5)),
+]
+
+
+def local(*fields):
+    return int((datetime(*fields) - EPOCH).total_seconds())
+
+
+# UTC instants are written the same way, from UTC wall-clock fields
+utc = local
+
+
+def test_ambiguous_time_resolves_to_the_first_occurrence():
+    london, new_york = zone_table("Europe/London"), zone_table("America/New_York")
+    # 01:30 happens twice when London goes back: 00:30 UTC (BST) and 01:30 UTC (GMT)
+    assert london.to_utc(local(2026, 10, 25, 1, 30)) == utc(2026, 10, 25, 0, 30)
+    assert new_york.to_utc(local(2026, 11, 1, 1, 30)) == utc(2026, 11, 1, 5, 30)
+    # Lord Howe goes back from +11:00 to +10:30, so 01:30-02:00 happens twice
+    assert zone_table("Australia/Lord_Howe").to_utc(local(2026, 4, 5, 1, 45)) == utc(2026, 4, 4, 14, 45)
+
+
+def test_skipped_time_moves_forward_by_the_gap():
+    # 01:30 does not exist when London goes forward; it becomes 02:30 BST
+    assert zone_table("Europe/London").to_utc(local(2026, 3, 29, 1, 30)) == utc(2026, 3, 29, 1, 30)
+    assert zone_table("America/New_York").to_utc(local(2026, 3, 8, 2, 30)) == utc(2026, 3, 8, 7, 30)
+    # Lord Howe skips 02:00-02:30; 02:15 becomes 02:45 at +11:00
+    assert zone_table("Australia/Lord_Howe").to_utc(local(2026, 10, 4, 2, 15)) == utc(2026, 10, 3, 15, 45)
+
+
+@pytest.mark.parametrize("name, forward, back", TRANSITION_DAYS)
+def test_table_matches_pytz_around_transitions(name, forward, back):
+    table, zone = zone_table(name), pytz.timezone(name)
+    for day in (forward, back):
+        for minute in range(-24 * 60, 48 * 60, 15):
+            wall = day + timedelta(minutes=minute)
+            instant = int(zone.localize(wall, is_dst=True).timestamp())
+            # Skipped wall times have no pytz answer to compare with
+            if zone.normalize(zone.localize(wall, is_dst=True)).replace(tzinfo=None) == wall:
+                assert table.to_utc(local(*wall.timetuple()[:6])) == instant, wall
+            wall_at = datetime.fromtimestamp(instant, zone).replace(tzinfo=None)
+            assert table.to_local(instant) == local(*wall_at.timetuple()[:6])
+
+
+@pytest.mark.parametrize("name, forward, back", TRANSITION_DAYS)
+def test_vector_conversions_match_scalar(name, forward, back):
+    table = zone_table(name)
+    walls = np.array([local(*(day + timedelta(minutes=minute)).timetuple()[:6])
+                      for day in (forward, back) for minute in range(-120, 48 * 60, 5)], dtype=np.int64)
+    assert table.to_utc_array(walls).tolist() == [table.to_utc(int(wall)) for wall in walls]
+    instants = walls - 12 * HOUR
+    assert table.to_local_array(instants).tolist() == [table.to_local(int(instant)) for instant in instants]
+
+
+def test_daily_reminder_across_the_clocks_going_back_fires_once():
+    reminder = {"frequency": "Daily", "selected_time_ist": "01:30", "timezone": "Europe/London"}
+    first = utc(2026, 10, 25, 0, 30)
+    assert next_fire_time(reminder, utc(2026, 10, 24, 12, 0)) == first
+    # Not again when 01:30 comes round a second time that night
+    for after in (first, utc(2026, 10, 25, 1, 10), utc(2026, 10, 25, 1, 45)):
+        assert next_fire_time(reminder, after) == utc(2026, 10, 26, 1, 30)
+        assert next_fire_times([reminder], after) == [utc(2026, 10, 26, 1, 30)]
+
+
+def test_daily_reminder_in_the_skipped_hour_fires_after_the_gap():
+    reminder = {"frequency": "Daily", "selected_time_ist": "01:30", "timezone": "Europe/London"}
+    after = utc(2026, 3, 28, 12, 0)
+    assert next_fire_time(reminder, after) == utc(2026, 3, 29, 1, 30)
+    assert next_fire_times([reminder], after) == [utc(2026, 3, 29, 1, 30)]
+
+
+def test_worker_reschedules_only_when_zone_rules_change(tmp_path):
+    store = ReminderStore(str(tmp_path / "reminders.db"))
+    now = time.time()
+    upcoming = store.add({"frequency": "Daily", "selected_time_ist": "08:00", "receiver_chat_id": "1",
+                          "timezone": "Europe/London", "next_fire_at": now + 10 * 86400})
+    past = store.add({"frequency": "Daily", "selected_time_ist": "08:00", "receiver_chat_id": "2",
+                      "timezone": "Europe/London", "next_fire_at": now - 60})
+    worker = Worker(store, token="TEST")
+    key = "zone_fingerprint:Europe/London"
+
+    # The first run only records the rules it scheduled with
+    worker.reschedule_changed_zones(now)
+    assert store.get_setting(key) == str(zone_table("Europe/London").fingerprint)
+    assert store.get(upcoming)['next_fire_at'] == now + 10 * 86400
+
+    # Rules recorded by an older tzdata: upcoming fires are worked out again
+    store.set_setting(key, "0")
+    worker.reschedule_changed_zones(now)
+    assert store.get(upcoming)['next_fire_at'] == next_fire_time(store.get(upcoming), now)
+    assert store.get(past)['next_fire_at'] == now - 60
+    assert store.get_setting(key) == str(zone_table("Europe/London").fingerprint)
@@ -0,0 +1,100 @@
+import requests
+
+from reminder.verification import ChatVerifier, VerificationCache, is_unreachable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """getChat stand-in: `replies` maps a chat id to (status, JSON) or an exception."""
+
+    token = "TEST"
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+
+    def call(self, method, params):
+        self.calls.append(params['chat_id'])
+        reply = self.replies[params['chat_id']]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+OK = (200, {"ok": True, "result": {"id": 1}})
+BLOCKED = (403, {"ok": False, "description": "Forbidden: bot was blocked by the user"})
+FLOOD = (429, {"ok": False, "description": "Too Many Requests: retry after 5"})
+
+
+def test_entries_expire_after_their_ttl():
+    clock = Clock()
+    cache = VerificationCache(ttl=10, negative_ttl=100, clock=clock)
+    cache.put("T", 1, True, {})
+    cache.put("T", 2, False, "Forbidden: bot was blocked by the user")
+
+    clock.now = 9
+    assert cache.get("T", 1) == (True, {})
+    clock.now = 10
+    assert cache.get("T", 1) is None
+    # Unreachable chats are remembered for longer
+    assert cache.get("T", 2) == (False, "Forbidden: bot was blocked by the user")
+    clock.now = 100
+    assert cache.get("T", 2) is None
+
+
+def test_entries_are_per_bot():
+    cache = VerificationCache()
+    cache.put("A", 1, False, "Forbidden: bot was blocked by the user")
+    assert cache.get("B", 1) is None and cache.get("A", "1") is not None
+
+
+def test_full_cache_drops_expired_then_oldest():
+    clock = Clock()
+    cache = VerificationCache(ttl=10, maxsize=3, clock=clock)
+    cache.put("T", 1, True, {})
+    clock.now = 5
+    cache.put("T", 2, True, {})
+    cache.put("T", 3, True, {})
+    clock.now = 12
+    cache.put("T", 4, True, {})
+    assert cache.get("T", 1) is None and len(cache) == 3
+    cache.put("T", 5, True, {})
+    assert cache.get("T", 2) is None and cache.get("T", 5) is not None
+
+
+def test_only_definite_answers_are_cached():
+    client = FakeClient({1: OK, 2: BLOCKED, 3: FLOOD, 4: requests.ConnectionError("reset")})
+    verifier = ChatVerifier(client)
+    results = verifier.verify_many([1, 2, 3, 4, 1])
+    assert results[1][0] and not results[2][0] and not results[3][0] and results[4] == (False, "reset")
+
+    client.calls.clear()
+    verifier.verify_many([1, 2, 3, 4])
+    assert sorted(client.calls) == [3, 4]
+    assert verifier.known_unreachable(2) == BLOCKED[1]["description"]
+    assert verifier.known_unreachable(3) is None
+
+
+def test_sends_teach_the_verifier():
+    verifier = ChatVerifier(FakeClient({}))
+    verifier.record_send(7, False, "Failed to send message: Forbidden: bot was kicked")
+    assert verifier.known_unreachable(7) is not None
+    # A message that gets through proves the chat works again
+    verifier.record_send(7, True, "Message sent successfully!")
+    assert verifier.known_unreachable(7) is None
+    # Failures that say nothing about the chat are not remembered
+    verifier.record_send(8, False, "Failed to send message: Bad Request: message is too long")
+    assert verifier.known_unreachable(8) is None
+
+
+def test_unreachable_descriptions():
+    assert is_unreachable("Bad Request: chat not found")
+    assert not is_unreachable("Too Many Requests: retry after 5")
+    assert not is_unreachable(None)
@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+
+from reminder.delivery import Sender
+from reminder.store import PENDING, SENT, ReminderStore
+from reminder.worker import Worker
+
+
+class FakeClient:
+    """Telegram client that records messages instead of sending them.
+
+    A token in `held` does not answer until its event is set.
+    """
+
+    def __init__(self, token, sent, held):
+        self.token = token
+        self.sent = sent
+        self.held = held
+
+    def send_message(self, chat_id, message):
+        if self.token in self.held:
+            self.held[self.token].wait()
+        self.sent.append(chat_id)
+        return True, "Message sent successfully!", None, False
+
+
+class DroppingSender:
+    """Sender of a worker that dies before anything leaves the process."""
+
+    queue_depth = 0
+
+    def submit(self, chat_id, message, context=None):
+        pass
+
+    def join(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeWorker(Worker):
+    def __init__(self, *args, crashed=False, queue_size=1000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+        self.held = {}
+        self.crashed = crashed
+        self.queue_size = queue_size
+
+    def _make_client(self, token):
+        return FakeClient(token, self.sent, self.held)
+
+    def _make_sender(self, client, on_result):
+        if self.crashed:
+            return DroppingSender()
+        return Sender(client, workers=2, queue_size=self.queue_size, global_rate=1e9, private_chat_rate=1e9,
+                      on_result=on_result, metrics=self.metrics).start()
+
+    def log_delivery(self, chat_id, success, description, reminder_id):
+        pass
+
+    def drain(self):
+        for feed, _ in self._feeds.values():
+            feed.join()
+        for sender in self._senders.values():
+            sender.join()
+        self.outbox.flush()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "reminders.db")
+
+
+def add_daily(store, chat_id, fire_at, tenant=None):
+    return store.add({"text": "Take your iron tablet", "frequency": "Daily", "receiver_name": "Asha",
+                      "receiver_chat_id": chat_id, "selected_time_ist": "08:00", "next_fire_at": fire_at,
+                      "tenant": tenant})
+
+
+def outbox_statuses(store):
+    rows = store._connect().execute("SELECT chat_id, status FROM outbox ORDER BY chat_id")
+    return {chat_id: status for chat_id, status in rows}
+
+
+def test_outbox_replays_unconfirmed_sends_once_after_a_crash(path):
+    store = ReminderStore(path)
+    fire_at = time.time()
+    ids = [add_daily(store, chat_id, fire_at) for chat_id in ("101", "102")]
+
+    crashed = FakeWorker(store, token="TEST", crashed=True)
+    crashed.fire_due_reminders([(reminder_id, fire_at) for reminder_id in ids])
+    # The reminders moved on in the same transaction that queued their messages
+    assert all(store.get(reminder_id)['next_fire_at'] > fire_at for reminder_id in ids)
+    assert outbox_statuses(store) == {"101": PENDING, "102": PENDING}
+
+    restarted = FakeWorker(ReminderStore(path), token="TEST")
+    assert restarted.replay_outbox() == 2
+    restarted.drain()
+    assert sorted(restarted.sent) == ["101", "102"]
+    assert outbox_statuses(store) == {"101": SENT, "102": SENT}
+
+    again = FakeWorker(ReminderStore(path), token="TEST")
+    assert again.replay_outbox() == 0
+    assert again.sent == []
+
+
+def test_duplicate_tick_is_not_sent_twice(path):
+    store = ReminderStore(path)
+    fire_at = time.time()
+    reminder_id = add_daily(store, "101", fire_at)
+
+    worker = FakeWorker(store, token="TEST")
+    worker.fire_due_reminders([(reminder_id, fire_at)])
+    worker.drain()
+    worker.fire_due_reminders([(reminder_id, fire_at)])
+    worker.drain()
+    assert worker.sent == ["101"]
+
+
+def test_only_outside_schedule_changes_reload_the_dispatcher(path):
+    store = ReminderStore(path)
+    fire_at = time.time()
+    reminder_id = add_daily(store, "101", fire_at)
+    worker = FakeWorker(store, token="TEST")
+    # The first poll only takes note of where the store is
+    assert not worker._store_changed()
+
+    # The worker's own writes (moving the reminder on, outbox rows) are not changes
+    worker.fire_due_reminders([(reminder_id, fire_at)])
+    worker.drain()
+    assert not worker._store_changed()
+
+    add_daily(ReminderStore(path), "102", fire_at + 60)
+    assert worker._store_changed()
+    assert not worker._store_changed()
+
+    ReminderStore(path).delete(reminder_id)
+    assert worker._store_changed()
+
+
+def test_a_backed_up_bot_does_not_hold_up_other_tenants(path):
+    store = ReminderStore(path)
+    store.set_tenant("b", "Clinic B", "TOKEN-B")
+    fire_at = time.time()
+    backlog = [add_daily(store, str(1000 + i), fire_at) for i in range(20)]
+    other = add_daily(store, "2000", fire_at, tenant="b")
+
+    worker = FakeWorker(store, token="TOKEN-A", queue_size=2)
+    worker.held["TOKEN-A"] = threading.Event()
+    # The default tenant's bot answers nothing, so its two-slot queue fills up
+    tick = threading.Thread(target=worker.fire_due_reminders, args=([(i, fire_at) for i in backlog],))
+    tick.start()
+    tick.join(5)
+    assert not tick.is_alive()
+
+    worker.fire_due_reminders([(other, fire_at)])
+    deadline = time.time() + 5
+    while "2000" not in worker.sent and time.time() < deadline:
+        time.sleep(0.01)
+    assert worker.sent == ["2000"]
+
+    worker.held["TOKEN-A"].set()
+    worker.drain()
+    assert len(worker.sent) == 21